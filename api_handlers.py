@@ -0,0 +1,444 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from typing import Callable, Mapping
+
+from database.models import DataVersion, Reminder, SearchItem, ShowDetails, ShowEpisode, User, UserSearchSubscription
+from database.models.GuideModel import Guide
+from database.pool import InstrumentedQueuePool
+from exceptions.DatabaseError import DatabaseError, InvalidSubscriptions
+from exceptions.service_error import HTTPRequestError
+from services.tvmaze import tvmaze_api
+from utils.identity_cache import Identity, IdentityCache
+
+# The work of each API route, shared by `api.py` and `async_api.py` so the two applications give the same responses.
+# Each function takes the request's values and a `Session`, and returns the response's body, or its body and status.
+# `api.py` calls them with the request's session, and `async_api.py` through `AsyncSession.run_sync`.
+
+SHOW_EPISODE_OPTIONS = ['full', 'without_summaries', 'counts']
+
+
+# SHOWS
+def parse_shows_query(query: Mapping[str, str]):
+    """
+    Return the `episodes` option, `limit` and `after` cursor of a request for the shows.
+    Raise a `ValueError` if the option or limit are invalid.
+    """
+    episodes = query.get('episodes', 'full')
+    if episodes not in SHOW_EPISODE_OPTIONS:
+        raise ValueError(f"'{episodes}' is not a supported episodes option")
+    try:
+        limit = int(query['limit']) if 'limit' in query else None
+    except ValueError:
+        limit = 0
+    if limit is not None and limit < 1:
+        raise ValueError("The limit must be a positive number")
+    return episodes, limit, query.get('after')
+
+def build_shows(episodes: str, limit: int | None, after: str | None, session: Session):
+    """
+    Return a page of the shows, with the `X-Next-Cursor` header if there is another page
+    """
+    shows = ShowDetails.get_shows_page(session, after, limit + 1 if limit is not None else None, include_episodes=False)
+    headers = {}
+    if limit is not None and len(shows) > limit:
+        shows = shows[:limit]
+        headers['X-Next-Cursor'] = shows[-1].title
+
+    show_ids = [show.id for show in shows]
+    if episodes == 'counts':
+        episode_counts = ShowEpisode.get_episode_counts(show_ids, session)
+    else:
+        episode_rows = ShowEpisode.get_episode_rows(show_ids, session, include_summary=episodes == 'full')
+    show_data = []
+    for show in shows:
+        show_json = {
+            "show_name": show.title,
+            "show_details": show.to_dict(),
+            "search_item": show.search.to_dict() if show.search else None,
+            "reminder": show.reminder.to_dict() if show.reminder else None
+        }
+        if episodes == 'counts':
+            show_json['episode_count'], show_json['season_count'] = episode_counts.get(show.id, (0, 0))
+        else:
+            show_json['show_episodes'] = episode_rows.get(show.id, [])
+        show_data.append(show_json)
+    return show_data, headers
+
+def show_episodes(show: str, session: Session):
+    show_detail = ShowDetails.get_show_by_title(show, session)
+    if not show_detail:
+        return { 'message': f"Unable to find any details for '{show}'" }, 404
+
+    return ShowEpisode.get_episode_rows([show_detail.id], session).get(show_detail.id, [])
+
+def check_show_not_listed(name: str, session: Session):
+    """
+    Return the conflict response if `name` is already listed, otherwise None
+    """
+    if ShowDetails.get_show_by_title(name, session):
+        return { 'message': f"'{name}' is already listed" }, 409
+    return None
+
+def fetch_tvmaze_show(body: dict):
+    """
+    Return the show's details from TVMaze, and its episodes in the seasons of its conditions.
+    Raise a `HTTPRequestError` if TVMaze doesn't have the show.
+    """
+    tvmaze_details = tvmaze_api.get_show(body['name'])
+    conditions = body['conditions']
+    tvmaze_episodes = tvmaze_api.get_show_episodes(
+        tvmaze_details['id'],
+        conditions['min_season_number'],
+        conditions['max_season_number'],
+        True
+    )
+    return tvmaze_details, tvmaze_episodes
+
+def tvmaze_show_not_found(name: str, error: HTTPRequestError):
+    print(f"Could not find {name} on TVMaze: {error}")
+    return { "message": f"Could not find {name} on TVMaze: {error}" }, 404
+
+def add_show(tvmaze_details: dict, tvmaze_episodes: list[dict], conditions: dict, session: Session):
+    """
+    Add the show from TVMaze with its episodes and search criteria
+    """
+    # the show, its episodes and its search criteria are all built before any of them are written,
+    # and are committed together, so a show is never left without its episodes
+    show_detail = ShowDetails(
+        tvmaze_details['name'],
+        tvmaze_details['summary'],
+        tvmaze_details['id'],
+        tvmaze_details['genres'],
+        tvmaze_details['image']['original']
+    )
+    show_episodes: list[ShowEpisode] = []
+    for episode in tvmaze_episodes:
+        try:
+            show_episode = ShowEpisode(
+                tvmaze_details['name'],
+                episode['season_number'],
+                episode['episode_number'],
+                episode['episode_title'],
+                episode['summary']
+            )
+            show_episodes.append(show_episode)
+        except KeyError as error:
+            print("Error:", error)
+            print("TVMaze Episode: ", episode)
+            return { "message": f"Unable to add an episode for {tvmaze_details['name']}" }, 500
+
+    try:
+        search_criteria = SearchItem(
+            tvmaze_details['name'],
+            conditions['exact_title_match'],
+            conditions['max_season_number'],
+            conditions
+        )
+    except KeyError as error:
+        print("Error:", error)
+        return { "message": f"Unable to add search criteria for {tvmaze_details['name']}" }, 500
+
+    session.add(show_detail)
+    session.flush()
+    for show_episode in show_episodes:
+        show_episode.show_id = show_detail.id
+    ShowEpisode.insert_episodes(show_episodes, session)
+    search_criteria.show_id = show_detail.id
+    session.add(search_criteria)
+    session.commit()
+
+    return {
+        "show_name": show_detail.title,
+        "show_details": show_detail.to_dict(),
+        "show_episodes": ShowEpisode.get_episode_rows([show_detail.id], session).get(show_detail.id, []),
+        "search_item": search_criteria.to_dict(),
+        "reminder": None
+    }
+
+def update_show_detail(show: str, body: dict, session: Session):
+    show_detail = ShowDetails.get_show_by_title(show, session)
+    if not show_detail:
+        return { 'message': f"Unable to find any details for '{show}'" }, 404
+
+    show_detail.update_full_show_details(body, session)
+
+    return show_detail.to_dict()
+
+def delete_show_detail(show: str, current_user: Identity, session: Session):
+    if current_user.role != "Admin":
+        return { 'message': f"You do not have permission to delete the details for {show}" }, 403
+
+    show_detail = ShowDetails.get_show_by_title(show, session)
+    if not show_detail:
+        return { 'message': f"Unable to find any details for '{show}'" }, 404
+
+    show_detail.delete_show(session)
+
+    return '', 204
+
+# SEARCH ITEMS
+def add_search_item(body: dict, session: Session):
+    if 'show' not in body or body['show'] == '':
+        return { 'message': "Please provide the name of the show to add the Search Item" }, 400
+    show, conditions = body['show'], body['conditions']
+
+    show_details_check = ShowDetails.get_show_by_title(show, session)
+    search_item_check = SearchItem.get_search_item(show, session)
+
+    if show_details_check is None:
+        return {
+            'message': f"No details about '{show}' can be found. Please add details about the show before adding the Search Item"
+        }, 400
+    if search_item_check:
+        return { 'message': f"A Search Item already exists for '{show}'" }, 409
+
+    new_search_item = SearchItem(
+        show,
+        conditions['exact_title_match'],
+        conditions['max_season_number'],
+        conditions,
+        show_details_check.id
+    )
+    new_search_item.add_search_item(session)
+    return new_search_item.to_dict()
+
+def update_search_item(show: str, body: dict, session: Session):
+    if not bool(body):
+        return { 'message': "No information was provided to update the search item with" }, 400
+    search_item = SearchItem.get_search_item(show, session)
+    if search_item:
+        search_item.update_search(body, session)
+        return search_item.to_dict()
+    return { 'message': f"No search item could be found for '{show}'" }, 404
+
+def delete_search_item(show: str, session: Session):
+    search_item = SearchItem.get_search_item(show, session)
+    if search_item:
+        search_item.delete_search(session)
+        return {'message': f'{show} was deleted from the Search List'}
+    return { 'message': f"No search item could be found for '{show}'" }, 404
+
+# GUIDE
+def parse_region(query: Mapping[str, str]):
+    """
+    Return the region of the request, the primary region if it has none.
+    Raise a `ValueError` if the region isn't supported.
+    """
+    region = query.get('region', Guide.PRIMARY_REGION)
+    if region not in Guide.REGIONS:
+        raise ValueError(f"'{region}' is not a supported region")
+    return region
+
+def current_day():
+    from data_validation.validation import Validation
+
+    today = Validation.get_current_date()
+    return datetime(today.year, today.month, today.day)
+
+def parse_guide_date(query: Mapping[str, str]):
+    """
+    Return the day (dd/mm/yyyy) of the guide requested, today if the request has none
+    """
+    if query.get('date'):
+        dates = query.get('date').split('/')
+        return datetime(year=int(dates[2]), month=int(dates[1]), day=int(dates[0]))
+    return current_day()
+
+def guide_version(date: datetime, session: Session):
+    """
+    Return the version of the guide for `date`, or None if the day is over
+    """
+    from data_validation.validation import Validation
+
+    # the guides of past days are not changed once the day is over
+    if date.date() < Validation.get_current_date().date():
+        return None
+    return DataVersion.get_version(DataVersion.GUIDE, session)
+
+def build_guide(date: datetime, region: str, session: Session):
+    guide = Guide(date, session, region)
+    guide.get_shows()
+    return guide.to_dict(), {}
+
+def build_guide_week(start_date: datetime, region: str, session: Session):
+    week = []
+    for offset in range(7):
+        date = start_date + timedelta(days=offset)
+        saved_guide = Guide.get_guide_for_date(date, session, region)
+        guide = Guide(date, session, region)
+        guide.get_shows()
+        week.append({ **guide.to_dict(), 'status': saved_guide.status if saved_guide else None })
+    return week, {}
+
+# SHOW EPISODES
+def update_show_episode(id: int, body: dict, session: Session):
+    episode = ShowEpisode.get_episode_by_id(id, session)
+    if episode:
+        episode.update_full_episode(body, session)
+        return episode.to_dict()
+    return { 'message': f"This episode could not be found" }, 404
+
+def delete_show_episode(id: int, session: Session):
+    episode = ShowEpisode.get_episode_by_id(id, session)
+    if episode:
+        episode.delete_episode(session)
+        return '', 204
+    return { 'message': f"This episode could not be found" }, 404
+
+# REMINDERS
+def get_reminders(session: Session):
+    try:
+        return [reminder.to_dict() for reminder in Reminder.get_all_reminders(session)]
+    except (KeyError, ValueError) as error:
+        return {'message': 'There was a problem retrieving the reminders', 'error': str(error)}, 500
+
+def add_reminder(body: dict, session: Session):
+    show: str = body['show']
+    show_check = ShowDetails.get_show_by_title(show, session)
+    reminder_check = Reminder.get_reminder_by_show(show, session)
+    if not show_check:
+        return {'message': f'{show} is not being searched for'}, 400
+    if reminder_check:
+        return {'message': f'A reminder already exists for {show}'}, 409
+    new_reminder = Reminder(
+        show,
+        body['alert'],
+        body['warning_time'],
+        body['occasions'],
+        show_check.id
+    )
+    try:
+        new_reminder.add_reminder(session)
+        return new_reminder.to_dict()
+    except DatabaseError as err:
+        return {'message': f'An error occurred creating the reminder for {show}', 'error': str(err)}, 500
+
+def get_reminder(show: str, session: Session):
+    reminder = Reminder.get_reminder_by_show(show, session)
+    if reminder:
+        return reminder.to_dict()
+    return {'message': f'A reminder for {show} does not exist'}, 404
+
+def update_reminder(show: str, body: dict, session: Session):
+    reminder = Reminder.get_reminder_by_show(show, session)
+    if reminder:
+        for key in body.keys():
+            setattr(reminder, key, body[key])
+        return reminder.to_dict()
+    return {'message': f'A reminder for {show} does not exist'}, 404
+
+def delete_reminder(show: str, current_user: Identity, session: Session):
+    reminder = Reminder.get_reminder_by_show(show, session)
+    if reminder:
+        if current_user.role != 'Admin':
+            return {'message': f'You are not authorised to delete this reminder. Please make a request to delete it'}, 403
+        reminder.delete_reminder(session)
+        reminders = [reminder.to_dict() for reminder in Reminder.get_all_reminders(session)]
+        return { 'reminders': reminders }
+    return {'message': f'A reminder for {show} does not exist'}, 404
+
+# USERS
+def get_user(username: str, session: Session):
+    user = User.search_for_user(username, session)
+    if user:
+        return user.to_dict()
+    return {'message': f'An account with the username {username} could not be found'}, 404
+
+def get_user_subscriptions(username: str, session: Session):
+    user = User.search_for_user(username, session)
+    if user:
+        user_subscriptions = UserSearchSubscription.get_user_subscriptions(session, user.id)
+        return [subscription.to_dict() for subscription in user_subscriptions]
+    return {'message': f'A user with the username {username} could not be found'}, 404
+
+def add_user_subscriptions(username: str, shows: list[str], current_user: Identity, session: Session):
+    user = User.search_for_user(username, session)
+    if user:
+        if current_user.username != username:
+            return {'message': "You are not able to update this user's details"}, 403
+        try:
+            user_subscriptions: list[UserSearchSubscription] = []
+            for show in shows:
+                search_item = SearchItem.get_search_item(show, session)
+                user_subscriptions.append(UserSearchSubscription(user.id, search_item.id))
+            UserSearchSubscription.add_subscription_list(user_subscriptions, session)
+            return user.to_dict()
+        except InvalidSubscriptions as err:
+            return {'message': str(err)}, 400
+    return {'message': f'A user with the username {username} could not be found'}, 404
+
+def delete_user_subscription(subscription_id: str, session: Session):
+    subscription = UserSearchSubscription.get_subscription_by_id(subscription_id, session)
+    if not subscription:
+        return { 'message': f'This subscription could not be found' }, 404
+    if not subscription.user:
+        return { 'message': f'Unable to find the user account' }, 400
+    if not subscription.search_item:
+        return { 'message': f'This search item does not exist' }, 400
+    try:
+        subscription.remove_subscription(session)
+        return "", 204
+    except InvalidSubscriptions as err:
+        return {'message': str(err)}, 400
+
+def promote_user(username: str, current_user: Identity, identity_cache: IdentityCache, session: Session):
+    if current_user.role != 'Admin':
+        return { 'message': 'You are not authorised to promote this user to an admin role' }, 403
+    user = User.search_for_user(username, session)
+    if user:
+        user.promote_role()
+        session.commit()
+        identity_cache.invalidate(username)
+        return '', 204
+    return { 'message': f"Unable to find the user '{username}'" }, 404
+
+def change_password(username: str, body: dict, current_user: Identity, identity_cache: IdentityCache, session: Session):
+    user = User.search_for_user(username, session)
+    if user and current_user.username == user.username:
+        user.change_password(body['password'])
+        session.commit()
+        identity_cache.invalidate(username)
+        return user.to_dict()
+    return { 'message': "You are not authorised to change this user's password" }, 403
+
+def delete_user(username: str, current_user: Identity, identity_cache: IdentityCache, session: Session):
+    user = User.search_for_user(username, session)
+    if current_user.username == username:
+        user.delete_user(session)
+        identity_cache.invalidate(username)
+        return { 'message': 'Your account has been deleted' }
+    elif current_user.role == 'Admin':
+        if user:
+            user.delete_user(session)
+            identity_cache.invalidate(username)
+            return { 'message': 'The account has been deleted' }
+        else:
+            return {'message': f"An account with the username '{username}' could not be found"}, 404
+    else:
+        return { 'message': 'You are not authorised to delete this user account' }
+
+def register_user(body: dict, session: Session):
+    check_user = User.search_for_user(body['username'], session)
+    if check_user:
+        return {'message': 'This username is already in use'}, 409
+    user = User(body['username'], body['password'])
+    user.add_user(session)
+    return {'message': 'You have successfully been registered'}
+
+def login(credentials: dict, create_access_token: Callable[[User], str], session: Session):
+    user = User.search_for_user(credentials['username'], session)
+    if user and user.check_password(credentials['password']):
+        return {
+            'username': user.username,
+            'role': user.role,
+            'token': create_access_token(user)
+        }
+    return { 'message': 'Incorrect username or password' }, 401
+
+# STATUS
+def pool_status(current_user: Identity, pool: object):
+    if current_user.role != 'Admin':
+        return { 'message': 'You are not authorised to view the status of the database pool' }, 403
+    if not isinstance(pool, InstrumentedQueuePool):
+        return { 'message': 'The database pool does not record its status' }, 404
+    return pool.stats()
@@ -0,0 +1,429 @@
+from aiohttp import web
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from functools import wraps
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
+from typing import Awaitable, Callable
+from werkzeug.http import parse_etags
+import asyncio
+import jwt
+import os
+import uuid
+
+load_dotenv('.env')
+from database.async_database import create_async_session_factory
+from database.export import EXPORTS, export_query, parse_export_filters, stream_export_async
+from database.models import DataVersion, User
+from exceptions.service_error import HTTPRequestError
+from utils import json_serialiser
+from utils.identity_cache import Identity, IdentityCache
+from utils.response_cache import ResponseCache
+import api_handlers
+
+# The API as an aiohttp application, served by an asyncio event loop instead of WSGI workers,
+# with the same routes, responses and tokens as `api.py`. The work of each route is shared with `api.py` in `api_handlers`.
+# Database work runs on an asyncpg `AsyncSession`, and the calls to TVMaze run in a thread,
+# so a request waiting on either doesn't hold up the other requests the process is serving.
+# Run with aiohttp's own server, `python async_api.py`, or under gunicorn with aiohttp's worker,
+# `gunicorn async_api:app --worker-class aiohttp.GunicornWebWorker`. It is not an ASGI application.
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+routes = web.RouteTableDef()
+response_cache = ResponseCache()
+identity_cache = IdentityCache()
+access_token_expires = timedelta(minutes=15)
+
+
+def json_response(body: object, status: int = 200, headers: dict[str, str] = None):
+    if status == 204 or body == '':
+        return web.Response(status=status, headers=headers)
+    return web.json_response(body, status=status, headers=headers, dumps=json_serialiser.dumps)
+
+def handler_response(result: object):
+    """
+    Return what a function of `api_handlers` returned, either the body or the body and status, as JSON
+    """
+    body, status = result if isinstance(result, tuple) else (result, 200)
+    return json_response(body, status)
+
+async def run_with_session(request: web.Request, operation: Callable[[Session], object]):
+    """
+    Run `operation` with the request's session, returning what it returns as JSON
+    """
+    return handler_response(await request['session'].run_sync(operation))
+
+async def cached_response(
+    request: web.Request,
+    key: tuple,
+    version: int | None,
+    build: Callable[[Session], tuple[object, dict[str, str]]]
+):
+    """
+    Respond from the `ResponseCache` as `ResponseCache.respond` does for `api.py`
+    """
+    etag = ResponseCache.etag(key, version)
+    headers = { 'ETag': f'"{etag}"', 'Cache-Control': ResponseCache.cache_control(version) }
+    if etag in parse_etags(request.headers.get('If-None-Match')):
+        return web.Response(status=304, headers=headers)
+
+    body, build_headers = await request['session'].run_sync(
+        lambda session: response_cache.get(key, version, lambda: build(session))
+    )
+    return web.Response(text=body, content_type='application/json', headers={ **build_headers, **headers })
+
+def create_access_token(request: web.Request, user: User):
+    now = datetime.now(timezone.utc)
+    claims = {
+        'fresh': False,
+        'iat': now,
+        'jti': str(uuid.uuid4()),
+        'type': 'access',
+        'sub': user.username,
+        'nbf': now,
+        'exp': now + access_token_expires,
+        'id': user.id,
+        'role': user.role
+    }
+    return jwt.encode(claims, request.app['jwt_secret'], 'HS256')
+
+def jwt_required(handler: Handler):
+    """
+    Authorise the request with its bearer token, as `flask_jwt_extended.jwt_required` does for `api.py`,
+    making the user's `Identity` available as `request['current_user']`
+    """
+    @wraps(handler)
+    async def authorised_handler(request: web.Request):
+        authorization = request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer '):
+            return json_response({ 'msg': 'Missing Authorization Header' }, 401)
+        try:
+            claims = jwt.decode(authorization[len('Bearer '):], request.app['jwt_secret'], algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return json_response({ 'msg': 'Token has expired' }, 401)
+        except jwt.InvalidTokenError as error:
+            return json_response({ 'msg': str(error) }, 422)
+        if claims.get('type') != 'access':
+            return json_response({ 'msg': 'Only access tokens are allowed' }, 422)
+
+        identity = identity_cache.get(claims['sub'], claims)
+        if identity is None:
+            user = await request['session'].run_sync(lambda session: User.search_for_user(claims['sub'], session))
+            if not user:
+                return json_response({ 'msg': f"Error loading the user {claims['sub']}" }, 401)
+            identity = Identity(user.id, user.username, user.role)
+            identity_cache.set(identity)
+        request['current_user'] = identity
+        return await handler(request)
+
+    return authorised_handler
+
+@web.middleware
+async def session_middleware(request: web.Request, handler: Handler):
+    """
+    Give the request its own session, closed when the request ends and rolled back first if the request failed
+    """
+    session: AsyncSession = request.app['session_factory']()
+    request['session'] = session
+    try:
+        return await handler(request)
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+@web.middleware
+async def error_middleware(request: web.Request, handler: Handler):
+    """Return JSON instead of HTML for HTTP errors."""
+    try:
+        return await handler(request)
+    except web.HTTPException as error:
+        if error.status < 400:
+            raise
+        return json_response({ 'code': error.status, 'name': error.reason, 'description': error.text }, error.status)
+
+# PAGES
+async def index(request: web.Request):
+    return web.FileResponse('frontend/build/index.html')
+
+for page in [
+    '/',
+    '/shows',
+    '/shows/{show}',
+    '/shows/{show}/episodes',
+    '/shows/{show}/search',
+    '/shows/{show}/reminder',
+    '/login',
+    '/profile/{user}',
+    '/profile/{user}/settings'
+]:
+    routes.get(page)(index)
+
+@routes.get('/favicon.ico')
+async def favicon(request: web.Request):
+    return web.FileResponse('frontend/favicon.ico')
+
+# SHOWS
+@routes.get('/api/shows')
+async def shows(request: web.Request):
+    try:
+        episodes, limit, after = api_handlers.parse_shows_query(request.query)
+    except ValueError as error:
+        return json_response({ 'message': str(error) }, 400)
+
+    version = await request['session'].run_sync(lambda session: DataVersion.get_version(DataVersion.SHOWS, session))
+    return await cached_response(
+        request,
+        ('shows', episodes, limit, after),
+        version,
+        lambda session: api_handlers.build_shows(episodes, limit, after, session)
+    )
+
+@routes.get('/api/shows/{show}/episodes')
+async def show_episodes(request: web.Request):
+    show = request.match_info['show']
+    return await run_with_session(request, lambda session: api_handlers.show_episodes(show, session))
+
+@routes.post('/api/shows')
+@jwt_required
+async def add_show(request: web.Request):
+    session: AsyncSession = request['session']
+    body = await request.json()
+
+    listed = await session.run_sync(lambda sync_session: api_handlers.check_show_not_listed(body['name'], sync_session))
+    if listed:
+        return handler_response(listed)
+    # return the session's connection to the pool while the show is fetched from TVMaze
+    await session.close()
+
+    try:
+        tvmaze_details, tvmaze_episodes = await asyncio.to_thread(api_handlers.fetch_tvmaze_show, body)
+    except HTTPRequestError as error:
+        return handler_response(api_handlers.tvmaze_show_not_found(body['name'], error))
+
+    return await run_with_session(
+        request,
+        lambda session: api_handlers.add_show(tvmaze_details, tvmaze_episodes, body['conditions'], session)
+    )
+
+@routes.put('/api/shows/{show}')
+@jwt_required
+async def update_show_detail(request: web.Request):
+    show = request.match_info['show']
+    body = await request.json()
+    return await run_with_session(request, lambda session: api_handlers.update_show_detail(show, body, session))
+
+@routes.delete('/api/shows/{show}')
+@jwt_required
+async def delete_show_detail(request: web.Request):
+    show = request.match_info['show']
+    current_user: Identity = request['current_user']
+    return await run_with_session(request, lambda session: api_handlers.delete_show_detail(show, current_user, session))
+
+# SEARCH ITEMS
+@routes.post('/api/search-item')
+@jwt_required
+async def add_search_item(request: web.Request):
+    body = await request.json()
+    return await run_with_session(request, lambda session: api_handlers.add_search_item(body, session))
+
+@routes.put('/api/search-item/{show}')
+@jwt_required
+async def update_search_item(request: web.Request):
+    show = request.match_info['show']
+    body = await request.json()
+    return await run_with_session(request, lambda session: api_handlers.update_search_item(show, body, session))
+
+@routes.delete('/api/search-item/{show}')
+@jwt_required
+async def delete_search_item(request: web.Request):
+    show = request.match_info['show']
+    return await run_with_session(request, lambda session: api_handlers.delete_search_item(show, session))
+
+# GUIDE
+@routes.get('/api/guide')
+async def guide(request: web.Request):
+    try:
+        region = api_handlers.parse_region(request.query)
+    except ValueError as error:
+        return json_response({ 'message': str(error) }, 400)
+    date = api_handlers.parse_guide_date(request.query)
+
+    version = await request['session'].run_sync(lambda session: api_handlers.guide_version(date, session))
+    return await cached_response(
+        request,
+        ('guide', date, region),
+        version,
+        lambda session: api_handlers.build_guide(date, region, session)
+    )
+
+@routes.get('/api/guide/week')
+async def guide_week(request: web.Request):
+    try:
+        region = api_handlers.parse_region(request.query)
+    except ValueError as error:
+        return json_response({ 'message': str(error) }, 400)
+    start_date = api_handlers.current_day()
+
+    version = await request['session'].run_sync(lambda session: DataVersion.get_version(DataVersion.GUIDE, session))
+    return await cached_response(
+        request,
+        ('guide_week', start_date, region),
+        version,
+        lambda session: api_handlers.build_guide_week(start_date, region, session)
+    )
+
+# SHOW EPISODES
+@routes.put('/api/show-episode/{id:\\d+}')
+@jwt_required
+async def update_show_episode(request: web.Request):
+    id = int(request.match_info['id'])
+    body = await request.json()
+    return await run_with_session(request, lambda session: api_handlers.update_show_episode(id, body, session))
+
+@routes.delete('/api/show-episode/{id:\\d+}')
+@jwt_required
+async def delete_show_episode(request: web.Request):
+    id = int(request.match_info['id'])
+    return await run_with_session(request, lambda session: api_handlers.delete_show_episode(id, session))
+
+# REMINDERS
+@routes.get('/api/reminders')
+async def get_reminders(request: web.Request):
+    return await run_with_session(request, api_handlers.get_reminders)
+
+@routes.post('/api/reminders')
+@jwt_required
+async def reminders(request: web.Request):
+    body = await request.json()
+    return await run_with_session(request, lambda session: api_handlers.add_reminder(body, session))
+
+@routes.get('/api/reminder/{show}')
+async def get_reminder(request: web.Request):
+    show = request.match_info['show']
+    return await run_with_session(request, lambda session: api_handlers.get_reminder(show, session))
+
+@routes.route('PUT', '/api/reminder/{show}')
+@routes.route('DELETE', '/api/reminder/{show}')
+@jwt_required
+async def reminder(request: web.Request):
+    show = request.match_info['show']
+    if request.method == 'PUT':
+        body = dict(await request.json())
+        return await run_with_session(request, lambda session: api_handlers.update_reminder(show, body, session))
+    current_user: Identity = request['current_user']
+    return await run_with_session(request, lambda session: api_handlers.delete_reminder(show, current_user, session))
+
+# USERS
+@routes.get('/api/user/{username}')
+async def get_user(request: web.Request):
+    username = request.match_info['username']
+    return await run_with_session(request, lambda session: api_handlers.get_user(username, session))
+
+@routes.get('/api/users/{username}/subscriptions')
+async def get_user_subscriptions(request: web.Request):
+    username = request.match_info['username']
+    return await run_with_session(request, lambda session: api_handlers.get_user_subscriptions(username, session))
+
+@routes.post('/api/users/{username}/subscriptions')
+@jwt_required
+async def add_user_subscriptions(request: web.Request):
+    username = request.match_info['username']
+    current_user: Identity = request['current_user']
+    body: list[str] = await request.json()
+    return await run_with_session(
+        request,
+        lambda session: api_handlers.add_user_subscriptions(username, body, current_user, session)
+    )
+
+@routes.delete('/api/users/subscriptions/{subscription_id}')
+@jwt_required
+async def delete_user_subscription(request: web.Request):
+    subscription_id = request.match_info['subscription_id']
+    return await run_with_session(request, lambda session: api_handlers.delete_user_subscription(subscription_id, session))
+
+@routes.patch('/api/user/{username}/promote')
+@jwt_required
+async def promote_user(request: web.Request):
+    username = request.match_info['username']
+    current_user: Identity = request['current_user']
+    return await run_with_session(
+        request,
+        lambda session: api_handlers.promote_user(username, current_user, identity_cache, session)
+    )
+
+@routes.put('/api/user/{username}/change_password')
+@jwt_required
+async def change_password(request: web.Request):
+    username = request.match_info['username']
+    current_user: Identity = request['current_user']
+    body = await request.json()
+    return await run_with_session(
+        request,
+        lambda session: api_handlers.change_password(username, body, current_user, identity_cache, session)
+    )
+
+@routes.delete('/api/user/{username}')
+@jwt_required
+async def delete_user(request: web.Request):
+    username = request.match_info['username']
+    current_user: Identity = request['current_user']
+    return await run_with_session(
+        request,
+        lambda session: api_handlers.delete_user(username, current_user, identity_cache, session)
+    )
+
+@routes.post('/api/auth/register')
+async def register_user(request: web.Request):
+    body = await request.json()
+    return await run_with_session(request, lambda session: api_handlers.register_user(body, session))
+
+@routes.post('/api/auth/login')
+async def login(request: web.Request):
+    given_credentials = await request.json()
+    return await run_with_session(
+        request,
+        lambda session: api_handlers.login(given_credentials, lambda user: create_access_token(request, user), session)
+    )
+
+# EXPORT
+@routes.get('/api/export/{resource}')
+@jwt_required
+async def export(request: web.Request):
+    resource = request.match_info['resource']
+    if resource not in EXPORTS:
+        return json_response({ 'message': f"'{resource}' can not be exported, the exports are {', '.join(EXPORTS)}" }, 404)
+    try:
+        query = export_query(resource, **parse_export_filters(resource, request.query))
+    except ValueError as error:
+        return json_response({ 'message': str(error) }, 400)
+
+    response = web.StreamResponse(headers={ 'Content-Type': 'application/x-ndjson' })
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    async for chunk in stream_export_async(query, request['session']):
+        await response.write(chunk)
+    await response.write_eof()
+    return response
+
+# STATUS
+@routes.get('/api/status/pool')
+@jwt_required
+async def pool_status(request: web.Request):
+    return handler_response(api_handlers.pool_status(request['current_user'], request['session'].bind.pool))
+
+def create_app(session_factory: async_sessionmaker[AsyncSession] = None, jwt_secret: str = None):
+    app = web.Application(middlewares=[error_middleware, session_middleware])
+    app['session_factory'] = session_factory or create_async_session_factory()
+    app['jwt_secret'] = jwt_secret or os.getenv('JWT_SECRET')
+    app.add_routes(routes)
+    if os.path.isdir('frontend/build/assets'):
+        app.router.add_static('/assets', 'frontend/build/assets')
+    return app
+
+app = create_app()
+
+if __name__ == '__main__':
+    web.run_app(app, port=int(os.getenv('PORT', 5001)))
@@ -4,6 +4,8 @@ import pytz
 import re
 
 from aux_methods.types import ShowData
+from utils.timestamp_parser import get_timezone
+from utils.title_rules import get_title_rules
 import utils
 
 
@@ -51,9 +53,9 @@ def parse_date_from_command(date: str):
         else:
             raise ValueError('The date provided was not in a valid format.')
 
-def convert_utc_to_local(utc_timestamp: datetime):
+def convert_utc_to_local(utc_timestamp: datetime, timezone: str = 'Australia/Sydney'):
     utc_timestamp = utc_timestamp.replace(tzinfo=pytz.utc)
-    local_time = utc_timestamp.astimezone(pytz.timezone('Australia/Sydney'))
+    local_time = utc_timestamp.astimezone(get_timezone(timezone))
     return local_time
 
 def build_episode(
@@ -76,29 +78,28 @@ def build_episode(
     if 'Cyberverse' in show_title and '/' in episode_title:
         episode_titles = episode_title.split('/')
         for idx, episode in enumerate(episode_titles):
-            episodes.append({
-                'title': show_title,
-                'channel': channel,
-                'start_time': start_time + timedelta(minutes=14) if idx == 1 else start_time,
-                'end_time': end_time,
-                'season_number': season_number,
-                'episode_number': episode_number,
-                'episode_title': utils.format_episode_title(episode.title())
-            })
+            episodes.append(ShowData(
+                show_title,
+                channel,
+                start_time + timedelta(minutes=14) if idx == 1 else start_time,
+                end_time,
+                season_number,
+                episode_number,
+                utils.format_episode_title(episode.title())
+            ))
     else:
-        if 'SBS' in channel:
-            sbs_format = sbs_episode_format(show_title, episode_title)
-            if isinstance(sbs_format, tuple):
-                season_number, episode_number = sbs_format
-        episodes.append({
-            'title': show_title,
-            'channel': channel,
-            'start_time': start_time,
-            'end_time': end_time,
-            'season_number': season_number,
-            'episode_number': episode_number,
-            'episode_title': utils.format_episode_title(episode_title)
-        })
+        channel_episode_numbers = get_title_rules().episode_numbers(channel, show_title, episode_title)
+        if channel_episode_numbers is not None:
+            season_number, episode_number = channel_episode_numbers
+        episodes.append(ShowData(
+            show_title,
+            channel,
+            start_time,
+            end_time,
+            season_number,
+            episode_number,
+            utils.format_episode_title(episode_title)
+        ))
     return episodes
 
 def split_message_by_time(message: str):
@@ -116,9 +117,8 @@ def split_message_by_time(message: str):
     return am_message, pm_message
 
 def sbs_episode_format(show_title: str, episode: str):
-    search = re.match(rf"{show_title} Series \d+ Ep \d+", episode)
-    if search:
-        numbers = tuple(int(number) for number in re.findall(r"\d+", episode))
+    numbers = get_title_rules().episode_numbers('SBS', show_title, episode)
+    if numbers is not None:
         return numbers
     else:
         return episode
@@ -126,12 +126,11 @@ def sbs_episode_format(show_title: str, episode: str):
 
 
 def show_data_to_file(shows: list[ShowData]):
-    import copy
     import json
     import os
     from services.hermes.hermes import hermes
 
-    shows_copy = copy.deepcopy(shows)
+    shows_copy = [show.to_dict() for show in shows]
     for show in shows_copy:
         show['start_time'] = datetime.strftime(show['start_time'], "%d-%m-%Y %H:%M")
         show['end_time'] = datetime.strftime(show['end_time'], "%d-%m-%Y %H:%M")
@@ -1,12 +1,117 @@
+from __future__ import annotations
 from datetime import datetime
-from typing import TypedDict
-
-ShowData = TypedDict('ShowData', {
-    'title': str,
-    'channel': str,
-    'start_time': datetime,
-    'end_time': datetime,
-    'season_number': int,
-    'episode_number': int,
-    'episode_title': str
-})
\ No newline at end of file
+from typing import NamedTuple, TYPE_CHECKING, TypedDict
+
+if TYPE_CHECKING:
+    from database.models import Reminder, ShowDetails, ShowEpisode
+
+class ShowData:
+    """
+    An immutable record of a show found in the guide.\n
+    The fields are kept in slots, and the hash and resolution key are computed once when the record is created,
+    so records can be deduplicated and looked up without building any intermediate dicts or tuples.
+    """
+    __slots__ = (
+        'title',
+        'channel',
+        'start_time',
+        'end_time',
+        'season_number',
+        'episode_number',
+        'episode_title',
+        'resolution_key',
+        '_key',
+        '_hash'
+    )
+
+    title: str
+    channel: str
+    start_time: datetime
+    end_time: datetime
+    season_number: int
+    episode_number: int
+    episode_title: str
+    resolution_key: tuple[str, int, int, str]
+
+    def __init__(
+        self,
+        title: str,
+        channel: str,
+        start_time: datetime,
+        end_time: datetime,
+        season_number: int,
+        episode_number: int,
+        episode_title: str
+    ):
+        set_field = object.__setattr__
+        set_field(self, 'title', title)
+        set_field(self, 'channel', channel)
+        set_field(self, 'start_time', start_time)
+        set_field(self, 'end_time', end_time)
+        set_field(self, 'season_number', season_number)
+        set_field(self, 'episode_number', episode_number)
+        set_field(self, 'episode_title', episode_title)
+        set_field(self, 'resolution_key', (title, season_number, episode_number, episode_title))
+        key = (title, channel, start_time, end_time, season_number, episode_number, episode_title)
+        set_field(self, '_key', key)
+        set_field(self, '_hash', hash(key))
+
+    @property
+    def listing_key(self):
+        """
+        The key a listing is matched to a stored `GuideEpisode` by when a guide is rebuilt
+        """
+        return (self.channel, self.start_time, self.title)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"ShowData is immutable, '{name}' cannot be set")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"ShowData is immutable, '{name}' cannot be deleted")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other: object):
+        if not isinstance(other, ShowData):
+            return NotImplemented
+        return self._hash == other._hash and self._key == other._key
+
+    def __reduce__(self):
+        return (ShowData, self._key)
+
+    def __repr__(self):
+        return (
+            f"ShowData(title={self.title}, channel={self.channel}, start_time={self.start_time}, end_time={self.end_time}, "
+            f"season_number={self.season_number}, episode_number={self.episode_number}, episode_title={self.episode_title})"
+        )
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'channel': self.channel,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'season_number': self.season_number,
+            'episode_number': self.episode_number,
+            'episode_title': self.episode_title
+        }
+
+ResolvedShow = TypedDict('ResolvedShow', {
+    'show_details': 'ShowDetails | None',
+    'show_episode': 'ShowEpisode | None',
+    'reminder': 'Reminder | None'
+})
+
+class GuideListing(NamedTuple):
+    """
+    The fields of an iview listing that the guide uses.\n
+    The start and end times are the feed's ISO strings until they are parsed by a `TimestampParser`.
+    """
+    channel: str
+    title: str
+    start_time: str | datetime | None
+    end_time: str | datetime | None
+    series_num: str | int | None
+    episode_num: str | int | None
+    episode_title: str | None
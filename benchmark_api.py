@@ -0,0 +1,74 @@
+from aiohttp import ClientSession, ClientTimeout
+import asyncio
+import click
+import statistics
+import time
+
+
+async def run_load(base_url: str, paths: list[str], requests: int, concurrency: int, token: str = None):
+    """
+    Send `requests` requests to `base_url`, cycling through `paths`, from `concurrency` clients at once.
+    Return the latency of each successful request and the number of failed requests, and how long it all took.
+    """
+    headers = { 'Authorization': f'Bearer {token}' } if token else {}
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(paths[index % len(paths)])
+
+    async def client(session: ClientSession):
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                async with session.get(f'{base_url}{path}', headers=headers) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        errors += 1
+                        continue
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with ClientSession(timeout=ClientTimeout(total=60)) as session:
+        await asyncio.gather(*[client(session) for _ in range(concurrency)])
+
+    return latencies, errors, time.perf_counter() - start
+
+def percentile(latencies: list[float], percent: int):
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0
+    return statistics.quantiles(latencies, n=100)[percent - 1]
+
+@click.command()
+@click.argument('base_urls', nargs=-1, required=True)
+@click.option('--path', 'paths', multiple=True, default=['/api/guide', '/api/shows?episodes=counts'], help='A path to request, can be given more than once')
+@click.option('--requests', default=2000, help='The number of requests to send to each API')
+@click.option('--concurrency', default=100, help='The number of requests in flight at once')
+@click.option('--token', default=None, help='A token to send with each request, for the protected paths')
+def benchmark_api(base_urls: tuple[str], paths: tuple[str], requests: int, concurrency: int, token: str):
+    """
+    Compare the APIs at BASE_URLS, e.g. the Flask API under a WSGI server (`gunicorn api:app`)
+    and the aiohttp API (`gunicorn async_api:app --worker-class aiohttp.GunicornWebWorker`), under the same load.
+    Run each API with the same number of processes against the same database for a fair comparison.
+    """
+    print(f"{requests} requests, {concurrency} at a time, to {', '.join(paths)}")
+    print(f"{'API':<32}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for base_url in base_urls:
+        latencies, errors, duration = asyncio.run(run_load(base_url.rstrip('/'), list(paths), requests, concurrency, token))
+        print(
+            f"{base_url:<32}"
+            f"{len(latencies) / duration:>10.1f}"
+            f"{percentile(latencies, 50) * 1000:>10.1f}"
+            f"{percentile(latencies, 95) * 1000:>10.1f}"
+            f"{percentile(latencies, 99) * 1000:>10.1f}"
+            f"{errors:>8}"
+        )
+
+
+if __name__ == '__main__':
+    benchmark_api()
@@ -36,27 +36,15 @@ class Validation:
         """
         Format a show's episode title into a more reader-friendly appearance
         """
+        from utils import format_episode_title
 
-        if ', The' in episode_title:
-            idx_the = episode_title.find(', The')
-            episode_title = 'The ' + episode_title[0:idx_the]
-        if ', A' in episode_title and episode_title != 'Kolcheck, A.':
-            idx_a = episode_title.find(', A')
-            episode_title = 'A ' + episode_title[0:idx_a]
-
-        return episode_title
+        return format_episode_title(episode_title)
 
     @staticmethod
     def check_show_titles(show: str):
-        if 'Maigret' in show:
-            return 'Maigret'
-        elif 'Death in Paradise' in show:
-            return 'Death In Paradise'
-        elif 'Grantchester Christmas Special' in show:
-            return 'Grantchester'
-        elif 'NCIS Encore' in show:
-            return 'NCIS'
-        return show
+        from utils import check_show_titles
+
+        return check_show_titles(show)
 
     @staticmethod
     def extract_information(description: str) -> tuple:
@@ -2,6 +2,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import DeclarativeBase
 import os
 
+from database.pool import InstrumentedQueuePool
+
 
 class Base(DeclarativeBase):
     pass
@@ -9,7 +11,15 @@ class Base(DeclarativeBase):
 try:
     db_url = os.getenv("DB_URL")
     if db_url is not None:
-        engine = create_engine(db_url, pool_pre_ping=True, pool_recycle=1800)
+        engine = create_engine(
+            db_url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+            pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+            pool_pre_ping=True,
+            pool_recycle=1800
+        )
     else:
         engine = None
 except KeyError:
@@ -0,0 +1,27 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, create_async_engine
+import os
+
+from database.pool import InstrumentedAsyncQueuePool
+
+
+def create_async_session_factory(db_url: str = None):
+    """
+    Return a factory for the `AsyncSession`s the async API uses, connected with asyncpg to `DB_URL`,
+    or None if there is no database to connect to.\n
+    The engine's pool is configured from the same environment variables as the pool of `database.engine`.
+    """
+    db_url = db_url or os.getenv("DB_URL")
+    if db_url is None:
+        return None
+
+    async_engine = create_async_engine(
+        make_url(db_url).set(drivername='postgresql+asyncpg'),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
+    return async_sessionmaker(async_engine, class_=AsyncSession)
@@ -0,0 +1,65 @@
+from sqlalchemy.orm import Session
+
+from database.models.ShowEpisodeModel import ShowEpisode
+from utils import episode_title_key
+
+
+class EpisodeCatalog:
+    """
+    The `ShowEpisode`s of the shows in a guide run, kept in memory so each airing is matched to its episode without a query.\n
+    The episodes of every show are loaded together in one query the first time the show is needed,
+    and indexed by season and episode number and by the `episode_title_key` of their title and alternative titles.
+    Episodes created during the run are added to the catalog, so later airings of them are matched to the same episode.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._shows: set[str] = set()
+        self._by_number: dict[tuple[str, int, int], ShowEpisode] = {}
+        self._by_title: dict[tuple[str, str], ShowEpisode] = {}
+
+    def load(self, show_titles: list[str]):
+        """
+        Load the episodes of the given shows, skipping the shows that are already loaded
+        """
+        show_titles = list(set(show_titles) - self._shows)
+        if len(show_titles) == 0:
+            return
+        for show_episode in ShowEpisode.get_episodes_by_shows(show_titles, self.session):
+            self.add(show_episode)
+        self._shows.update(show_titles)
+
+    def add(self, show_episode: ShowEpisode):
+        self._by_number.setdefault(
+            (show_episode.show, show_episode.season_number, show_episode.episode_number),
+            show_episode
+        )
+        for title in [show_episode.episode_title, *(show_episode.alternative_titles or [])]:
+            if title:
+                self._by_title.setdefault((show_episode.show, episode_title_key(title)), show_episode)
+
+    def find(self, show_title: str, season_number: int, episode_number: int, episode_title: str):
+        """
+        Return the episode `ShowEpisode.search_for_episode` would find, or `None` if there isn't one in the catalog.\n
+        The episode is found by its season and episode number when both are known, otherwise by its episode title.
+        """
+        if season_number != -1 and episode_number != 0:
+            return self._by_number.get((show_title, season_number, episode_number))
+        if episode_title == '':
+            return None
+        return self._by_title.get((show_title, episode_title_key(episode_title)))
+
+    def find_all(self, keys: list[tuple[str, int, int, str]]):
+        """
+        Return a dict mapping each of the given resolution keys to its `ShowEpisode`.
+        Keys without an episode in the catalog are not included.
+        """
+        show_episodes: dict[tuple[str, int, int, str], ShowEpisode] = {}
+        for key in keys:
+            show_episode = self.find(*key)
+            if show_episode is not None:
+                show_episodes[key] = show_episode
+        return show_episodes
+
+    def is_loaded(self, show_title: str):
+        return show_title in self._shows
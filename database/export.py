@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Iterator, Mapping
+
+from database.models import GuideEpisode, ShowDetails, ShowEpisode
+from utils.json_serialiser import dumpb
+
+# The catalogue export streams every row of a resource as newline delimited JSON, one object per line.
+# The rows are read through a server-side cursor `BATCH_SIZE` rows at a time, and each batch is sent as one chunk,
+# so neither the API nor the client has to hold more than a batch of the export at once.
+
+BATCH_SIZE = 1000
+EXPORTS = ['shows', 'episodes', 'guide-episodes']
+
+
+def parse_export_filters(resource: str, args: Mapping[str, str]):
+    """
+    Return the filters for exporting `resource` from the request's arguments, as keyword arguments for `export_query`.\n
+    `show` is the title of the show to export, and `start` and `end`, only for the guide episodes,
+    are the first and last days (dd/mm/yyyy) of the history to export.
+    Raise a `ValueError` if any of the filters are invalid.
+    """
+    filters = { 'show': args.get('show') }
+    for argument in ['start', 'end']:
+        if argument not in args:
+            continue
+        if resource != 'guide-episodes':
+            raise ValueError(f"The '{argument}' filter is only supported for the guide episodes")
+        try:
+            filters[argument] = datetime.strptime(args[argument], '%d/%m/%Y')
+        except ValueError:
+            raise ValueError(f"'{args[argument]}' is not a valid {argument} date, the date should be given as dd/mm/yyyy")
+    if 'end' in filters:
+        filters['end'] = filters['end'] + timedelta(days=1)
+
+    return filters
+
+def export_query(resource: str, show: str = None, start: datetime = None, end: datetime = None) -> Select:
+    if resource == 'shows':
+        return ShowDetails.export_query(show)
+    if resource == 'episodes':
+        return ShowEpisode.export_query(show)
+    return GuideEpisode.export_query(show, start, end)
+
+def ndjson_chunk(rows: list[Row]):
+    return b''.join(dumpb(row._asdict()) + b'\n' for row in rows)
+
+def stream_export(query: Select, session: Session) -> Iterator[bytes]:
+    result = session.execute(query.execution_options(yield_per=BATCH_SIZE))
+    for rows in result.partitions():
+        yield ndjson_chunk(rows)
+
+async def stream_export_async(query: Select, session: AsyncSession) -> AsyncIterator[bytes]:
+    result = await session.stream(query.execution_options(yield_per=BATCH_SIZE))
+    async for rows in result.partitions():
+        yield ndjson_chunk(rows)
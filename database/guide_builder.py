@@ -0,0 +1,186 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+import asyncio
+import logging
+
+from aux_methods.types import ShowData
+from database.models.GuideModel import Guide
+from database.models.SearchItemModel import SearchItem
+from database.show_resolver import ShowResolver
+from utils.title_matcher import TitleMatcher
+
+
+class GuideBuilder:
+    """
+    Builds the guides for several regions on the same date together.\n
+    The sources of every region are fetched concurrently. The search list is then loaded once into one `TitleMatcher`,
+    the catalog every region shares, and the regions' listings are matched against it one after another,
+    as matching is CPU-bound. The matched shows of all regions are then resolved by one `ShowResolver`,
+    so each show is only looked up once however many regions it is shown in.
+    """
+
+    logger = logging.getLogger("GuideBuilder")
+
+    def __init__(
+        self,
+        date: datetime,
+        session: Session,
+        regions: list[str] = None,
+        published_guides: dict[str, Guide] = None
+    ):
+        self.date = date
+        self.session = session
+        published_guides = published_guides or {}
+        self.guides = {
+            region: published_guides.get(region) or Guide(date, session, region)
+            for region in (regions if regions is not None else [Guide.PRIMARY_REGION])
+        }
+        self.show_resolver = ShowResolver(session)
+
+    def ordered_guides(self):
+        """
+        The guides with the primary region last, so the other regions check for repeats
+        before the primary region records today's airings
+        """
+        return sorted(self.guides.values(), key=lambda guide: guide.is_primary_region())
+
+    async def fetch_source_data(self):
+        await asyncio.gather(*[guide.fetch_source_data() for guide in self.guides.values()])
+
+    def match_guides(self):
+        """
+        Match every region's listings against the active search items, returning the matched shows keyed by region.\n
+        Matching is CPU-bound, so the regions are matched one after another rather than in threads that would wait on the GIL.
+        """
+        title_matcher = TitleMatcher(SearchItem.get_active_searches(self.session))
+        return { region: guide.match_free_to_air(title_matcher) for region, guide in self.guides.items() }
+
+    def build_guides(self, capture_events: bool = True):
+        """
+        Match and resolve the shows of every region, setting each guide's `fta_shows`.\n
+        Guides that have already been saved are refreshed, only changing the episodes that differ from the latest listings.
+        Returns the shows that have no `ShowDetails`, across all regions.
+        """
+        matched_shows = self.match_guides()
+        resolved_shows = self.show_resolver.resolve([
+            show
+            for shows_data in matched_shows.values()
+            for show in shows_data
+        ])
+
+        shows_not_found: dict[ShowData, None] = {}
+        for guide in self.ordered_guides():
+            build_guide_episodes = guide.refresh_guide_episodes if guide.id is not None else guide.build_guide_episodes
+            guide.fta_shows, region_not_found = build_guide_episodes(
+                matched_shows[guide.region],
+                resolved_shows,
+                capture_events,
+                self.show_resolver
+            )
+            for show in region_not_found:
+                shows_not_found[show] = None
+
+        return list(shows_not_found)
+
+    def create_guides(self, scheduler: AsyncIOScheduler = None):
+        shows_not_found: list[ShowData] = []
+        try:
+            shows_not_found = self.build_guides()
+            for guide in self.guides.values():
+                guide.save_guide()
+                guide.schedule_reminders(scheduler)
+        except SQLAlchemyError as error:
+            GuideBuilder.logger.error(f"Could not create the guides: {str(error)}")
+            self.session.rollback()
+
+        if len(shows_not_found) > 0:
+            from services.hermes.hermes import hermes
+            hermes.dispatch("show_details_not_found", shows_not_found)
+
+    def stage_guides(self):
+        try:
+            for guide in self.guides.values():
+                guide.status = Guide.PENDING
+            self.build_guides(capture_events=False)
+            for guide in self.guides.values():
+                guide.save_guide()
+        except SQLAlchemyError as error:
+            GuideBuilder.logger.error(f"Could not stage the guides for {self.date.strftime('%d-%m-%Y')}: {str(error)}")
+            self.session.rollback()
+
+    async def build(self, scheduler: AsyncIOScheduler = None):
+        """
+        Fetch, build and save the guides for every region, returning them keyed by region
+        """
+        await self.fetch_source_data()
+        self.create_guides(scheduler)
+        return self.guides
+
+    @staticmethod
+    async def prefetch_guides(start_date: datetime, days: int, session: Session, regions: list[str] = None):
+        """
+        Fetch the sources for `days` days from `start_date` concurrently, and stage a pending guide for each day and region.\n
+        A pending guide already staged is replaced with the latest data, and guides that were published are skipped.
+        """
+        builders: list[GuideBuilder] = []
+        for offset in range(days):
+            date = datetime(start_date.year, start_date.month, start_date.day) + timedelta(days=offset)
+            stage_regions = []
+            for region in regions or [Guide.PRIMARY_REGION]:
+                existing_guide = Guide.get_guide_for_date(date, session, region)
+                if existing_guide is not None and existing_guide.status != Guide.PENDING:
+                    continue
+                if existing_guide is not None:
+                    existing_guide.delete_guide()
+                stage_regions.append(region)
+            if len(stage_regions) > 0:
+                builders.append(GuideBuilder(date, session, stage_regions))
+
+        await asyncio.gather(*[builder.fetch_source_data() for builder in builders])
+        for builder in builders:
+            builder.stage_guides()
+
+        return builders
+
+    @staticmethod
+    async def publish_guides(
+        date: datetime,
+        session: Session,
+        regions: list[str] = None,
+        scheduler: AsyncIOScheduler = None
+    ):
+        """
+        Return the guides for `date` keyed by region, finalising the guides staged by `prefetch_guides`
+        and building the rest now. The primary region's guide is always completed last.\n
+        Guides that were already published for `date` are rebuilt incrementally against their stored episodes,
+        so sending the guide again only writes what changed since it was last sent.
+        """
+        regions = regions or [Guide.PRIMARY_REGION]
+        pending_guides: dict[str, Guide] = {}
+        published_guides: dict[str, Guide] = {}
+        for region in regions:
+            guide = Guide.get_guide_for_date(date, session, region)
+            if guide is not None and guide.status == Guide.PENDING:
+                pending_guides[region] = guide
+            elif guide is not None:
+                published_guides[region] = guide
+
+        builder = GuideBuilder(
+            date,
+            session,
+            [region for region in regions if region not in pending_guides],
+            published_guides=published_guides
+        )
+        primary_pending = Guide.PRIMARY_REGION in pending_guides
+        if not primary_pending:
+            for guide in pending_guides.values():
+                guide.finalise_guide(scheduler, builder.show_resolver)
+        if len(builder.guides) > 0:
+            await builder.build(scheduler)
+        if primary_pending:
+            for guide in sorted(pending_guides.values(), key=lambda guide: guide.is_primary_region()):
+                guide.finalise_guide(scheduler, builder.show_resolver)
+
+        return { **pending_guides, **builder.guides }
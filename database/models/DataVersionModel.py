@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, select, Text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session
+
+from database import Base
+
+
+class DataVersion(Base):
+    """
+    A counter for a set of data the API serves, bumped in the same transaction as every write to that data.\n
+    API responses are cached against the version of the data they were built from,
+    so a cached response is used until the data it was built from changes.
+    """
+    __tablename__ = 'DataVersion'
+
+    GUIDE = 'guide'
+    SHOWS = 'shows'
+
+    name: Mapped[str] = Column('name', Text, primary_key=True)
+    version: Mapped[int] = Column('version', Integer, nullable=False, default=0)
+
+    def __init__(self, name: str, version: int = 0):
+        super().__init__()
+        self.name = name
+        self.version = version
+
+    @staticmethod
+    def get_version(name: str, session: Session):
+        version = session.scalar(select(DataVersion.version).where(DataVersion.name == name))
+
+        return version or 0
+
+    @staticmethod
+    def bump(names: list[str], session: Session):
+        """
+        Increment the versions of the given data, without committing
+        """
+        query = insert(DataVersion).values([{ 'name': name, 'version': 1 } for name in names])
+        query = query.on_conflict_do_update(
+            index_elements=['name'],
+            set_={ 'version': DataVersion.version + 1 }
+        )
+        session.execute(query)
@@ -0,0 +1,96 @@
+from datetime import datetime
+from sqlalchemy import ARRAY, column, Column, DateTime, ForeignKey, func, Index, Integer, select, table, Text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session
+
+from database import Base
+
+
+class EpisodeAiring(Base):
+    """
+    An airing of a `ShowEpisode`, recorded when a guide with the episode is published.\n
+    Airings are only ever inserted, one row per airing, so recording an airing does not rewrite the episode's earlier airings.
+    An episode has at most one airing at a time, so recording the same airing again has no effect.
+    The airings of an episode are read through `ShowEpisode.air_dates`.
+    """
+    __tablename__ = 'EpisodeAiring'
+    __table_args__ = (
+        Index('ix_episode_airing_episode_aired_at', 'episode_id', 'aired_at', unique=True),
+        Index('ix_episode_airing_aired_at', 'aired_at'),
+    )
+
+    id: Mapped[int] = Column('id', Integer, primary_key=True, autoincrement=True)
+    episode_id: Mapped[int] = Column('episode_id', Integer, ForeignKey('ShowEpisode.id', ondelete='CASCADE'), nullable=False)
+    aired_at: Mapped[datetime] = Column('aired_at', DateTime, nullable=False)
+    channel: Mapped[str] = Column('channel', Text)
+    guide_episode_id: Mapped[int] = Column(
+        'guide_episode_id',
+        Integer,
+        ForeignKey('GuideEpisode.id', ondelete='SET NULL')
+    )
+
+    def __init__(self, episode_id: int, aired_at: datetime, channel: str, guide_episode_id: int = None):
+        super().__init__()
+        self.episode_id = episode_id
+        self.aired_at = aired_at
+        self.channel = channel
+        self.guide_episode_id = guide_episode_id
+
+    @staticmethod
+    def record_airings(airings: list[dict], session: Session):
+        """
+        Insert the given airings, skipping the ones that have already been recorded
+        """
+        if len(airings) == 0:
+            return
+
+        query = insert(EpisodeAiring).values(airings)
+        session.execute(query.on_conflict_do_nothing(index_elements=['episode_id', 'aired_at']))
+
+    @staticmethod
+    def get_earlier_channels(episode_ids: list[int], before: datetime, session: Session):
+        """
+        Return a dict mapping each of the given episodes to the channels it aired on before `before`.
+        Episodes that had not aired are not included.
+        """
+        if len(episode_ids) == 0:
+            return {}
+
+        query = select(EpisodeAiring.episode_id, EpisodeAiring.channel).where(
+            EpisodeAiring.episode_id.in_(episode_ids),
+            EpisodeAiring.aired_at < before
+        ).distinct()
+
+        earlier_channels: dict[int, set[str | None]] = {}
+        for episode_id, channel in session.execute(query):
+            earlier_channels.setdefault(episode_id, set()).add(channel)
+
+        return earlier_channels
+
+    @staticmethod
+    def get_airings_between(start: datetime, end: datetime, session: Session, episode_id: int = None):
+        """
+        Return the airings between `start` and `end`, optionally only those of one episode, in the order they aired
+        """
+        query = select(EpisodeAiring).where(EpisodeAiring.aired_at.between(start, end))
+        if episode_id is not None:
+            query = query.where(EpisodeAiring.episode_id == episode_id)
+        airings = session.scalars(query.order_by(EpisodeAiring.aired_at))
+
+        return [airing for airing in airings]
+
+    @staticmethod
+    def backfill(session: Session):
+        """
+        Record an airing for every date in the `air_dates` array the `ShowEpisode` table used to keep its airings in.\n
+        The arrays did not record the channel of each airing, so the backfilled airings have no channel.
+        """
+        legacy_episodes = table('ShowEpisode', column('id', Integer), column('air_dates', ARRAY(DateTime)))
+        legacy_airings = select(
+            legacy_episodes.c.id,
+            func.unnest(legacy_episodes.c.air_dates).label('aired_at')
+        ).where(legacy_episodes.c.air_dates.is_not(None))
+
+        query = insert(EpisodeAiring).from_select(['episode_id', 'aired_at'], legacy_airings)
+        session.execute(query.on_conflict_do_nothing(index_elements=['episode_id', 'aired_at']))
+        session.commit()
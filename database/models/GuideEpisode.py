@@ -1,16 +1,20 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, insert, Integer, select, Text, update
-from sqlalchemy.orm import Mapped, relationship, Session
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, or_, select, Text
+from sqlalchemy.orm import Mapped, relationship, selectinload, Session
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import TYPE_CHECKING
 import logging
 
+from aux_methods.types import ShowData
 from database import Base
+from database.models.DataVersionModel import DataVersion
 from database.models.ShowDetailsModel import ShowDetails
 from database.models.ShowEpisodeModel import ShowEpisode
 
 if TYPE_CHECKING:
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from aux_methods.types import ResolvedShow
     from database.models import Reminder, ShowDetails, ShowEpisode
 
 
@@ -27,6 +31,7 @@ class GuideEpisode(Base):
     episode_number = Column('episode_number', Integer)
     episode_title = Column('episode_title', Text)
     repeat = Column('repeat', Boolean)
+    airing_status = Column('airing_status', Text)
     db_event = Column('db_event', Text)
     show_id = Column('show_id', Integer, ForeignKey('ShowDetails.id'))
     episode_id = Column('episode_id', Integer, ForeignKey('ShowEpisode.id'))
@@ -35,6 +40,11 @@ class GuideEpisode(Base):
     show_episode: Mapped['ShowEpisode'] = relationship('ShowEpisode', back_populates='guide_episodes', uselist=False)
     reminder: Mapped['Reminder'] = relationship('Reminder', back_populates='guide_episodes', uselist=False)
 
+    FIRST_AIRING = 'first_airing'
+    REPEAT = 'repeat'
+    FIRST_ON_CHANNEL = 'first_on_channel'
+    SIMULCAST = 'simulcast'
+
     logger = logging.getLogger("GuideEpisode")
     logger.setLevel(logging.DEBUG)
 
@@ -66,47 +76,229 @@ class GuideEpisode(Base):
         self.reminder_id = reminder_id
 
     @staticmethod
-    def get_shows_for_date(date: datetime, session: Session):
+    def get_shows_for_date(date: datetime, session: Session, region: str = None):
+        from database.models.GuideModel import Guide
         end_date = date + timedelta(days=1)
 
         query = select(GuideEpisode).where(GuideEpisode.start_time.between(date, end_date))
+        if region is not None:
+            region_filter = Guide.region == region
+            if region == Guide.PRIMARY_REGION:
+                region_filter = or_(region_filter, Guide.region.is_(None))
+            query = query.join(Guide, Guide.id == GuideEpisode.guide_id).where(region_filter)
         guide_episodes = session.scalars(query)
 
         return [guide_episode for guide_episode in guide_episodes]
+
+    @staticmethod
+    def get_episodes_for_guide(guide_id: int, session: Session):
+        query = (
+            select(GuideEpisode)
+            .where(GuideEpisode.guide_id == guide_id)
+            .options(
+                selectinload(GuideEpisode.show_details),
+                selectinload(GuideEpisode.show_episode),
+                selectinload(GuideEpisode.reminder)
+            )
+            .order_by(GuideEpisode.start_time, GuideEpisode.channel)
+        )
+
+        return list(session.scalars(query))
+
+    @staticmethod
+    def export_query(show: str = None, start: datetime = None, end: datetime = None):
+        """
+        The query the catalogue export streams the guide history with, in the order the episodes aired.\n
+        The history can be limited to the episodes of the show titled `show`, and to the episodes starting from `start` and before `end`.
+        """
+        from database.models.GuideModel import Guide
+
+        query = (
+            select(
+                GuideEpisode.id,
+                Guide.region,
+                GuideEpisode.title,
+                GuideEpisode.channel,
+                GuideEpisode.start_time,
+                GuideEpisode.end_time,
+                GuideEpisode.season_number,
+                GuideEpisode.episode_number,
+                GuideEpisode.episode_title,
+                GuideEpisode.repeat,
+                GuideEpisode.airing_status,
+                GuideEpisode.show_id,
+                GuideEpisode.episode_id
+            )
+            .join(Guide, GuideEpisode.guide_id == Guide.id)
+            .order_by(GuideEpisode.start_time, GuideEpisode.id)
+        )
+        if show is not None:
+            query = query.where(
+                GuideEpisode.show_id == select(ShowDetails.id).where(ShowDetails.title == show).scalar_subquery()
+            )
+        if start is not None:
+            query = query.where(GuideEpisode.start_time >= start)
+        if end is not None:
+            query = query.where(GuideEpisode.start_time < end)
+
+        return query
     
     def add_episode(self, session: Session):
         session.add(self)
+        DataVersion.bump([DataVersion.GUIDE], session)
         session.commit()
 
     def update_episode(self, field: str, value: str | int | datetime, session: Session):
         setattr(self, field, value)
+        DataVersion.bump([DataVersion.GUIDE], session)
         session.commit()
 
     def delete_episode(self, session: Session):
         session.delete(self)
+        DataVersion.bump([DataVersion.GUIDE], session)
         session.commit()
 
-    def check_repeat(self, session: Session):
-        if self.show_episode:
-            self.repeat = len(self.show_episode.air_dates) > 0
-        else:
+    def apply_resolution(self, resolved_show: 'ResolvedShow'):
+        """
+        Link this episode to the `ShowDetails`, `ShowEpisode` and `Reminder` it was resolved to,
+        taking the episode details from the `ShowEpisode` if one was found.\n
+        The relationships are set without cascading, so the resolved rows are not added to the session through this episode.
+        """
+        show_details, show_episode, reminder = (
+            resolved_show['show_details'],
+            resolved_show['show_episode'],
+            resolved_show['reminder']
+        )
+        if show_episode is not None:
+            self.season_number = show_episode.season_number
+            self.episode_number = show_episode.episode_number
+            self.episode_title = show_episode.episode_title
+        self.show_id = show_details.id if show_details is not None else None
+        self.episode_id = show_episode.id if show_episode is not None else None
+        self.reminder_id = reminder.id if reminder is not None else None
+        set_committed_value(self, 'show_details', show_details)
+        set_committed_value(self, 'show_episode', show_episode)
+        set_committed_value(self, 'reminder', reminder)
+
+    def update_listing(self, show: ShowData, resolved_show: 'ResolvedShow'):
+        """
+        Bring this episode in line with the latest listing for its time slot and that listing's resolved details.\n
+        Returns whether any of the episode's stored fields changed.
+        """
+        previous_values = self.insert_values()
+        self.end_time = show.end_time
+        self.season_number = show.season_number
+        self.episode_number = show.episode_number
+        self.episode_title = show.episode_title
+        self.apply_resolution(resolved_show)
+        return self.insert_values() != previous_values
+
+    def listing_key(self):
+        """
+        The key an episode is matched to its listing by when a guide is rebuilt
+        """
+        return (self.channel, self.start_time, self.title)
+
+    def show_data(self):
+        return ShowData(
+            self.title,
+            self.channel,
+            self.start_time,
+            self.end_time,
+            self.season_number,
+            self.episode_number,
+            self.episode_title
+        )
+
+    def record_airing(self, capture_event: bool = True):
+        """
+        Capture the airing as a database event, unless it is on an HD channel or `capture_event` is `False`.\n
+        Whether the airing is a repeat is set for the whole guide at once by `GuideEpisode.classify_airings`.
+        """
+        if capture_event and 'HD' not in self.channel:
+            self.capture_db_event()
+
+    @staticmethod
+    def classify_airings(guide_episodes: list['GuideEpisode'], session: Session):
+        """
+        Set the `airing_status` and `repeat` of a day's `GuideEpisode`s, using one query for the earlier airings of their episodes.\n
+        An airing is a simulcast if its episode is on earlier in the day, or at the same time on another channel.
+        Otherwise it is the episode's first airing, a repeat, or the first time the episode is on the airing's channel,
+        depending on the `EpisodeAiring`s recorded before the day's first show.\n
+        Returns the episodes whose status changed.
+        """
+        from database.models.EpisodeAiringModel import EpisodeAiring
+
+        if len(guide_episodes) == 0:
+            return []
+
+        first_start_time = min(guide_episode.start_time for guide_episode in guide_episodes)
+        earlier_channels = EpisodeAiring.get_earlier_channels(
+            [
+                guide_episode.show_episode.id
+                for guide_episode in guide_episodes
+                if guide_episode.show_episode is not None and guide_episode.show_episode.id is not None
+            ],
+            first_start_time,
+            session
+        )
+
+        def episode_channels(show_episode: ShowEpisode):
+            if show_episode.id is not None:
+                return earlier_channels.get(show_episode.id, set())
+            # an episode that has not been saved yet only has the airings given to it in memory
+            return { None } if any(air_date < first_start_time for air_date in show_episode.air_dates) else set()
+
+        aired_today: dict[int, GuideEpisode] = {}
+        changed_episodes: list[GuideEpisode] = []
+        for guide_episode in sorted(guide_episodes, key=lambda guide_episode: (guide_episode.start_time, guide_episode.channel)):
+            show_episode = guide_episode.show_episode
+            previous_status = (guide_episode.airing_status, guide_episode.repeat)
+            if show_episode is None:
+                guide_episode.classify_airing(set(), None)
+            else:
+                guide_episode.classify_airing(episode_channels(show_episode), aired_today.get(id(show_episode)))
+                aired_today.setdefault(id(show_episode), guide_episode)
+            if (guide_episode.airing_status, guide_episode.repeat) != previous_status:
+                changed_episodes.append(guide_episode)
+
+        return changed_episodes
+
+    def classify_airing(self, earlier_channels: set[str | None], earlier_airing: GuideEpisode | None):
+        """
+        Set this airing's `airing_status` and `repeat` from the channels its episode aired on before the day,
+        and the airing of the episode earlier in the day, if there is one.
+        Earlier airings without a channel were recorded before airings kept their channel.
+        """
+        if earlier_airing is not None:
+            self.airing_status = GuideEpisode.SIMULCAST
+            self.repeat = earlier_airing.repeat
+        elif len(earlier_channels) == 0:
+            self.airing_status = GuideEpisode.FIRST_AIRING
             self.repeat = False
-        session.commit()
+        elif self.channel in earlier_channels or None in earlier_channels:
+            self.airing_status = GuideEpisode.REPEAT
+            self.repeat = True
+        else:
+            self.airing_status = GuideEpisode.FIRST_ON_CHANNEL
+            self.repeat = True
 
-    def capture_db_event(self, session: Session):
+    def capture_db_event(self):
+        """
+        Record this airing against the episode's `ShowEpisode`, creating the `ShowDetails` and `ShowEpisode` if they do not exist yet.\n
+        Changes are only made in memory. They are written to the database when the guide is saved.
+        """
 
         def create_show_details():
-            show_details = ShowDetails(
+            return ShowDetails(
                 self.title,
                 '',
                 '',
                 [],
                 ''
             )
-            show_details.add_show(session)
-            return show_details
         def create_show_episode():
-            show_episode = ShowEpisode(
+            return ShowEpisode(
                 self.title,
                 self.season_number,
                 self.episode_number,
@@ -114,59 +306,58 @@ class GuideEpisode(Base):
                 '',
                 [],
                 [self.channel],
-                [self.start_time],
-                self.show_details.id
+                show_id=self.show_details.id
             )
-            show_episode.add_episode(session)
-            return show_episode
 
         if self.show_episode and self.show_details:
-            events = {}
-
-            air_dates = self.show_episode.air_dates
-            air_dates.append(self.start_time)
-            events["air_dates"] = air_dates
-
             episode_details = f"""Season {self.season_number} Episode {self.episode_number} ({self.episode_title})"""
             self.db_event = f"{episode_details} has aired today"
             if not self.show_episode.channel_check(self.channel):
                 self.show_episode.channels.append(self.channel)
-                events["channels"] = self.show_episode.channels
                 self.db_event = self.show_episode.add_channel(self.channel)
-            statement = update(ShowEpisode).where(ShowEpisode.id == self.episode_id).values(events)
         elif self.show_details is None and self.show_episode is None:
             self.show_details = create_show_details()
             self.show_episode = create_show_episode()
-            
-            show_details_insert_values = self.show_details.to_dict()
-            show_episode_insert_values = self.show_episode.to_dict()
-            del show_episode_insert_values['id']
-
-            show_details_statement = insert(ShowDetails).values(show_details_insert_values)
-            statement = insert(ShowEpisode).values(show_episode_insert_values)
-
-            session.execute(show_details_statement)
             self.db_event = "This show is now being recorded"
         elif self.show_episode is None and self.show_details is not None:
             self.show_episode = create_show_episode()
 
-            show_episode_insert_values = self.show_episode.to_dict()
-            del show_episode_insert_values['id']
-            
-            statement = insert(ShowEpisode).values(show_episode_insert_values)
-            
             episode_details = f"Season {self.season_number} Episode {self.episode_number} ({self.episode_title})"
             self.db_event = f"{episode_details} has been inserted"
         else:
             self.show_details = create_show_details()
-
-            show_details_insert_values = self.show_details.to_dict()
-
-            statement = insert(ShowDetails).values(show_details_insert_values)
             self.db_event = "This show is now being recorded"
 
-        session.execute(statement)
-        session.commit()
+    def airing_values(self):
+        """
+        The `EpisodeAiring` values for this airing, or `None` if the airing was not recorded against its `ShowEpisode`
+        """
+        if self.db_event is None or self.show_details is None or self.show_episode is None:
+            return None
+        return {
+            'episode_id': self.show_episode.id,
+            'aired_at': self.start_time,
+            'channel': self.channel,
+            'guide_episode_id': self.id
+        }
+
+    def insert_values(self):
+        return {
+            'guide_id': self.guide_id,
+            'title': self.title,
+            'channel': self.channel,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'season_number': self.season_number,
+            'episode_number': self.episode_number,
+            'episode_title': self.episode_title,
+            'repeat': self.repeat,
+            'airing_status': self.airing_status,
+            'db_event': self.db_event,
+            'show_id': self.show_id,
+            'episode_id': self.episode_id,
+            'reminder_id': self.reminder_id
+        }
 
     def message_string(self):
         """
@@ -178,7 +369,11 @@ class GuideEpisode(Base):
         if self.episode_title != '':
             message += f': {self.episode_title}'
         message += ')'
-        if self.repeat:
+        if self.airing_status == GuideEpisode.SIMULCAST:
+            message = f'{message} (Simulcast)'
+        elif self.airing_status == GuideEpisode.FIRST_ON_CHANNEL:
+            message = f'{message} (Repeat, first time on {self.channel})'
+        elif self.repeat:
             message = f'{message} (Repeat)'
 
         return message
@@ -207,6 +402,7 @@ class GuideEpisode(Base):
             'episode_number': self.episode_number,
             'episode_title': self.episode_title,
             'repeat': self.repeat,
+            'airing_status': self.airing_status,
             'db_event': self.db_event
         }
 
@@ -1,22 +1,33 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer
-from sqlalchemy.orm import Mapped, Session
-from sqlalchemy.exc import OperationalError, PendingRollbackError
+from datetime import datetime, timedelta
+from sqlalchemy import Column, DateTime, delete, insert, Integer, or_, select, Text, update
+from sqlalchemy.orm import Mapped, object_session, reconstructor, Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import TYPE_CHECKING
+from urllib.parse import quote
 import json
 import logging
+import os
 
 from aux_methods.helper_methods import build_episode, convert_utc_to_local, show_data_to_file
-from aux_methods.types import ShowData
+from aux_methods.types import GuideListing, ResolvedShow, ShowData
 from database import Base
+from database.models.DataVersionModel import DataVersion
+from database.models.EpisodeAiringModel import EpisodeAiring
 from database.models.GuideEpisode import GuideEpisode
 from database.models.ReminderModel import Reminder
 from database.models.SearchItemModel import SearchItem
 from database.models.ShowDetailsModel import ShowDetails
 from database.models.ShowEpisodeModel import ShowEpisode
-from data_validation.validation import Validation
 from services.APIClient import APIClient
-from utils import parse_datetime
+from services.AsyncAPIClient import AsyncAPIClient
+from services.SnapshotStore import SnapshotStore
+from utils.guide_listing_parser import GuideListingParser, listings_from_schedule
+from utils.timestamp_parser import TimestampParser
+from utils.title_matcher import TitleMatcher
+
+if TYPE_CHECKING:
+    from database.show_resolver import ShowResolver
 
 
 class Guide(Base):
@@ -24,122 +35,282 @@ class Guide(Base):
 
     id: Mapped[int] = Column('id', Integer, primary_key=True, autoincrement=True)
     date: Mapped[datetime] = Column('date', DateTime)
+    status: Mapped[str] = Column('status', Text)
+    region: Mapped[str] = Column('region', Text)
+
+    PENDING = 'pending'
+    PUBLISHED = 'published'
+
+    PRIMARY_REGION = 'Sydney'
+    REGIONS = {
+        'Sydney': 'Australia/Sydney',
+        'Melbourne': 'Australia/Melbourne',
+        'Brisbane': 'Australia/Brisbane',
+        'Perth': 'Australia/Perth',
+        'Adelaide': 'Australia/Adelaide'
+    }
 
     logger = logging.getLogger("Guide")
+    source_data_timeout = 30
+    source_parsers = { 'fta': GuideListingParser }
     
-    def __init__(self, date: datetime, session: Session):
+    def __init__(self, date: datetime, session: Session, region: str = PRIMARY_REGION):
         self.date = date
+        self.region = region
+        self.status = Guide.PUBLISHED
         self.fta_shows = []
         self.bbc_shows = []
         self.session = session
+        self.source_data: dict[str, dict | list] = None
+        self.removed_shows: list[GuideEpisode] = []
+        self.unchanged_shows: set[int] = set()
+
+    @reconstructor
+    def init_on_load(self):
+        if self.region is None:
+            self.region = Guide.PRIMARY_REGION
+        self.fta_shows = []
+        self.bbc_shows = []
+        self.session = object_session(self)
+        self.source_data = None
+        self.removed_shows = []
+        self.unchanged_shows = set()
+
+    @staticmethod
+    def get_guide_for_date(date: datetime, session: Session, region: str = PRIMARY_REGION):
+        """
+        Return the latest guide built for the day of `date` in the given `region`, or `None` if there isn't one
+        """
+        start_of_day = datetime(date.year, date.month, date.day)
+        region_filter = Guide.region == region
+        if region == Guide.PRIMARY_REGION:
+            region_filter = or_(region_filter, Guide.region.is_(None))
+        query = (
+            select(Guide)
+            .where(Guide.date >= start_of_day, Guide.date < start_of_day + timedelta(days=1), region_filter)
+            .order_by(Guide.id.desc())
+            .limit(1)
+        )
+
+        return session.scalar(query)
+
+    @staticmethod
+    def configured_regions():
+        """
+        The regions guides are built for, from the comma separated `GUIDE_REGIONS` environment variable.\n
+        The primary region is always included.
+        """
+        regions = [region.strip() for region in os.getenv('GUIDE_REGIONS', Guide.PRIMARY_REGION).split(',') if region.strip()]
+        unknown_regions = [region for region in regions if region not in Guide.REGIONS]
+        if len(unknown_regions) > 0:
+            raise ValueError(f"Unknown guide regions: {', '.join(unknown_regions)}")
+        if Guide.PRIMARY_REGION not in regions:
+            regions.insert(0, Guide.PRIMARY_REGION)
+        return regions
+
+    @property
+    def timezone(self):
+        return Guide.REGIONS[self.region]
+
+    def is_primary_region(self):
+        """
+        Whether airings are recorded for this guide. Only the primary region records them,
+        so an episode shown in every region is not recorded once per region.
+        """
+        return self.region == Guide.PRIMARY_REGION
 
     def add_guide(self):
         self.session.add(self)
+        DataVersion.bump([DataVersion.GUIDE], self.session)
         self.session.commit()
 
     def delete_guide(self):
+        self.session.execute(delete(GuideEpisode).where(GuideEpisode.guide_id == self.id))
         self.session.delete(self)
+        DataVersion.bump([DataVersion.GUIDE], self.session)
         self.session.commit()
 
-    def search_free_to_air(self):
+    def search_free_to_air(self, capture_events: bool = True):
         """
-
+        Search the free to air schedule for the shows in the search list, resolving the details of each show found.\n
+        If `capture_events` is `False`, the airings are not recorded and shows without `ShowDetails` are kept,
+        so the guide can be staged ahead of its date and finalised later.
         """
+        title_matcher = TitleMatcher(SearchItem.get_active_searches(self.session))
+        shows_data = self.match_free_to_air(title_matcher)
 
-        shows_data: list[ShowData] = []
+        # show_data_to_file(shows_data)
 
-        schedule = self.get_source_data(
-            f"https://cdn.iview.abc.net.au/epg/processed/Sydney_{self.date.strftime('%Y-%m-%d')}.json"
-        )['schedule']
-        search_list = SearchItem.get_active_searches(self.session)
+        from database.show_resolver import ShowResolver
+        show_resolver = ShowResolver(self.session)
+        resolved_shows = show_resolver.resolve(shows_data)
+        shows_on, shows_not_found = self.build_guide_episodes(shows_data, resolved_shows, capture_events, show_resolver)
+        
+        if len(shows_not_found) > 0:
+            from services.hermes.hermes import hermes
+            hermes.dispatch("show_details_not_found", shows_not_found)
+        
+        return shows_on
 
-        for channel_data in schedule:
-            for guide_show in channel_data['listing']:
-                title: str = guide_show['title']
-                for search_item in search_list:
-                    if "bumblebee" in title.lower():
-                        title = "Transformers: Cyberverse"
-                    if search_item.show.lower() in title.lower():
-                        start_time = datetime.strptime(guide_show['start_time'], '%Y-%m-%dT%H:%M:%S')
-                        end_time = datetime.strptime(guide_show['end_time'], '%Y-%m-%dT%H:%M:%S')
-                        season_number = -1
-                        episode_number = 0
-                        episode_title = ''
-                        if 'series_num' in guide_show and 'episode_num' in guide_show:
-                            season_number = int(guide_show['series_num'])
-                            episode_number = int(guide_show['episode_num'])
-                        if 'episode_title' in guide_show:
-                            episode_title = guide_show['episode_title']
-                        episodes = build_episode(
-                            guide_show['title'],
-                            channel_data['channel'],
-                            start_time,
-                            end_time,
-                            season_number,
-                            episode_number,
-                            episode_title
-                        )
-                        episodes = [episode for episode in episodes if search_item.check_search_conditions(episode)]
-                        shows_data.extend(episodes)
+    def match_free_to_air(self, title_matcher: TitleMatcher):
+        """
+        Return the free to air listings that match a search item, sorted by start time and channel.\n
+        No database queries are made, so every region is matched against the one catalog of search items
+        resolved by the `title_matcher`, one region after another.
+        """
+        shows_data: list[ShowData] = []
 
-        shows_data = [dict(t) for t in {tuple(d.items()) for d in shows_data}]
+        for listing in self.get_fta_listings():
+            title = listing.title
+            if "bumblebee" in title.lower():
+                title = "Transformers: Cyberverse"
+            search_items = title_matcher.match(title)
+            if len(search_items) == 0:
+                continue
+            season_number = -1
+            episode_number = 0
+            episode_title = ''
+            if listing.series_num is not None and listing.episode_num is not None:
+                season_number = int(listing.series_num)
+                episode_number = int(listing.episode_num)
+            if listing.episode_title is not None:
+                episode_title = listing.episode_title
+            episodes = build_episode(
+                listing.title,
+                listing.channel,
+                listing.start_time,
+                listing.end_time,
+                season_number,
+                episode_number,
+                episode_title
+            )
+            for search_item in search_items:
+                shows_data.extend(episode for episode in episodes if search_item.check_search_conditions(episode))
+
+        shows_data = list(dict.fromkeys(shows_data))
         
-        shows_data.sort(key=lambda show: (show['start_time'], show['channel']))
+        shows_data.sort(key=lambda show: (show.start_time, show.channel))
 
-        # show_data_to_file(shows_data)
+        return shows_data
 
+    def build_guide_episodes(
+        self,
+        shows_data: list[ShowData],
+        resolved_shows: dict[tuple[str, int, int, str], ResolvedShow],
+        capture_events: bool = True,
+        show_resolver: 'ShowResolver' = None
+    ):
+        """
+        Create the `GuideEpisode`s for the matched shows from their resolved details.\n
+        Returns a tuple of the `GuideEpisode`s and the shows that have no `ShowDetails`.
+        Airings are only recorded against the episodes when the guide is for the primary region.
+        The `ShowEpisode`s created while recording airings are added to `show_resolver`,
+        so later airings of the same episode are matched to it.
+        """
         shows_on: list['GuideEpisode'] = []
         shows_not_found: list[ShowData] = []
 
         for show in shows_data:
-            show_details = ShowDetails.get_show_by_title(show['title'], self.session)
-            if show_details:
-                show_episode = ShowEpisode.search_for_episode(
-                    show['title'],
-                    show['season_number'],
-                    show['episode_number'],
-                    show['episode_title'],
-                    self.session
-                )
-                reminder = Reminder.get_reminder_by_show(show['title'], self.session)
-                guide_episode = GuideEpisode(
-                    show['title'],
-                    show['channel'],
-                    show['start_time'],
-                    show['end_time'],
-                    show_episode.season_number if show_episode is not None else show['season_number'],
-                    show_episode.episode_number if show_episode is not None else show['episode_number'],
-                    show_episode.episode_title if show_episode is not None else show['episode_title'],
-                    self.id,
-                    show_details.id,
-                    show_episode.id if show_episode is not None else None,
-                    reminder.id if reminder is not None else None
-                )
-                guide_episode.add_episode(self.session)
-                guide_episode.check_repeat(self.session)
-                if 'HD' not in guide_episode.channel:
-                    guide_episode.capture_db_event(self.session)
-                shows_on.append(guide_episode)
+            resolved_show = resolved_shows[show.resolution_key]
+            if resolved_show['show_details'] or not capture_events:
+                shows_on.append(self.create_guide_episode(show, resolved_show, capture_events, show_resolver))
             else:
                 shows_not_found.append(show)
-        
-        if len(shows_not_found) > 0:
-            from services.hermes.hermes import hermes
-            hermes.dispatch("show_details_not_found", shows_not_found)
-        
-        return shows_on
+
+        self.classify_airings(shows_on)
+
+        return shows_on, shows_not_found
+
+    def create_guide_episode(
+        self,
+        show: ShowData,
+        resolved_show: ResolvedShow,
+        capture_events: bool = True,
+        show_resolver: 'ShowResolver' = None
+    ):
+        guide_episode = GuideEpisode(
+            show.title,
+            show.channel,
+            show.start_time,
+            show.end_time,
+            show.season_number,
+            show.episode_number,
+            show.episode_title,
+            self.id,
+            None
+        )
+        guide_episode.apply_resolution(resolved_show)
+        if capture_events:
+            guide_episode.record_airing(self.is_primary_region())
+            Guide.share_created_episode(guide_episode, show_resolver)
+        return guide_episode
+
+    @staticmethod
+    def share_created_episode(guide_episode: 'GuideEpisode', show_resolver: 'ShowResolver' = None):
+        if show_resolver is not None and guide_episode.show_episode is not None and guide_episode.show_episode.id is None:
+            show_resolver.add_episode(guide_episode.show_episode)
+
+    def refresh_guide_episodes(
+        self,
+        shows_data: list[ShowData],
+        resolved_shows: dict[tuple[str, int, int, str], ResolvedShow],
+        capture_events: bool = True,
+        show_resolver: 'ShowResolver' = None
+    ):
+        """
+        Rebuild a guide that has already been saved by comparing the matched shows with its stored `GuideEpisode`s.\n
+        Shows and episodes are paired by channel, start time and title. Shows without an episode are created,
+        episodes without a show are marked for removal, and paired episodes are only written if one of their fields changed.
+        Airings are only recorded for new episodes, or episodes now linked to a different `ShowEpisode`,
+        so running the rebuild again does not record the same airing twice.\n
+        Returns a tuple of the `GuideEpisode`s and the shows that have no `ShowDetails`, like `build_guide_episodes`.
+        """
+        stored_episodes: dict[tuple[str, datetime, str], GuideEpisode] = {}
+        self.removed_shows = []
+        self.unchanged_shows = set()
+        for guide_episode in GuideEpisode.get_episodes_for_guide(self.id, self.session):
+            self.session.expunge(guide_episode)
+            if guide_episode.listing_key() in stored_episodes:
+                self.removed_shows.append(guide_episode)
+            else:
+                stored_episodes[guide_episode.listing_key()] = guide_episode
+
+        shows_on: list['GuideEpisode'] = []
+        shows_not_found: list[ShowData] = []
+        for show in shows_data:
+            resolved_show = resolved_shows[show.resolution_key]
+            if not resolved_show['show_details'] and capture_events:
+                shows_not_found.append(show)
+                continue
+            guide_episode = stored_episodes.pop(show.listing_key, None)
+            if guide_episode is None:
+                shows_on.append(self.create_guide_episode(show, resolved_show, capture_events, show_resolver))
+                continue
+            previous_episode_id = guide_episode.episode_id
+            if not guide_episode.update_listing(show, resolved_show):
+                self.unchanged_shows.add(guide_episode.id)
+            elif capture_events and guide_episode.episode_id != previous_episode_id:
+                guide_episode.record_airing(self.is_primary_region())
+                Guide.share_created_episode(guide_episode, show_resolver)
+            shows_on.append(guide_episode)
+
+        self.removed_shows.extend(stored_episodes.values())
+        self.classify_airings(shows_on)
+
+        return shows_on, shows_not_found
+
+    def classify_airings(self, guide_episodes: list['GuideEpisode']):
+        """
+        Classify the guide's airings as first airings, repeats or simulcasts, in one query for the whole guide.
+        Episodes of a refreshed guide whose classification changed are written when the guide is saved.
+        """
+        changed_episodes = GuideEpisode.classify_airings(guide_episodes, self.session)
+        self.unchanged_shows.difference_update(guide_episode.id for guide_episode in changed_episodes)
 
     def search_bbc_australia(self):
 
-        current_date = Validation.get_current_date().date()
-        search_date = current_date.strftime('%Y-%m-%d')
-        
-        bbc_first_data = self.get_source_data(
-            f'https://www.bbcstudios.com.au/smapi/schedule/au/bbc-first?timezone=Australia%2FSydney&date={search_date}'
-        )
-        bbc_uktv_data = self.get_source_data(
-            f'https://www.bbcstudios.com.au/smapi/schedule/au/bbc-uktv?timezone=Australia%2FSydney&date={search_date}'
-        )
+        bbc_first_data = self.get_prefetched_source_data('bbc_first') or []
+        bbc_uktv_data = self.get_prefetched_source_data('bbc_uktv') or []
 
         search_list = SearchItem.get_active_searches(self.session)
 
@@ -151,7 +322,7 @@ class Guide(Base):
                     title: str = show['show']['title']
                     if title.lower() == search_item.show.lower():
                         guide_start = datetime.strptime(show['start'], '%Y-%m-%d %H:%M:%S')
-                        start_time = convert_utc_to_local(guide_start)
+                        start_time = convert_utc_to_local(guide_start, self.timezone)
                         series_num = show['episode']['series']['number']
                         episode_num = show['episode']['number']
                         episode_title = show['episode']['title']
@@ -173,13 +344,13 @@ class Guide(Base):
         shows_on: list['GuideEpisode'] = []
         for show in show_list:
             guide_episode = GuideEpisode(
-                show['title'],
-                show['channel'],
-                show['start_time'],
-                show['start_time'],
-                show['season_number'],
-                show['episode_number'],
-                show['episode_title']
+                show.title,
+                show.channel,
+                show.start_time,
+                show.start_time,
+                show.season_number,
+                show.episode_number,
+                show.episode_title
             )
             # guide_show = Guide.build_guide_show(show, show_list, database_service)
 
@@ -188,11 +359,67 @@ class Guide(Base):
 
         return shows_on
     
-    def get_source_data(self, endpoint: str = None):
+    def source_endpoints(self):
+        """
+        The endpoints of each source the guide is built from, keyed by the name of the source
+        """
+        search_date = self.date.strftime('%Y-%m-%d')
+        timezone = quote(self.timezone, safe='')
+
+        return {
+            'fta': f"https://cdn.iview.abc.net.au/epg/processed/{self.region}_{search_date}.json",
+            'bbc_first': f'https://www.bbcstudios.com.au/smapi/schedule/au/bbc-first?timezone={timezone}&date={search_date}',
+            'bbc_uktv': f'https://www.bbcstudios.com.au/smapi/schedule/au/bbc-uktv?timezone={timezone}&date={search_date}'
+        }
+
+    async def fetch_source_data(self):
+        """
+        Download the data for every source concurrently, so fetching takes as long as the slowest source.\n
+        Sources are read through the local `SnapshotStore`, which serves the last snapshot if a source is down.
+        A source that still fails to download is reported and left out, without affecting the other sources.
+        """
+        api_client = AsyncAPIClient(timeout=Guide.source_data_timeout, snapshot_store=SnapshotStore.from_env())
+        self.source_data, errors = await api_client.get_all(
+            self.source_endpoints(),
+            snapshot_date=self.date,
+            stream_parsers=Guide.source_parsers
+        )
+
+        if len(errors) > 0:
+            from services.hermes.hermes import hermes
+            for source, error in errors.items():
+                Guide.logger.error(f"Could not fetch the {source} guide data: {str(error)}")
+                hermes.dispatch('guide_data_fetch_failed', str(error))
+
+    def get_prefetched_source_data(self, source: str):
+        """
+        Return the data for the given `source` downloaded by `fetch_source_data`.\n
+        If the sources have not been fetched, the data is downloaded now.
+        """
+        if self.source_data is None:
+            return self.get_source_data(self.source_endpoints()[source], Guide.source_parsers.get(source))
+        return self.source_data.get(source)
+
+    def get_fta_listings(self) -> list[GuideListing]:
+        """
+        Return the free to air listings, whether the source was streamed into `GuideListing`s or decoded in full.\n
+        The start and end times of every listing in the feed are parsed together, before any listing is matched.
+        """
+        fta_data = self.get_prefetched_source_data('fta')
+        if not fta_data:
+            return []
+        if isinstance(fta_data, dict):
+            fta_data = listings_from_schedule(fta_data['schedule'])
+        return TimestampParser().parse_listings(fta_data)
+
+    def get_source_data(self, endpoint: str = None, stream_parser: type[GuideListingParser] = None):
         if endpoint:
             try:
                 api_client = APIClient()
-                schedule = api_client.get(endpoint)
+                snapshot_store = SnapshotStore.from_env()
+                if snapshot_store is not None:
+                    return api_client.get_snapshot(endpoint, snapshot_store, self.date, stream_parser=stream_parser)
+                schedule = api_client.get(endpoint, stream_parser=stream_parser)
                 return schedule
             except Exception as error:
                 from services.hermes.hermes import hermes
@@ -202,21 +429,171 @@ class Guide(Base):
                 schedule = json.load(fd)
             return schedule
     
+    def save_guide(self):
+        """
+        Write the guide to the database in a single transaction, along with its `GuideEpisode`s
+        and the `ShowDetails` and `ShowEpisode` changes captured while the guide was built.\n
+        Rows are written with bulk inserts and updates, so nothing is written if any of them fail.
+        `GuideEpisode`s that were staged with the guide are updated rather than inserted.
+        When the guide was refreshed, its unchanged `GuideEpisode`s are not written and its removed ones are deleted.
+        The shows that have new `ShowEpisode`s have their latest episode updated.
+        Each airing recorded while the guide was built is inserted as an `EpisodeAiring`.
+        The guide and show data versions are bumped, so the API's cached responses are rebuilt.
+        """
+        new_show_details: dict[int, ShowDetails] = {}
+        new_show_episodes: dict[int, tuple[ShowEpisode, ShowDetails]] = {}
+        aired_show_episodes: dict[int, ShowEpisode] = {}
+        for guide_episode in self.fta_shows:
+            show_details, show_episode = guide_episode.show_details, guide_episode.show_episode
+            if show_details is not None and show_details.id is None:
+                new_show_details[id(show_details)] = show_details
+            if show_episode is not None and show_episode.id is None:
+                new_show_episodes[id(show_episode)] = (show_episode, show_details)
+            elif show_episode is not None and guide_episode.db_event is not None:
+                aired_show_episodes[show_episode.id] = show_episode
+
+        self.session.add(self)
+        self.session.flush()
+        DataVersion.bump([DataVersion.GUIDE, DataVersion.SHOWS], self.session)
+
+        if len(new_show_details) > 0:
+            show_details_ids = self.session.scalars(
+                insert(ShowDetails).returning(ShowDetails.id, sort_by_parameter_order=True),
+                [show_details.to_dict() for show_details in new_show_details.values()]
+            ).all()
+            for show_details, show_details_id in zip(new_show_details.values(), show_details_ids):
+                show_details.id = show_details_id
+
+        if len(new_show_episodes) > 0:
+            show_episode_values = []
+            for show_episode, show_details in new_show_episodes.values():
+                show_episode.show_id = show_details.id
+                show_episode_values.append(show_episode.insert_values())
+            show_episode_ids = self.session.scalars(
+                insert(ShowEpisode).returning(ShowEpisode.id, sort_by_parameter_order=True),
+                show_episode_values
+            ).all()
+            for (show_episode, _), show_episode_id in zip(new_show_episodes.values(), show_episode_ids):
+                show_episode.id = show_episode_id
+            ShowDetails.update_latest_episodes(
+                [show_episode.show_id for show_episode, _ in new_show_episodes.values()],
+                self.session
+            )
+
+        if len(aired_show_episodes) > 0:
+            self.session.execute(
+                update(ShowEpisode),
+                [
+                    {
+                        'id': show_episode.id,
+                        'channels': show_episode.channels
+                    }
+                    for show_episode in aired_show_episodes.values()
+                ]
+            )
+
+        for guide_episode in self.fta_shows:
+            guide_episode.guide_id = self.id
+            guide_episode.show_id = guide_episode.show_details.id if guide_episode.show_details else None
+            guide_episode.episode_id = guide_episode.show_episode.id if guide_episode.show_episode else None
+        new_guide_episodes = [guide_episode for guide_episode in self.fta_shows if guide_episode.id is None]
+        staged_guide_episodes = [
+            guide_episode
+            for guide_episode in self.fta_shows
+            if guide_episode.id is not None and guide_episode.id not in self.unchanged_shows
+        ]
+
+        if len(self.removed_shows) > 0:
+            self.session.execute(
+                delete(GuideEpisode).where(GuideEpisode.id.in_([guide_episode.id for guide_episode in self.removed_shows]))
+            )
+
+        if len(new_guide_episodes) > 0:
+            guide_episode_ids = self.session.scalars(
+                insert(GuideEpisode).returning(GuideEpisode.id, sort_by_parameter_order=True),
+                [guide_episode.insert_values() for guide_episode in new_guide_episodes]
+            ).all()
+            for guide_episode, guide_episode_id in zip(new_guide_episodes, guide_episode_ids):
+                guide_episode.id = guide_episode_id
+
+        if len(staged_guide_episodes) > 0:
+            self.session.execute(
+                update(GuideEpisode),
+                [
+                    { 'id': guide_episode.id, **guide_episode.insert_values() }
+                    for guide_episode in staged_guide_episodes
+                ]
+            )
+
+        EpisodeAiring.record_airings(
+            [
+                airing_values
+                for airing_values in (guide_episode.airing_values() for guide_episode in self.fta_shows)
+                if airing_values is not None
+            ],
+            self.session
+        )
+
+        self.session.commit()
+    
+    def finalise_guide(self, scheduler: AsyncIOScheduler = None, show_resolver: 'ShowResolver' = None):
+        """
+        Publish a pending guide, recording the airings of its shows and scheduling its reminders.\n
+        The staged shows are resolved again, in a few set-based queries, to pick up any details added since the guide was staged.
+        Shows that still have no `ShowDetails` are removed from the guide and reported.
+        A `show_resolver` shared between guides only queries the shows it has not already resolved.
+        """
+        shows_not_found: list[ShowData] = []
+        try:
+            staged_episodes = GuideEpisode.get_episodes_for_guide(self.id, self.session)
+            for guide_episode in staged_episodes:
+                self.session.expunge(guide_episode)
+
+            from database.show_resolver import ShowResolver
+            show_resolver = show_resolver or ShowResolver(self.session)
+            resolved_shows = show_resolver.resolve(
+                [guide_episode.show_data() for guide_episode in staged_episodes]
+            )
+
+            self.fta_shows = []
+            not_found_ids: list[int] = []
+            for guide_episode in staged_episodes:
+                resolved_show = resolved_shows[guide_episode.show_data().resolution_key]
+                if resolved_show['show_details'] is None:
+                    shows_not_found.append(guide_episode.show_data())
+                    not_found_ids.append(guide_episode.id)
+                    continue
+                guide_episode.apply_resolution(resolved_show)
+                guide_episode.record_airing(self.is_primary_region())
+                Guide.share_created_episode(guide_episode, show_resolver)
+                self.fta_shows.append(guide_episode)
+            self.classify_airings(self.fta_shows)
+
+            if len(not_found_ids) > 0:
+                self.session.execute(delete(GuideEpisode).where(GuideEpisode.id.in_(not_found_ids)))
+            self.status = Guide.PUBLISHED
+            self.save_guide()
+            self.schedule_reminders(scheduler)
+        except SQLAlchemyError as error:
+            Guide.logger.error(f"Could not finalise the guide for {self.date.strftime('%d-%m-%Y')}: {str(error)}")
+            self.session.rollback()
+
+        if len(shows_not_found) > 0:
+            from services.hermes.hermes import hermes
+            hermes.dispatch("show_details_not_found", shows_not_found)
+
     def create_new_guide(self, scheduler: AsyncIOScheduler = None):
         try:
-            self.add_guide()
             self.fta_shows = self.search_free_to_air()
+            self.save_guide()
             self.schedule_reminders(scheduler)
-        except OperationalError as error:
-            Guide.logger.error(f"Could not create guide: {str(error)}")
-            self.session.rollback()
-        except PendingRollbackError as error:
+        except SQLAlchemyError as error:
             Guide.logger.error(f"Could not create guide: {str(error)}")
             self.session.rollback()
         # self.bbc_shows = self.search_bbc_australia()
     
     def get_shows(self):
-        self.fta_shows = GuideEpisode.get_shows_for_date(self.date, self.session)
+        self.fta_shows = GuideEpisode.get_shows_for_date(self.date, self.session, self.region)
 
     def get_reminders(self):
         shows_with_reminders = [
@@ -232,18 +609,19 @@ class Guide(Base):
     def schedule_reminders(self, scheduler: AsyncIOScheduler):
         shows_with_reminders = self.get_reminders()
         
-        if len(shows_with_reminders) > 0 and scheduler:
+        if len(shows_with_reminders) > 0 and scheduler and self.is_primary_region():
             from apscheduler.triggers.date import DateTrigger
             from services.hermes.utilities import send_channel_message
             for show_reminder in shows_with_reminders:
                 show, notify_time = show_reminder
                 scheduler.add_job(
                     send_channel_message,
-                    DateTrigger(run_date=notify_time, timezone='Australia/Sydney'),
+                    DateTrigger(run_date=notify_time, timezone=self.timezone),
                     [show.reminder_notification()],
                     id=f'reminder-{show.title}-{show.start_time}',
                     name=f'Send the reminder message for {show.title}',
-                    misfire_grace_time=None
+                    misfire_grace_time=None,
+                    replace_existing=True
                 )
 
     def compose_message(self):
@@ -293,5 +671,6 @@ class Guide(Base):
     def to_dict(self):
         return {
             'date': self.date.strftime('%d/%m/%Y'),
+            'region': self.region,
             'fta': [show.to_dict() for show in self.fta_shows]
         }
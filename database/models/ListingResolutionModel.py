@@ -0,0 +1,136 @@
+from sqlalchemy import and_, column, Column, delete, ForeignKey, func, Index, Integer, select, Text, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session
+
+from database import Base
+from database.models.ShowEpisodeAliasModel import ShowEpisodeAlias
+from database.models.ShowEpisodeModel import ShowEpisode
+from utils import episode_title_key
+
+
+class ListingResolution(Base):
+    """
+    Remembers the `ShowEpisode` a parsed listing was resolved to, so a listing seen in an earlier guide
+    is resolved with one indexed lookup instead of the title search in `ShowEpisode.search_for_episodes`.\n
+    A resolution is keyed by the listing's `(title, season_number, episode_number, episode_title)`.
+    Only listings that resolved to an episode are remembered, so an episode added later is still found.
+    Resolutions are removed when their `ShowEpisode` is updated or deleted,
+    and are checked against the episode when they are read.
+    """
+    __tablename__ = 'ListingResolution'
+    __table_args__ = (
+        Index('ix_listing_resolution_key', 'title', 'season_number', 'episode_number', 'episode_title', unique=True),
+    )
+
+    id: Mapped[int] = Column('id', Integer, primary_key=True, autoincrement=True)
+    title: Mapped[str] = Column('title', Text, nullable=False)
+    season_number: Mapped[int] = Column('season_number', Integer, nullable=False)
+    episode_number: Mapped[int] = Column('episode_number', Integer, nullable=False)
+    episode_title: Mapped[str] = Column('episode_title', Text, nullable=False)
+    episode_id: Mapped[int] = Column('episode_id', Integer, ForeignKey('ShowEpisode.id', ondelete='CASCADE'), nullable=False)
+
+    def __init__(self, title: str, season_number: int, episode_number: int, episode_title: str, episode_id: int):
+        super().__init__()
+        self.title = title
+        self.season_number = season_number
+        self.episode_number = episode_number
+        self.episode_title = episode_title
+        self.episode_id = episode_id
+
+    @staticmethod
+    def get_resolutions(keys: list[tuple[str, int, int, str]], session: Session):
+        """
+        Return the remembered `ShowEpisode` for each of the given resolution keys, as a dict keyed by resolution key.\n
+        Keys without a resolution are not included. Resolutions whose episode no longer matches the key are removed.
+        """
+        if len(keys) == 0:
+            return {}
+
+        key_values = values(
+            column('title', Text),
+            column('season_number', Integer),
+            column('episode_number', Integer),
+            column('episode_title', Text),
+            name='resolution_keys'
+        ).data(list(keys))
+        alias_keys = (
+            select(func.array_agg(ShowEpisodeAlias.key))
+            .where(ShowEpisodeAlias.episode_id == ShowEpisode.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(ListingResolution, ShowEpisode, alias_keys)
+            .join(
+                key_values,
+                and_(
+                    ListingResolution.title == key_values.c.title,
+                    ListingResolution.season_number == key_values.c.season_number,
+                    ListingResolution.episode_number == key_values.c.episode_number,
+                    ListingResolution.episode_title == key_values.c.episode_title
+                )
+            )
+            .join(ShowEpisode, ShowEpisode.id == ListingResolution.episode_id)
+        )
+
+        show_episodes: dict[tuple[str, int, int, str], ShowEpisode] = {}
+        stale_ids: list[int] = []
+        for listing_resolution, show_episode, aliases in session.execute(query):
+            if listing_resolution.matches(show_episode, aliases or []):
+                show_episodes[listing_resolution.resolution_key()] = show_episode
+            else:
+                stale_ids.append(listing_resolution.id)
+
+        if len(stale_ids) > 0:
+            session.execute(delete(ListingResolution).where(ListingResolution.id.in_(stale_ids)))
+
+        return show_episodes
+
+    @staticmethod
+    def save_resolutions(show_episodes: dict[tuple[str, int, int, str], ShowEpisode], session: Session):
+        """
+        Remember the `ShowEpisode` each resolution key was resolved to, replacing any earlier resolution of the key
+        """
+        resolutions = [
+            {
+                'title': title,
+                'season_number': season_number,
+                'episode_number': episode_number,
+                'episode_title': episode_title,
+                'episode_id': show_episode.id
+            }
+            for (title, season_number, episode_number, episode_title), show_episode in show_episodes.items()
+            if show_episode is not None and show_episode.id is not None
+        ]
+        if len(resolutions) == 0:
+            return
+
+        query = insert(ListingResolution).values(resolutions)
+        query = query.on_conflict_do_update(
+            index_elements=['title', 'season_number', 'episode_number', 'episode_title'],
+            set_={ 'episode_id': query.excluded.episode_id }
+        )
+        session.execute(query)
+
+    @staticmethod
+    def invalidate_episodes(episode_ids: list[int], session: Session):
+        session.execute(delete(ListingResolution).where(ListingResolution.episode_id.in_(episode_ids)))
+
+    def resolution_key(self):
+        return (self.title, self.season_number, self.episode_number, self.episode_title)
+
+    def matches(self, show_episode: ShowEpisode, aliases: list[str] = None):
+        """
+        Whether `show_episode` would still be found for this resolution's key by `ShowEpisode.search_for_episodes`.\n
+        A titled key matches when its `episode_title_key` is the key of the episode's title or one of its alternative titles,
+        or one of the episode's `aliases`, the keys of its `ShowEpisodeAlias`es.
+        """
+        if show_episode.show != self.title:
+            return False
+        if self.season_number != -1 and self.episode_number != 0:
+            return show_episode.season_number == self.season_number and show_episode.episode_number == self.episode_number
+        episode_keys = {
+            episode_title_key(title)
+            for title in [show_episode.episode_title, *(show_episode.alternative_titles or [])]
+            if title
+        }
+        return episode_title_key(self.episode_title) in episode_keys.union(aliases or [])
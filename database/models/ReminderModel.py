@@ -3,6 +3,7 @@ from sqlalchemy.orm import Mapped, relationship, Session
 from datetime import datetime, timedelta
 
 from database import Base, engine
+from database.models.DataVersionModel import DataVersion
 from database.models.GuideEpisode import GuideEpisode
 from database.models.ShowDetailsModel import ShowDetails
 
@@ -41,18 +42,28 @@ class Reminder(Base):
 
         return reminder
     
+    @staticmethod
+    def get_reminders_by_shows(titles: list[str], session: Session):
+        query = select(Reminder).where(Reminder.show.in_(titles))
+        reminders = session.scalars(query)
+
+        return [reminder for reminder in reminders]
+    
     def add_reminder(self, session: Session):
         session.add(self)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
 
     def update_reminder(self, field: str, value, session: Session):
         setattr(self, field, value)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
 
     def delete_reminder(self, session: Session):
         session.delete(self)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def compare_reminder_interval(self, guide_episode: GuideEpisode, session: Session):
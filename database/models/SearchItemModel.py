@@ -4,6 +4,7 @@ from sqlalchemy.orm import Mapped, relationship, Session
 
 from aux_methods.types import ShowData
 from database import Base
+from database.models.DataVersionModel import DataVersion
 from database.models.ShowDetailsModel import ShowDetails
 
 
@@ -35,19 +36,19 @@ class SearchItem(Base):
         self.show_id = show_id
 
     def check_search_conditions(self, episode: ShowData):
-        if self.exact_title_match and episode['title'].lower() != self.show.lower():
+        if self.exact_title_match and episode.title.lower() != self.show.lower():
             return False
         
-        if episode['season_number'] == -1 and episode['episode_title'] == "":
+        if episode.season_number == -1 and episode.episode_title == "":
             return True
         
-        if episode['season_number'] == -1 and episode['episode_title'] != "":
-            return episode['episode_title'] not in self.ignore_episodes
-        if episode['season_number'] < self.min_season_number or episode['season_number'] > self.max_season_number:
+        if episode.season_number == -1 and episode.episode_title != "":
+            return episode.episode_title not in self.ignore_episodes
+        if episode.season_number < self.min_season_number or episode.season_number > self.max_season_number:
             return False
-        elif episode['season_number'] in self.ignore_seasons:
+        elif episode.season_number in self.ignore_seasons:
             return False
-        elif episode['episode_title'] in self.ignore_episodes:
+        elif episode.episode_title in self.ignore_episodes:
             return False
         else:
             return True
@@ -79,16 +80,19 @@ class SearchItem(Base):
     
     def add_search_item(self, session: Session):
         session.add(self)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def update_search(self, new_details: dict, session: Session):
         # self.search_active = new_details['search_active']
         for key in new_details['conditions']:
             setattr(self, key, new_details['conditions'][key])
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def delete_search(self, session: Session):
         session.delete(self)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def conditions_string(self):
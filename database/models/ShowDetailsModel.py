@@ -1,8 +1,9 @@
-from sqlalchemy import ARRAY, Column, Integer, select, Text
-from sqlalchemy.orm import Mapped, relationship, Session
+from sqlalchemy import ARRAY, Column, Integer, select, Text, update
+from sqlalchemy.orm import Mapped, relationship, selectinload, Session
 from typing import TYPE_CHECKING
 
 from database import engine, Base
+from database.models.DataVersionModel import DataVersion
 
 if TYPE_CHECKING:
     from database.models import GuideEpisode, Reminder, SearchItem, ShowEpisode
@@ -17,6 +18,8 @@ class ShowDetails(Base):
     tvmaze_id = Column('tvmaze_id', Text)
     genres = Column('genres', ARRAY(Text))
     image = Column('image', Text)
+    latest_season_number = Column('latest_season_number', Integer)
+    latest_episode_number = Column('latest_episode_number', Integer)
     guide_episodes: Mapped[list['GuideEpisode']] = relationship('GuideEpisode', back_populates="show_details")
     search: Mapped['SearchItem'] = relationship('SearchItem', back_populates="show_details", uselist=False)
     show_episodes: Mapped[list['ShowEpisode']] = relationship('ShowEpisode', back_populates="show_details")
@@ -37,6 +40,44 @@ class ShowDetails(Base):
 
         return [show for show in results]
     
+    @staticmethod
+    def get_shows_page(session: Session, after: str = None, limit: int = None, include_episodes: bool = True):
+        """
+        Return the shows ordered by title, starting after the show titled `after` and with at most `limit` shows.\n
+        Each show's search item and reminder, and its episodes if `include_episodes` is `True`,
+        are loaded with the shows in one query per relationship rather than one query per show.
+        """
+        options = [selectinload(ShowDetails.search), selectinload(ShowDetails.reminder)]
+        if include_episodes:
+            options.append(selectinload(ShowDetails.show_episodes))
+
+        query = select(ShowDetails).options(*options).order_by(ShowDetails.title)
+        if after is not None:
+            query = query.where(ShowDetails.title > after)
+        if limit is not None:
+            query = query.limit(limit)
+        shows = session.scalars(query)
+
+        return [show for show in shows]
+
+    @staticmethod
+    def export_query(show: str = None):
+        """
+        The query the catalogue export streams the shows with, optionally only the show titled `show`
+        """
+        query = select(
+            ShowDetails.id,
+            ShowDetails.title,
+            ShowDetails.description,
+            ShowDetails.tvmaze_id,
+            ShowDetails.genres,
+            ShowDetails.image
+        ).order_by(ShowDetails.id)
+        if show is not None:
+            query = query.where(ShowDetails.title == show)
+
+        return query
+
     @staticmethod
     def get_show_by_title(title: str, session: Session):
         query = select(ShowDetails).where(ShowDetails.title == title)
@@ -44,21 +85,76 @@ class ShowDetails(Base):
         
         return show
     
+    @staticmethod
+    def get_shows_by_titles(titles: list[str], session: Session):
+        query = select(ShowDetails).where(ShowDetails.title.in_(titles))
+        shows = session.execute(query).scalars().all()
+
+        return [show for show in shows]
+    
+    @staticmethod
+    def update_latest_episodes(show_ids: list[int], session: Session):
+        """
+        Point each of the given shows at its latest `ShowEpisode`, the one with the highest season and episode number.
+        Specials, which have no season or episode number, are never the latest episode.\n
+        Run whenever a show's episodes are added or removed, so checking whether an episode is the latest is a comparison.
+        A show without any episodes has no latest episode.
+        """
+        from database.models.ShowEpisodeModel import ShowEpisode
+
+        show_ids = [show_id for show_id in set(show_ids) if show_id is not None]
+        if len(show_ids) == 0:
+            return
+
+        def latest_episode(column):
+            return (
+                select(column)
+                .where(
+                    ShowEpisode.show_id == ShowDetails.id,
+                    ShowEpisode.season_number.is_not(None),
+                    ShowEpisode.episode_number.is_not(None)
+                )
+                .order_by(ShowEpisode.season_number.desc(), ShowEpisode.episode_number.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+        query = (
+            update(ShowDetails)
+            .where(ShowDetails.id.in_(show_ids))
+            .values(
+                latest_season_number=latest_episode(ShowEpisode.season_number),
+                latest_episode_number=latest_episode(ShowEpisode.episode_number)
+            )
+            .execution_options(synchronize_session='fetch')
+        )
+        session.execute(query)
+
+    def is_latest_episode(self, season_number: int, episode_number: int):
+        if self.latest_season_number is None or self.latest_episode_number is None:
+            return False
+        if season_number is None or episode_number is None:
+            return False
+        return (season_number, episode_number) >= (self.latest_season_number, self.latest_episode_number)
+
     def add_show(self, session: Session):
         session.add(self)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def update_show(self, field: str, value, session: Session):
         setattr(self, field, value)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def update_full_show_details(self, data: dict, session: Session):
         for key in data.keys():
             setattr(self, key, data[key])
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def delete_show(self, session: Session):
         session.delete(self)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def to_dict(self):
@@ -0,0 +1,114 @@
+from sqlalchemy import and_, column, Column, delete, ForeignKey, Index, Integer, select, Text, UniqueConstraint, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session
+
+from database import Base
+from database.models.ShowDetailsModel import ShowDetails
+from database.models.ShowEpisodeModel import ShowEpisode
+from utils import episode_title_key
+
+
+class ShowEpisodeAlias(Base):
+    """
+    An `episode_title_key` a `ShowEpisode` is known by, so an episode can be found from its title with an index lookup
+    on `(show_id, key)` rather than comparing the title against every episode of the show.\n
+    An episode has an alias for its title and each of its alternative titles.
+    The titles an episode is found by through `ShowEpisode.search_for_episodes` are added as aliases too,
+    until the episode is updated and its aliases are replaced by those of its new titles.
+    """
+    __tablename__ = 'ShowEpisodeAlias'
+    __table_args__ = (
+        Index('ix_show_episode_alias_show_key', 'show_id', 'key'),
+        UniqueConstraint('episode_id', 'key', name='uq_show_episode_alias_episode_key'),
+    )
+
+    id: Mapped[int] = Column('id', Integer, primary_key=True, autoincrement=True)
+    show_id: Mapped[int] = Column('show_id', Integer, ForeignKey('ShowDetails.id', ondelete='CASCADE'), nullable=False)
+    episode_id: Mapped[int] = Column('episode_id', Integer, ForeignKey('ShowEpisode.id', ondelete='CASCADE'), nullable=False)
+    key: Mapped[str] = Column('key', Text, nullable=False)
+
+    def __init__(self, show_id: int, episode_id: int, key: str):
+        super().__init__()
+        self.show_id = show_id
+        self.episode_id = episode_id
+        self.key = key
+
+    @staticmethod
+    def search_episodes(titled_episodes: set[tuple[str, str]], session: Session):
+        """
+        Find the episodes for the given `(show_title, episode_title)` tuples by their aliases.\n
+        Returns a dict mapping each tuple to its `ShowEpisode`. Tuples without an alias are not included.
+        """
+        if len(titled_episodes) == 0:
+            return {}
+
+        titled_values = values(
+            column('show', Text),
+            column('episode_title', Text),
+            column('key', Text),
+            name='titled_episode_keys'
+        ).data([
+            (show_title, episode_title, episode_title_key(episode_title))
+            for show_title, episode_title in titled_episodes
+        ])
+        query = (
+            select(ShowEpisode, titled_values.c.show, titled_values.c.episode_title)
+            .select_from(titled_values)
+            .join(ShowDetails, ShowDetails.title == titled_values.c.show)
+            .join(
+                ShowEpisodeAlias,
+                and_(ShowEpisodeAlias.show_id == ShowDetails.id, ShowEpisodeAlias.key == titled_values.c.key)
+            )
+            .join(ShowEpisode, ShowEpisode.id == ShowEpisodeAlias.episode_id)
+            .order_by(ShowEpisode.id)
+        )
+
+        show_episodes: dict[tuple[str, str], ShowEpisode] = {}
+        for show_episode, show_title, episode_title in session.execute(query):
+            show_episodes.setdefault((show_title, episode_title), show_episode)
+
+        return show_episodes
+
+    @staticmethod
+    def add_aliases(show_episodes: list[tuple[ShowEpisode, str]], session: Session):
+        """
+        Add an alias for each `(show_episode, title)` pair, skipping the aliases the episode already has
+        """
+        aliases = {
+            (show_episode.show_id, show_episode.id, episode_title_key(title))
+            for show_episode, title in show_episodes
+            if show_episode.id is not None and show_episode.show_id is not None and title
+        }
+        if len(aliases) == 0:
+            return
+
+        query = insert(ShowEpisodeAlias).values([
+            { 'show_id': show_id, 'episode_id': episode_id, 'key': key }
+            for show_id, episode_id, key in aliases
+        ])
+        session.execute(query.on_conflict_do_nothing(constraint='uq_show_episode_alias_episode_key'))
+
+    @staticmethod
+    def index_episodes(show_episodes: list[ShowEpisode], session: Session):
+        """
+        Add the aliases for the title and alternative titles of each of the given episodes
+        """
+        ShowEpisodeAlias.add_aliases(
+            [
+                (show_episode, title)
+                for show_episode in show_episodes
+                for title in [show_episode.episode_title, *(show_episode.alternative_titles or [])]
+            ],
+            session
+        )
+
+    @staticmethod
+    def reindex_episodes(show_episodes: list[ShowEpisode], session: Session):
+        """
+        Replace the aliases of each of the given episodes with the aliases for their current titles,
+        so the titles they no longer have don't find them
+        """
+        episode_ids = [show_episode.id for show_episode in show_episodes if show_episode.id is not None]
+        if len(episode_ids) > 0:
+            session.execute(delete(ShowEpisodeAlias).where(ShowEpisodeAlias.episode_id.in_(episode_ids)))
+        ShowEpisodeAlias.index_episodes(show_episodes, session)
@@ -1,31 +1,64 @@
+from dataclasses import dataclass
 from datetime import datetime
 from sqlalchemy import (
+    and_,
     any_,
     ARRAY,
+    cast,
+    column,
     Column,
     DateTime,
     ForeignKey,
     func,
+    Index,
     Integer,
     literal,
     or_,
     select,
     Text,
+    tuple_,
+    values,
 )
-from sqlalchemy.orm import Mapped, relationship, Session
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array
+from sqlalchemy.orm import column_property, Mapped, relationship, Session, undefer
 from typing import TYPE_CHECKING
 
 from database import Base
+from database.models.DataVersionModel import DataVersion
+from database.models.EpisodeAiringModel import EpisodeAiring
+from database.models.ShowDetailsModel import ShowDetails
 from data_validation.validation import Validation
 
 if TYPE_CHECKING:
     from database.models.GuideEpisode import GuideEpisode
-    from database.models.ShowDetailsModel import ShowDetails
 
 
 
+@dataclass(slots=True)
+class ShowEpisodeRow:
+    """
+    The JSON of a `ShowEpisode` without its summary, read straight from its row by `ShowEpisode.get_episode_rows`
+    """
+    id: int
+    show: str
+    season_number: int
+    episode_number: int
+    episode_title: str
+    alternative_titles: list[str]
+    channels: list[str]
+    air_dates: list[datetime]
+
+
+@dataclass(slots=True)
+class ShowEpisodeSummaryRow(ShowEpisodeRow):
+    summary: str
+
+
 class ShowEpisode(Base):
     __tablename__ = 'ShowEpisode'
+    __table_args__ = (
+        Index('ix_show_episode_show_id_numbers', 'show_id', 'season_number', 'episode_number'),
+    )
 
     id: Mapped[int] = Column('id', Integer, primary_key=True, autoincrement=True)
     show: Mapped[str] = Column('show', Text)
@@ -35,7 +68,15 @@ class ShowEpisode(Base):
     alternative_titles: Mapped[list[str]] = Column('alternative_titles', ARRAY(Text))
     summary: Mapped[str] = Column('summary', Text)
     channels: Mapped[list[str]] = Column('channels', ARRAY(Text))
-    air_dates: Mapped[list[datetime]] = Column('air_dates', ARRAY(DateTime))
+    air_dates: Mapped[list[datetime]] = column_property(
+        select(
+            func.coalesce(
+                func.array_agg(aggregate_order_by(EpisodeAiring.aired_at, EpisodeAiring.aired_at)),
+                cast(array([]), ARRAY(DateTime))
+            )
+        ).where(EpisodeAiring.episode_id == id).scalar_subquery(),
+        deferred=True
+    )
     show_id: Mapped[int] = Column('show_id', ForeignKey('ShowDetails.id'))
     show_details: Mapped['ShowDetails'] = relationship('ShowDetails', back_populates='show_episodes')
     guide_episodes: Mapped[list['GuideEpisode']] = relationship('GuideEpisode', back_populates='show_episode')
@@ -60,12 +101,12 @@ class ShowEpisode(Base):
         self.summary = summary
         self.alternative_titles = alternative_titles
         self.channels = channels
-        self.air_dates = air_dates
+        self.air_dates = list(air_dates)
         self.show_id = show_id
 
     @staticmethod
     def get_episode_by_id(episode_id: int, session: Session):
-        query = select(ShowEpisode).where(ShowEpisode.id == episode_id)
+        query = select(ShowEpisode).where(ShowEpisode.id == episode_id).options(undefer(ShowEpisode.air_dates))
 
         episode = session.scalar(query)
         return episode
@@ -99,6 +140,176 @@ class ShowEpisode(Base):
         show_episode = session.scalar(query)
         return show_episode
 
+    @staticmethod
+    def search_for_episodes(episodes: list[tuple[str, int, int, str]], session: Session):
+        """
+        Search for many episodes at once, given as `(show_title, season_number, episode_number, episode_title)` tuples.\n
+        Episodes are matched in the same way as `search_for_episode`, using one query for the episodes with a season and episode number
+        and one query for the episodes with only an episode title.\n
+        Episodes with only an episode title are looked up by their `ShowEpisodeAlias` first. The titles that have to be
+        compared against every episode of the show are added as aliases of the episode they found.\n
+        Returns a dict mapping each given tuple to its `ShowEpisode`. Tuples without a matching episode are not included.
+        """
+        from database.models.ShowEpisodeAliasModel import ShowEpisodeAlias
+
+        numbered_episodes = {
+            (show_title, season_number, episode_number)
+            for show_title, season_number, episode_number, _ in episodes
+            if season_number != -1 and episode_number != 0
+        }
+        titled_episodes = {
+            (show_title, episode_title)
+            for show_title, season_number, episode_number, episode_title in episodes
+            if (season_number == -1 or episode_number == 0) and episode_title != ''
+        }
+
+        episodes_by_number: dict[tuple[str, int, int], ShowEpisode] = {}
+        if len(numbered_episodes) > 0:
+            numbered_values = values(
+                column('show', Text),
+                column('season_number', Integer),
+                column('episode_number', Integer),
+                name='numbered_episodes'
+            ).data(list(numbered_episodes))
+            query = select(ShowEpisode).join(
+                numbered_values,
+                and_(
+                    ShowEpisode.show == numbered_values.c.show,
+                    ShowEpisode.season_number == numbered_values.c.season_number,
+                    ShowEpisode.episode_number == numbered_values.c.episode_number
+                )
+            )
+            for show_episode in session.scalars(query):
+                key = (show_episode.show, show_episode.season_number, show_episode.episode_number)
+                episodes_by_number.setdefault(key, show_episode)
+
+        episodes_by_title = ShowEpisodeAlias.search_episodes(titled_episodes, session)
+        unaliased_episodes = titled_episodes - episodes_by_title.keys()
+        if len(unaliased_episodes) > 0:
+            titled_values = values(
+                column('show', Text),
+                column('episode_title', Text),
+                name='titled_episodes'
+            ).data(list(unaliased_episodes))
+            query = select(ShowEpisode, titled_values.c.episode_title).join(
+                titled_values,
+                and_(
+                    ShowEpisode.show == titled_values.c.show,
+                    or_(
+                        ShowEpisode.episode_title.ilike(titled_values.c.episode_title),
+                        titled_values.c.episode_title.like(any_(ShowEpisode.alternative_titles))
+                    )
+                )
+            )
+            learned_aliases: list[tuple[ShowEpisode, str]] = []
+            for show_episode, episode_title in session.execute(query):
+                if (show_episode.show, episode_title) not in episodes_by_title:
+                    episodes_by_title[(show_episode.show, episode_title)] = show_episode
+                    learned_aliases.append((show_episode, episode_title))
+            ShowEpisodeAlias.add_aliases(learned_aliases, session)
+
+        show_episodes: dict[tuple[str, int, int, str], ShowEpisode] = {}
+        for episode in episodes:
+            show_title, season_number, episode_number, episode_title = episode
+            if season_number != -1 and episode_number != 0:
+                show_episode = episodes_by_number.get((show_title, season_number, episode_number))
+            else:
+                show_episode = episodes_by_title.get((show_title, episode_title))
+            if show_episode is not None:
+                show_episodes[episode] = show_episode
+
+        return show_episodes
+
+    @staticmethod
+    def get_episodes_by_shows(show_titles: list[str], session: Session):
+        query = select(ShowEpisode).where(ShowEpisode.show.in_(show_titles))
+        show_episodes = session.scalars(query)
+
+        return [show_episode for show_episode in show_episodes]
+
+    @staticmethod
+    def get_episode_counts(show_ids: list[int], session: Session):
+        """
+        Return a dict mapping each of the given shows to a tuple of its number of episodes and number of seasons.
+        Shows without any episodes are not included.
+        """
+        if len(show_ids) == 0:
+            return {}
+
+        query = (
+            select(
+                ShowEpisode.show_id,
+                func.count(ShowEpisode.id),
+                func.count(ShowEpisode.season_number.distinct())
+            )
+            .where(ShowEpisode.show_id.in_(show_ids))
+            .group_by(ShowEpisode.show_id)
+        )
+
+        return {
+            show_id: (episode_count, season_count)
+            for show_id, episode_count, season_count in session.execute(query)
+        }
+
+    @staticmethod
+    def get_episode_rows(show_ids: list[int], session: Session, include_summary: bool = True):
+        """
+        Return a dict mapping each of the given shows to the rows of its episodes, in season and episode order.\n
+        The rows are read as tuples rather than as `ShowEpisode`s and are serialised as they are,
+        so listing the episodes of many shows doesn't build an object and a dict for every episode.
+        Shows without any episodes are not included.
+        """
+        if len(show_ids) == 0:
+            return {}
+
+        columns = [
+            ShowEpisode.id,
+            ShowEpisode.show,
+            ShowEpisode.season_number,
+            ShowEpisode.episode_number,
+            ShowEpisode.episode_title,
+            ShowEpisode.alternative_titles,
+            ShowEpisode.channels,
+            ShowEpisode.air_dates,
+        ]
+        row_class = ShowEpisodeRow
+        if include_summary:
+            columns.append(ShowEpisode.summary)
+            row_class = ShowEpisodeSummaryRow
+        query = (
+            select(ShowEpisode.show_id, *columns)
+            .where(ShowEpisode.show_id.in_(show_ids))
+            .order_by(ShowEpisode.show_id, ShowEpisode.season_number, ShowEpisode.episode_number)
+        )
+
+        episode_rows: dict[int, list[ShowEpisodeRow]] = {}
+        for show_id, *row in session.execute(query):
+            episode_rows.setdefault(show_id, []).append(row_class(*row))
+
+        return episode_rows
+
+    @staticmethod
+    def export_query(show: str = None):
+        """
+        The query the catalogue export streams the episodes with, optionally only the episodes of the show titled `show`
+        """
+        query = select(
+            ShowEpisode.id,
+            ShowEpisode.show_id,
+            ShowEpisode.show,
+            ShowEpisode.season_number,
+            ShowEpisode.episode_number,
+            ShowEpisode.episode_title,
+            ShowEpisode.summary,
+            ShowEpisode.alternative_titles,
+            ShowEpisode.channels,
+            ShowEpisode.air_dates.label('air_dates')
+        ).order_by(ShowEpisode.id)
+        if show is not None:
+            query = query.where(ShowEpisode.show == show)
+
+        return query
+
     @staticmethod
     def get_episodes_by_season(show_title: str, season_number: int, session: Session):
         query = select(ShowEpisode).where(ShowEpisode.show == show_title, ShowEpisode.season_number == season_number)
@@ -109,28 +320,108 @@ class ShowEpisode(Base):
     
     @staticmethod
     def add_all_episodes(episodes: list['ShowEpisode'], session: Session):
-        session.add_all(episodes)
+        ShowEpisode.insert_episodes(episodes, session)
         session.commit()
 
+    @staticmethod
+    def insert_episodes(episodes: list['ShowEpisode'], session: Session):
+        """
+        Insert the episodes, with their airings and aliases, without committing,
+        so they can be written in the same transaction as their show
+        """
+        from database.models.ShowEpisodeAliasModel import ShowEpisodeAlias
+
+        # `air_dates` is read from the airings, so it is expired when the episodes are inserted
+        episode_air_dates = [(episode, episode.air_dates or []) for episode in episodes]
+        session.add_all(episodes)
+        session.flush()
+        ShowEpisode.record_air_dates(episode_air_dates, session)
+        ShowEpisodeAlias.index_episodes(episodes, session)
+        ShowDetails.update_latest_episodes([episode.show_id for episode in episodes], session)
+        DataVersion.bump([DataVersion.SHOWS], session)
+
+    @staticmethod
+    def get_latest_episode_ids(episode_ids: list[int], session: Session):
+        """
+        Return the ids of the given episodes that are the latest episode of their show
+        """
+        if len(episode_ids) == 0:
+            return set()
+
+        query = select(ShowEpisode.id).join(ShowDetails, ShowDetails.id == ShowEpisode.show_id).where(
+            ShowEpisode.id.in_(episode_ids),
+            tuple_(ShowEpisode.season_number, ShowEpisode.episode_number) >= tuple_(
+                ShowDetails.latest_season_number,
+                ShowDetails.latest_episode_number
+            )
+        )
+        latest_episode_ids = session.scalars(query)
+
+        return { episode_id for episode_id in latest_episode_ids }
+
+    @staticmethod
+    def record_air_dates(episode_air_dates: list[tuple['ShowEpisode', list[datetime]]], session: Session):
+        """
+        Record an `EpisodeAiring` for each of the air dates given with each saved episode.
+        The air dates don't record the channel of each airing, so the airings have no channel.
+        """
+        EpisodeAiring.record_airings(
+            [
+                { 'episode_id': episode.id, 'aired_at': air_date, 'channel': None }
+                for episode, air_dates in episode_air_dates
+                for air_date in air_dates
+            ],
+            session
+        )
+
     def add_episode(self, session: Session):
+        air_dates = self.air_dates or []
         session.add(self)
+        session.flush()
+        ShowEpisode.record_air_dates([(self, air_dates)], session)
+        ShowDetails.update_latest_episodes([self.show_id], session)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def update_full_episode(self, episode_details: dict, session: Session):
+        """
+        Update the episode's details from `episode_details`.\n
+        The episode's `air_dates` are its recorded airings, so they are not changed by an update.
+        """
+        from database.models.ListingResolutionModel import ListingResolution
+        from database.models.ShowEpisodeAliasModel import ShowEpisodeAlias
+
         for key in episode_details.keys():
+            if key == 'air_dates':
+                continue
             setattr(self, key, episode_details[key])
+        ListingResolution.invalidate_episodes([self.id], session)
+        ShowEpisodeAlias.reindex_episodes([self], session)
+        ShowDetails.update_latest_episodes([self.show_id], session)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def delete_episode(self, session: Session):
+        from database.models.ListingResolutionModel import ListingResolution
+
+        ListingResolution.invalidate_episodes([self.id], session)
         session.delete(self)
+        session.flush()
+        ShowDetails.update_latest_episodes([self.show_id], session)
+        DataVersion.bump([DataVersion.SHOWS], session)
         session.commit()
 
     def is_latest_episode(self, session: Session):
-        season_check = session.scalar(func.max(ShowEpisode.season_number))
-        episode_check = session.scalar(func.max(ShowEpisode.episode_number))
-        if self.season_number > season_check:
-            return True
-        return self.season_number == season_check and self.episode_number >= episode_check
+        """
+        Check whether this is the latest episode of its show, against the show's latest episode pointer.\n
+        The show's `ShowDetails` are loaded with `session` if they have not been loaded yet.
+        """
+        show_details = self.show_details
+        if show_details is None and self.show_id is not None:
+            show_details = session.get(ShowDetails, self.show_id)
+        if show_details is None:
+            return False
+        return show_details.is_latest_episode(self.season_number, self.episode_number)
     
     def channel_check(self, channel: str):
         """Check that the given episode is present in the episode's channel list. Return True if present, False if not.\n
@@ -167,12 +458,31 @@ class ShowEpisode(Base):
         else:
             return f'{channel} has been added to the channel list.'
         
-    def add_air_date(self, air_date: datetime = None):
+    def add_air_date(self, session: Session, air_date: datetime = None, channel: str = None):
+        """
+        Record an airing of the episode on `air_date`, or today if no date is given.\n
+        The airings of an episode that hasn't been saved yet are recorded when it is added.
+        """
         date = Validation.get_current_date() if air_date is None else air_date
-        self.air_dates.append(date)
+        if date not in self.air_dates:
+            self.air_dates.append(date)
+        if self.id is not None:
+            EpisodeAiring.record_airings([{ 'episode_id': self.id, 'aired_at': date, 'channel': channel }], session)
 
-    def to_dict(self):
+    def insert_values(self):
         return {
+            'show': self.show,
+            'season_number': self.season_number,
+            'episode_number': self.episode_number,
+            'episode_title': self.episode_title,
+            'summary': self.summary,
+            'alternative_titles': self.alternative_titles,
+            'channels': self.channels,
+            'show_id': self.show_id
+        }
+
+    def to_dict(self, include_summary: bool = True):
+        episode = {
             'id': self.id,
             'show': self.show,
             'season_number': self.season_number,
@@ -183,6 +493,9 @@ class ShowEpisode(Base):
             'channels': self.channels,
             'air_dates': self.air_dates
         }
+        if not include_summary:
+            del episode['summary']
+        return episode
     
     def __repr__(self) -> str:
         return f"ShowEpisode [show={self.show}, season_number={self.season_number}, episode_number={self.episode_number}]"
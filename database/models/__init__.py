@@ -1,12 +1,16 @@
 from sqlalchemy.exc import NoReferencedTableError, ProgrammingError
 
 from database import Base, engine
+from database.models.DataVersionModel import DataVersion
+from database.models.EpisodeAiringModel import EpisodeAiring
 from database.models.GuideModel import Guide
 from database.models.GuideEpisode import GuideEpisode
+from database.models.ListingResolutionModel import ListingResolution
 from database.models.ReminderModel import Reminder
 from database.models.SearchItemModel import SearchItem
 from database.models.ShowDetailsModel import ShowDetails
 from database.models.ShowEpisodeModel import ShowEpisode
+from database.models.ShowEpisodeAliasModel import ShowEpisodeAlias
 from database.models.User import User
 from database.models.UserSearchSubscriptionModel import UserSearchSubscription
 
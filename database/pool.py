@@ -0,0 +1,54 @@
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from threading import Lock
+import time
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    A `QueuePool` that records how long each checkout waited for a connection.\n
+    A checkout only waits when every connection in the pool and its overflow is in use,
+    so long or timed out waits mean the pool is too small for the load it is under.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self._checkouts = 0
+        self._checkout_timeouts = 0
+        self._checkout_wait_total = 0.0
+        self._checkout_wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            with self._stats_lock:
+                self._checkout_timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._checkout_wait_total += wait
+                self._checkout_wait_max = max(self._checkout_wait_max, wait)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'size': self.size(),
+                'checked_in': self.checkedin(),
+                'checked_out': self.checkedout(),
+                'overflow': self.overflow(),
+                'checkouts': self._checkouts,
+                'checkout_timeouts': self._checkout_timeouts,
+                'checkout_wait_total': round(self._checkout_wait_total, 6),
+                'checkout_wait_max': round(self._checkout_wait_max, 6),
+            }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    The `InstrumentedQueuePool` for engines created with `create_async_engine`
+    """
@@ -0,0 +1,98 @@
+from sqlalchemy.orm import Session
+
+from aux_methods.types import ResolvedShow, ShowData
+from database.episode_catalog import EpisodeCatalog
+from database.models.ListingResolutionModel import ListingResolution
+from database.models.ReminderModel import Reminder
+from database.models.ShowDetailsModel import ShowDetails
+from database.models.ShowEpisodeModel import ShowEpisode
+
+
+class ShowResolver:
+    """
+    Resolves the `ShowDetails`, `ShowEpisode` and `Reminder` for every show found in a guide
+    with a few set-based queries, instead of querying the database once per show.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.catalog = EpisodeCatalog(session)
+        self._show_details: dict[str, ShowDetails | None] = {}
+        self._reminders: dict[str, Reminder | None] = {}
+        self._show_episodes: dict[tuple[str, int, int, str], ShowEpisode | None] = {}
+        self._resolved_shows: dict[tuple[str, int, int, str], ResolvedShow] = {}
+
+    @staticmethod
+    def resolution_key(show: ShowData):
+        return show.resolution_key
+
+    def resolve(self, shows_data: list[ShowData]):
+        """
+        Resolve the given shows, returning a dict mapping each show's `resolution_key` to its `ResolvedShow`.\n
+        The episode and reminder are only resolved for shows that have `ShowDetails`.
+        Resolutions are kept by the resolver, so sharing it between guides only queries the shows it has not seen yet.
+        Episodes are looked up in the `ListingResolution`s remembered from earlier guides first.
+        The shows with listings that have no resolution are loaded into the resolver's `EpisodeCatalog`,
+        and only the listings the catalog has no episode for are searched for.
+        """
+        titles = list({show.title for show in shows_data} - self._show_details.keys())
+        if len(titles) > 0:
+            show_details = {show.title: show for show in ShowDetails.get_shows_by_titles(titles, self.session)}
+            reminders = {reminder.show: reminder for reminder in Reminder.get_reminders_by_shows(titles, self.session)}
+            for title in titles:
+                self._show_details[title] = show_details.get(title)
+                self._reminders[title] = reminders.get(title)
+
+        resolution_keys = list({
+            show.resolution_key
+            for show in shows_data
+            if self._show_details[show.title] is not None
+        } - self._show_episodes.keys())
+        if len(resolution_keys) > 0:
+            show_episodes = ListingResolution.get_resolutions(resolution_keys, self.session)
+            for show_episode in show_episodes.values():
+                if show_episode is not None:
+                    self.catalog.add(show_episode)
+
+            unresolved_keys = [key for key in resolution_keys if key not in show_episodes]
+            if len(unresolved_keys) > 0:
+                self.catalog.load([key[0] for key in unresolved_keys])
+                found_episodes = self.catalog.find_all(unresolved_keys)
+                searched_keys = [key for key in unresolved_keys if key not in found_episodes]
+                if len(searched_keys) > 0:
+                    searched_episodes = ShowEpisode.search_for_episodes(searched_keys, self.session)
+                    for show_episode in searched_episodes.values():
+                        if show_episode is not None:
+                            self.catalog.add(show_episode)
+                    found_episodes.update(searched_episodes)
+                ListingResolution.save_resolutions(found_episodes, self.session)
+                show_episodes.update(found_episodes)
+
+            for key in resolution_keys:
+                self._show_episodes[key] = show_episodes.get(key)
+
+        resolved_shows: dict[tuple[str, int, int, str], ResolvedShow] = {}
+        for show in shows_data:
+            key = show.resolution_key
+            if key not in self._resolved_shows:
+                details = self._show_details[show.title]
+                self._resolved_shows[key] = {
+                    'show_details': details,
+                    'show_episode': self._show_episodes.get(key) if details else None,
+                    'reminder': self._reminders[show.title] if details else None
+                }
+            resolved_shows[key] = self._resolved_shows[key]
+
+        return resolved_shows
+
+    def add_episode(self, show_episode: ShowEpisode):
+        """
+        Add an episode created during the run, so the shows already resolved without an episode,
+        and any resolved later, are matched to it
+        """
+        self.catalog.add(show_episode)
+        for key, resolved_show in self._resolved_shows.items():
+            if resolved_show['show_details'] is not None and resolved_show['show_episode'] is None:
+                if self.catalog.find(*key) is show_episode:
+                    resolved_show['show_episode'] = show_episode
+                    self._show_episodes[key] = show_episode
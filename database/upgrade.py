@@ -0,0 +1,116 @@
+from sqlalchemy import case, Column, Index, select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from typing import Callable
+
+from database.models import EpisodeAiring, Guide, GuideEpisode, ShowDetails, ShowEpisode, ShowEpisodeAlias
+
+# `create_tables` only creates the tables that don't exist yet, so the columns and indexes added to existing tables
+# are added by the upgrades below, along with the values of the existing rows.
+# Every upgrade can be run again, so `upgrade_database` can be run before each deploy.
+
+dialect = postgresql.dialect()
+alias_batch_size = 1000
+
+
+def add_column(column: Column, session: Session):
+    """
+    Add the model's `column` to its table, if the table doesn't have it already
+    """
+    preparer = dialect.identifier_preparer
+    session.execute(text(
+        f"ALTER TABLE {preparer.format_table(column.table)} "
+        f"ADD COLUMN IF NOT EXISTS {preparer.format_column(column)} {column.type.compile(dialect)}"
+    ))
+
+def add_index(index: Index, session: Session):
+    """
+    Create the model's `index`, if it doesn't exist already
+    """
+    session.execute(CreateIndex(index, if_not_exists=True))
+
+def upgrade_guide_status(session: Session):
+    """
+    Add `Guide.status`. The existing guides were all published, as guides were only saved once they were sent.
+    """
+    add_column(Guide.__table__.c.status, session)
+    session.execute(update(Guide).where(Guide.status.is_(None)).values(status=Guide.PUBLISHED))
+
+def upgrade_guide_region(session: Session):
+    """
+    Add `Guide.region`. The existing guides were all built for the primary region.
+    """
+    add_column(Guide.__table__.c.region, session)
+    session.execute(update(Guide).where(Guide.region.is_(None)).values(region=Guide.PRIMARY_REGION))
+
+def upgrade_latest_episodes(session: Session):
+    """
+    Add the latest episode pointers of `ShowDetails`, and the index they are found with, and point every show at its latest episode
+    """
+    add_column(ShowDetails.__table__.c.latest_season_number, session)
+    add_column(ShowDetails.__table__.c.latest_episode_number, session)
+    add_index(next(index for index in ShowEpisode.__table__.indexes if index.name == 'ix_show_episode_show_id_numbers'), session)
+    show_ids = session.scalars(select(ShowDetails.id)).all()
+    ShowDetails.update_latest_episodes(show_ids, session)
+
+def upgrade_airing_status(session: Session):
+    """
+    Add `GuideEpisode.airing_status`. The existing airings only recorded whether they were repeats,
+    so they are classified as repeats or first airings, and none of them as simulcasts or first airings on a channel.
+    """
+    add_column(GuideEpisode.__table__.c.airing_status, session)
+    session.execute(
+        update(GuideEpisode)
+        .where(GuideEpisode.airing_status.is_(None))
+        .values(airing_status=case(
+            (GuideEpisode.repeat.is_(True), GuideEpisode.REPEAT),
+            else_=GuideEpisode.FIRST_AIRING
+        ))
+    )
+
+def upgrade_episode_airings(session: Session):
+    """
+    Record the airings kept in the `air_dates` array of each `ShowEpisode` as `EpisodeAiring`s,
+    if the `ShowEpisode` table still has the array. The `EpisodeAiring` table is made by `create_tables`.
+    """
+    has_air_dates = session.scalar(text(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = 'ShowEpisode' AND column_name = 'air_dates'"
+    ))
+    if has_air_dates:
+        EpisodeAiring.backfill(session)
+
+def upgrade_episode_aliases(session: Session):
+    """
+    Add the `ShowEpisodeAlias`es for the titles of the existing episodes, a batch of episodes at a time.
+    The `ShowEpisodeAlias` table is made by `create_tables`.
+    """
+    last_id = 0
+    while True:
+        query = select(ShowEpisode).where(ShowEpisode.id > last_id).order_by(ShowEpisode.id).limit(alias_batch_size)
+        episodes = session.execute(query).scalars().all()
+        if len(episodes) == 0:
+            break
+        ShowEpisodeAlias.index_episodes(episodes, session)
+        last_id = episodes[-1].id
+        # the episodes are not needed once their aliases are added
+        session.expunge_all()
+
+
+UPGRADES: list[Callable[[Session], None]] = [
+    upgrade_guide_status,
+    upgrade_guide_region,
+    upgrade_latest_episodes,
+    upgrade_airing_status,
+    upgrade_episode_airings,
+    upgrade_episode_aliases
+]
+
+def upgrade_database(session: Session):
+    """
+    Run each upgrade in turn, committing each one as it is finished
+    """
+    for upgrade in UPGRADES:
+        print(f"Running {upgrade.__name__}")
+        upgrade(session)
+        session.commit()
@@ -72,6 +72,14 @@ def drop_tables(tables: str):
     from database.models import drop_tables
     drop_tables(list(tables))
 
+@local_tvguide.command()
+def upgrade_database():
+    from database import engine
+    from database.upgrade import upgrade_database
+
+    with Session(engine) as session:
+        upgrade_database(session)
+
 @local_tvguide.command()
 def migrate_data():
     from database.migration import db_migrate
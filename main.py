@@ -11,6 +11,7 @@ from aux_methods.helper_methods import split_message_by_time
 from config import scheduler
 from data_validation.validation import Validation
 from database import engine
+from database.guide_builder import GuideBuilder
 from database.models.GuideModel import Guide
 from services.hermes.hermes import hermes
 
@@ -50,8 +51,8 @@ async def send_main_message():
     date = Validation.get_current_date()
     session = Session(engine, expire_on_commit=False)
     
-    guide = Guide(date, session)
-    guide.create_new_guide(scheduler)
+    guides = await GuideBuilder.publish_guides(date, session, Guide.configured_regions(), scheduler)
+    guide = guides[Guide.PRIMARY_REGION]
     guide_message = guide.compose_message()
     
     await hermes.wait_until_ready()
@@ -86,8 +87,32 @@ async def send_main_message():
         session.close()
 
 
+async def prefetch_guides():
+    """
+    Stage the guides for the coming days, so the morning message only has to finalise today's guide
+    """
+    session = Session(engine, expire_on_commit=False)
+    try:
+        await GuideBuilder.prefetch_guides(
+            Validation.get_current_date(),
+            int(os.getenv('GUIDE_PREFETCH_DAYS', 7)),
+            session,
+            Guide.configured_regions()
+        )
+    finally:
+        session.close()
+
+
 if __name__ == '__main__':
     
+    scheduler.add_job(
+        prefetch_guides,
+        CronTrigger(hour=3, timezone='Australia/Sydney'),
+        id='TVGuide Prefetch',
+        name='Stage the guides for the coming days',
+        misfire_grace_time=None,
+        replace_existing=True
+    )
     scheduler.add_job(
         send_main_message,
         CronTrigger(hour=9, timezone='Australia/Sydney'),
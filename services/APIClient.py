@@ -1,12 +1,16 @@
+from datetime import datetime
 import requests
 
 from exceptions.service_error import HTTPRequestError
+from services.SnapshotStore import SnapshotStore
+from utils.guide_listing_parser import GuideListingParser
 
 class APIClient:
 
+    chunk_size = 64 * 1024
 
     @staticmethod
-    def _make_request(method: str, url: str, additional_headers: dict):
+    def _make_request(method: str, url: str, additional_headers: dict, stream: bool = False):
 
         headers = {
             'User-Agent': 'Chrome/119.0.0.0'
@@ -17,15 +21,55 @@ class APIClient:
         response = requests.request(
             method=method,
             url=url,
-            headers=headers
+            headers=headers,
+            stream=stream
         )
 
         return response
     
-    def get(self, endpoint: str, headers: dict = {}):
-        
-        response = APIClient._make_request('GET', endpoint, headers)
+    def get(self, endpoint: str, headers: dict = {}, stream_parser: type[GuideListingParser] = None):
+        """
+        Get `endpoint` and return the decoded JSON.\n
+        If a `stream_parser` is given, the body is read in chunks and the records it yields are returned instead.
+        """
+        response = APIClient._make_request('GET', endpoint, headers, stream=stream_parser is not None)
         if response.ok:
+            if stream_parser is not None:
+                return list(stream_parser.parse(response.iter_content(chunk_size=APIClient.chunk_size)))
             return response.json()
         else:
-            raise HTTPRequestError(f'Response returned status {response.status_code} {response.reason}')
\ No newline at end of file
+            raise HTTPRequestError(f'Response returned status {response.status_code} {response.reason}')
+
+    def get_snapshot(
+        self,
+        endpoint: str,
+        snapshot_store: SnapshotStore,
+        date: datetime,
+        headers: dict = {},
+        stream_parser: type[GuideListingParser] = None
+    ):
+        """
+        Get `endpoint` through the `snapshot_store`, revalidating the stored snapshot with a conditional request once it has expired.\n
+        The body is streamed into the store a chunk at a time. If the request fails, the last snapshot is returned instead.
+        """
+        snapshot = snapshot_store.lookup(endpoint, date)
+        if snapshot_store.is_fresh(snapshot):
+            return snapshot_store.load(snapshot, stream_parser)
+
+        try:
+            request_headers = { **headers, **snapshot_store.request_headers(snapshot) }
+            with APIClient._make_request('GET', endpoint, request_headers, stream=True) as response:
+                if response.status_code == 304 and snapshot is not None:
+                    return snapshot_store.not_modified(snapshot, stream_parser)
+                if response.ok:
+                    writer = snapshot_store.open(endpoint, date, stream_parser)
+                    try:
+                        for chunk in response.iter_content(chunk_size=APIClient.chunk_size):
+                            writer.write(chunk)
+                    except BaseException:
+                        writer.abort()
+                        raise
+                    return writer.finish(response.headers)
+                raise HTTPRequestError(f'Response returned status {response.status_code} {response.reason}')
+        except (requests.RequestException, ValueError, HTTPRequestError) as error:
+            return snapshot_store.fallback(snapshot, error, stream_parser)
@@ -0,0 +1,164 @@
+from datetime import datetime
+import aiohttp
+import asyncio
+
+from exceptions.service_error import HTTPRequestError
+from services.SnapshotStore import SnapshotStore
+from utils.guide_listing_parser import GuideListingParser
+
+class AsyncAPIClient:
+    """
+    An asyncio variant of `APIClient` for fetching several endpoints concurrently without blocking the event loop
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, timeout: float = 30, snapshot_store: SnapshotStore = None):
+        self.timeout = timeout
+        self.snapshot_store = snapshot_store
+
+    @staticmethod
+    async def _make_request(session: aiohttp.ClientSession, method: str, url: str, additional_headers: dict):
+
+        headers = {
+            'User-Agent': 'Chrome/119.0.0.0'
+        }
+
+        headers.update(additional_headers)
+
+        response = await session.request(
+            method=method,
+            url=url,
+            headers=headers
+        )
+
+        return response
+
+    @staticmethod
+    async def _read_json(
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        headers: dict,
+        stream_parser: type[GuideListingParser] = None
+    ):
+        async with await AsyncAPIClient._make_request(session, 'GET', endpoint, headers) as response:
+            if response.ok:
+                if stream_parser is not None:
+                    parser = stream_parser()
+                    records = []
+                    async for chunk in response.content.iter_chunked(AsyncAPIClient.chunk_size):
+                        records.extend(parser.feed(chunk))
+                    records.extend(parser.close())
+                    return records
+                return await response.json(content_type=None)
+            raise HTTPRequestError(f'Response returned status {response.status} {response.reason}')
+
+    async def _get(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        headers: dict,
+        stream_parser: type[GuideListingParser] = None
+    ):
+        try:
+            return await asyncio.wait_for(
+                AsyncAPIClient._read_json(session, endpoint, headers, stream_parser),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise HTTPRequestError(f'Request to {endpoint} timed out after {self.timeout} seconds')
+        except aiohttp.ClientError as error:
+            raise HTTPRequestError(f'Request to {endpoint} failed: {error}')
+
+    @staticmethod
+    async def _read_snapshot(
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        headers: dict,
+        snapshot_store: SnapshotStore,
+        snapshot: dict,
+        date: datetime,
+        stream_parser: type[GuideListingParser] = None
+    ):
+        request_headers = { **headers, **snapshot_store.request_headers(snapshot) }
+        async with await AsyncAPIClient._make_request(session, 'GET', endpoint, request_headers) as response:
+            if response.status == 304 and snapshot is not None:
+                return snapshot_store.not_modified(snapshot, stream_parser)
+            if response.ok:
+                writer = snapshot_store.open(endpoint, date, stream_parser)
+                try:
+                    async for chunk in response.content.iter_chunked(AsyncAPIClient.chunk_size):
+                        writer.write(chunk)
+                except BaseException:
+                    writer.abort()
+                    raise
+                return writer.finish(response.headers)
+            raise HTTPRequestError(f'Response returned status {response.status} {response.reason}')
+
+    async def _get_snapshot(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        headers: dict,
+        date: datetime,
+        stream_parser: type[GuideListingParser] = None
+    ):
+        snapshot = self.snapshot_store.lookup(endpoint, date)
+        if self.snapshot_store.is_fresh(snapshot):
+            return self.snapshot_store.load(snapshot, stream_parser)
+
+        try:
+            return await asyncio.wait_for(
+                AsyncAPIClient._read_snapshot(session, endpoint, headers, self.snapshot_store, snapshot, date, stream_parser),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            error = HTTPRequestError(f'Request to {endpoint} timed out after {self.timeout} seconds')
+        except aiohttp.ClientError as client_error:
+            error = HTTPRequestError(f'Request to {endpoint} failed: {client_error}')
+        except (ValueError, HTTPRequestError) as request_error:
+            error = request_error
+        return self.snapshot_store.fallback(snapshot, error, stream_parser)
+
+    async def get(self, endpoint: str, headers: dict = {}, stream_parser: type[GuideListingParser] = None):
+        async with aiohttp.ClientSession() as session:
+            return await self._get(session, endpoint, headers, stream_parser)
+
+    async def get_all(
+        self,
+        endpoints: dict[str, str],
+        headers: dict = {},
+        snapshot_date: datetime = None,
+        stream_parsers: dict[str, type[GuideListingParser]] = {}
+    ):
+        """
+        Fetch the given `endpoints` concurrently, keyed by a name for each endpoint.\n
+        A failed request does not affect the others. Returns a tuple of the responses and the errors, each keyed by the endpoint's name.\n
+        When the client has a `SnapshotStore` and a `snapshot_date` is given, the endpoints are fetched through the store.
+        Endpoints with a parser in `stream_parsers` are parsed in chunks as they are read, rather than decoded as a whole.
+        """
+        async with aiohttp.ClientSession() as session:
+            if self.snapshot_store is not None and snapshot_date is not None:
+                requests = [
+                    self._get_snapshot(session, endpoint, headers, snapshot_date, stream_parsers.get(name))
+                    for name, endpoint in endpoints.items()
+                ]
+            else:
+                requests = [
+                    self._get(session, endpoint, headers, stream_parsers.get(name))
+                    for name, endpoint in endpoints.items()
+                ]
+            responses = await asyncio.gather(
+                *requests,
+                return_exceptions=True
+            )
+
+        results: dict[str, dict | list] = {}
+        errors: dict[str, Exception] = {}
+        for name, response in zip(endpoints.keys(), responses):
+            if isinstance(response, Exception):
+                errors[name] = response
+            else:
+                results[name] = response
+
+        return results, errors
@@ -0,0 +1,216 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import TYPE_CHECKING
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+if TYPE_CHECKING:
+    from utils.guide_listing_parser import GuideListingParser
+
+
+class SnapshotStore:
+    """
+    A local, content-addressed store of the raw data returned by the guide's sources.\n
+    Each response body is written once to `objects/<sha256>`, and an index maps the endpoint and guide date
+    to the latest snapshot along with the `ETag` and `Last-Modified` headers needed to revalidate it.
+    Older snapshots are kept in each entry's history, so the raw feeds can be replayed later.
+    """
+
+    logger = logging.getLogger("SnapshotStore")
+    chunk_size = 64 * 1024
+
+    def __init__(self, directory: str, ttl: int = 3600, offline_fallback: bool = True):
+        self.directory = directory
+        self.ttl = ttl
+        self.offline_fallback = offline_fallback
+        self.index_path = os.path.join(directory, 'index.json')
+        self.objects_path = os.path.join(directory, 'objects')
+        self._index: dict[str, dict] = None
+
+    @staticmethod
+    def from_env():
+        """
+        Create the store from the `SNAPSHOT_DIR`, `SNAPSHOT_TTL` and `SNAPSHOT_OFFLINE` environment variables.\n
+        Returns `None` when `SNAPSHOT_DIR` is not set, which disables the store.
+        """
+        directory = os.getenv('SNAPSHOT_DIR')
+        if not directory:
+            return None
+        return SnapshotStore(
+            directory,
+            int(os.getenv('SNAPSHOT_TTL', 3600)),
+            os.getenv('SNAPSHOT_OFFLINE', 'true').lower() != 'false'
+        )
+
+    @staticmethod
+    def snapshot_key(url: str, date: datetime):
+        return f"{date.strftime('%Y-%m-%d')} {url}"
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path) as fd:
+                    self._index = json.load(fd)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {}
+        return self._index
+
+    def lookup(self, url: str, date: datetime):
+        """
+        Return the index entry of the latest snapshot of `url` for `date`, or `None` if there isn't one
+        """
+        entry = self.index.get(SnapshotStore.snapshot_key(url, date))
+        if entry is None or not os.path.exists(os.path.join(self.objects_path, entry['digest'])):
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict):
+        if entry is None:
+            return False
+        checked_at = datetime.fromisoformat(entry['checked_at'])
+        return (datetime.now(timezone.utc) - checked_at).total_seconds() < self.ttl
+
+    def request_headers(self, entry: dict):
+        """
+        The headers for a conditional request that revalidates the snapshot in `entry`
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        elif not entry.get('etag'):
+            headers['If-Modified-Since'] = format_datetime(datetime.fromisoformat(entry['fetched_at']), usegmt=True)
+        return headers
+
+    def load(self, entry: dict, stream_parser: type['GuideListingParser'] = None):
+        """
+        Return the data of the snapshot in `entry`.\n
+        If a `stream_parser` is given, the snapshot is read in chunks and the records it yields are returned.
+        """
+        with open(os.path.join(self.objects_path, entry['digest']), 'rb') as fd:
+            if stream_parser is not None:
+                return list(stream_parser.parse(iter(lambda: fd.read(SnapshotStore.chunk_size), b'')))
+            return json.loads(fd.read())
+
+    def not_modified(self, entry: dict, stream_parser: type['GuideListingParser'] = None):
+        """
+        Record that the upstream confirmed the snapshot in `entry` is still current and return its data
+        """
+        entry['checked_at'] = datetime.now(timezone.utc).isoformat()
+        self._write_index()
+        return self.load(entry, stream_parser)
+
+    def open(self, url: str, date: datetime, stream_parser: type['GuideListingParser'] = None):
+        """
+        Return a `SnapshotWriter` that stores the response body for `url` on `date` as it is read
+        """
+        return SnapshotWriter(self, url, date, stream_parser)
+
+    def _record(self, url: str, date: datetime, digest: str, headers: dict):
+        now = datetime.now(timezone.utc).isoformat()
+        key = SnapshotStore.snapshot_key(url, date)
+        history = self.index[key]['history'] if key in self.index else []
+        if len(history) == 0 or history[-1]['digest'] != digest:
+            history.append({ 'digest': digest, 'fetched_at': now })
+        self.index[key] = {
+            'url': url,
+            'date': date.strftime('%Y-%m-%d'),
+            'digest': digest,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': now,
+            'checked_at': now,
+            'history': history
+        }
+        self._write_index()
+
+    def fallback(self, entry: dict, error: Exception, stream_parser: type['GuideListingParser'] = None):
+        """
+        Serve the snapshot in `entry` when the upstream could not be reached.\n
+        Raises `error` if offline fallback is disabled or there is no snapshot to serve.
+        """
+        if entry is None or not self.offline_fallback:
+            raise error
+        SnapshotStore.logger.warning(
+            f"Serving the snapshot of {entry['url']} from {entry['fetched_at']}: {str(error)}"
+        )
+        return self.load(entry, stream_parser)
+
+    def _write_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        SnapshotStore._write_file(self.index_path, json.dumps(self.index, indent=4).encode())
+
+    @staticmethod
+    def _write_file(path: str, content: bytes):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as fd:
+            fd.write(content)
+        os.replace(temp_path, path)
+
+
+class SnapshotWriter:
+    """
+    Writes a response body to a `SnapshotStore` one chunk at a time as it is read, hashing it and feeding it to the parser,
+    so the body is never held in memory as a whole.\n
+    The snapshot is only recorded by `finish`, once the body has been parsed.
+    """
+
+    def __init__(
+        self,
+        snapshot_store: SnapshotStore,
+        url: str,
+        date: datetime,
+        stream_parser: type['GuideListingParser'] = None
+    ):
+        self.snapshot_store = snapshot_store
+        self.url = url
+        self.date = date
+        os.makedirs(snapshot_store.objects_path, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=snapshot_store.objects_path, suffix='.tmp', delete=False)
+        self._hash = hashlib.sha256()
+        self._parser = stream_parser() if stream_parser is not None else None
+        self._records = []
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        if self._parser is not None:
+            self._records.extend(self._parser.feed(chunk))
+
+    def finish(self, headers: dict):
+        """
+        Record the snapshot and return its parsed data.\n
+        Raises `ValueError`, without recording anything, if the body is malformed.
+        """
+        self._file.close()
+        try:
+            if self._parser is not None:
+                data = self._records + self._parser.close()
+            else:
+                with open(self._file.name, 'rb') as fd:
+                    data = json.load(fd)
+        except ValueError:
+            os.remove(self._file.name)
+            raise
+
+        digest = self._hash.hexdigest()
+        object_path = os.path.join(self.snapshot_store.objects_path, digest)
+        if os.path.exists(object_path):
+            os.remove(self._file.name)
+        else:
+            os.replace(self._file.name, object_path)
+        self.snapshot_store._record(self.url, self.date, digest, headers)
+
+        return data
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._file.name):
+            os.remove(self._file.name)
@@ -8,6 +8,7 @@ from aux_methods.helper_methods import parse_date_from_command, split_message_by
 from config import scheduler
 from data_validation.validation import Validation
 from database import engine
+from database.guide_builder import GuideBuilder
 from database.models.GuideModel import Guide
 from database.models.ReminderModel import Reminder
 from database.models.SearchItemModel import SearchItem
@@ -110,8 +111,8 @@ async def send_guide(ctx: Context, date: str = None):
     guide_date = Validation.get_current_date() if date is None else parse_date_from_command(date)
     session = Session(engine, expire_on_commit=False)
     
-    guide = Guide(guide_date, session)
-    guide.create_new_guide(scheduler)
+    guides = await GuideBuilder.publish_guides(guide_date, session, Guide.configured_regions(), scheduler)
+    guide = guides[Guide.PRIMARY_REGION]
     guide_message, reminders_message, events_message = (
         guide.compose_message(),
         guide.compose_reminder_message(),
@@ -35,11 +35,10 @@ async def on_guide_data_fetch_failed(error: str):
 
 @hermes.event
 async def on_show_details_not_found(shows_not_found: list[ShowData]):
-    import copy
     import json
     import os
 
-    shows_not_found_copy = copy.deepcopy(shows_not_found)
+    shows_not_found_copy = [show.to_dict() for show in shows_not_found]
     for show in shows_not_found_copy:
         show['start_time'] = datetime.strftime(show['start_time'], "%d-%m-%Y %H:%M")
         show['end_time'] = datetime.strftime(show['end_time'], "%d-%m-%Y %H:%M")
@@ -1,15 +1,8 @@
 from tvguide_types.tvmaze import TVMazeEpisode
+from utils import format_part_number
 
 def format_episode_title(episode_title: str):
-    if '(Part ' in episode_title:
-        episode_title = episode_title.replace('(Part ', 'Part ')
-        episode_title = episode_title.replace(')', '')
-    if 'Part I' in episode_title and 'Part II' not in episode_title:
-        episode_title = episode_title.replace('I', '1')
-    if 'Part II' in episode_title:
-        episode_title = episode_title.replace('II', '2')
-
-    return episode_title
+    return format_part_number(episode_title)
 
 def group_seasons(episode_list: list, num_of_seasons: int, season_start: int = 0):
     grouped_seasons = []
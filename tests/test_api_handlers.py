@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock, patch
+import unittest
+
+import api_handlers
+
+
+class TestAPIHandlers(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tvmaze_details = { 'id': 210, 'name': 'Doctor Who', 'summary': '', 'genres': [], 'image': { 'original': '' } }
+        self.tvmaze_episodes = [
+            { 'season_number': 1, 'episode_number': 1, 'episode_title': 'Rose', 'summary': '' }
+        ]
+
+    def test_parse_shows_query(self):
+        self.assertEqual(api_handlers.parse_shows_query({}), ('full', None, None))
+        self.assertEqual(
+            api_handlers.parse_shows_query({ 'episodes': 'counts', 'limit': '10', 'after': 'Doctor Who' }),
+            ('counts', 10, 'Doctor Who')
+        )
+
+    def test_parse_shows_query_rejects_invalid_limit(self):
+        for limit in ['0', 'ten']:
+            with self.assertRaisesRegex(ValueError, 'The limit must be a positive number'):
+                api_handlers.parse_shows_query({ 'limit': limit })
+
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.insert_episodes')
+    def test_add_show_does_not_write_show_without_search_criteria(self, mock_insert_episodes: MagicMock, mock_session: MagicMock):
+        response = api_handlers.add_show(self.tvmaze_details, self.tvmaze_episodes, { 'max_season_number': 2 }, mock_session)
+
+        self.assertEqual(response, ({ 'message': 'Unable to add search criteria for Doctor Who' }, 500))
+        mock_session.add.assert_not_called()
+        mock_session.commit.assert_not_called()
+        mock_insert_episodes.assert_not_called()
+
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episode_rows', return_value={})
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.insert_episodes')
+    def test_add_show_commits_once(self, mock_insert_episodes: MagicMock, mock_get_episode_rows: MagicMock, mock_session: MagicMock):
+        conditions = { 'min_season_number': 1, 'max_season_number': 2, 'exact_title_match': True }
+
+        response = api_handlers.add_show(self.tvmaze_details, self.tvmaze_episodes, conditions, mock_session)
+
+        self.assertEqual(response['show_name'], 'Doctor Who')
+        self.assertEqual(len(mock_insert_episodes.call_args.args[0]), 1)
+        mock_session.commit.assert_called_once()
@@ -0,0 +1,175 @@
+from aiohttp.test_utils import TestClient, TestServer
+from collections import namedtuple
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from database.models import DataVersion, ShowDetails, ShowEpisode, User
+from database.pool import InstrumentedQueuePool
+import async_api
+
+
+class TestAsyncAPI(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.sync_session = MagicMock()
+        self.session = MagicMock()
+        self.session.run_sync = AsyncMock(side_effect=lambda operation: operation(self.sync_session))
+        self.session.rollback = AsyncMock()
+        self.session.close = AsyncMock()
+        self.session.bind.pool = MagicMock(spec=InstrumentedQueuePool)
+        self.session.bind.pool.stats.return_value = { 'size': 5 }
+
+        self.client = TestClient(TestServer(async_api.create_app(lambda: self.session, 'secret' * 8)))
+        await self.client.start_server()
+        async_api.identity_cache = async_api.IdentityCache()
+        async_api.response_cache.clear()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def login(self, role: str = 'Admin'):
+        user = User('ngin', 'password', role)
+        user.id = 1
+        with patch.object(User, 'search_for_user', return_value=user):
+            response = await self.client.post('/api/auth/login', json={ 'username': 'ngin', 'password': 'password' })
+        return (await response.json())['token']
+
+    async def test_async_api_returns_not_found_show(self):
+        with patch.object(ShowDetails, 'get_show_by_title', return_value=None):
+            response = await self.client.get('/api/shows/Doctor Who/episodes')
+
+        self.assertEqual(response.status, 404)
+        self.assertEqual(await response.json(), { 'message': "Unable to find any details for 'Doctor Who'" })
+        self.session.close.assert_awaited_once()
+        self.session.rollback.assert_not_awaited()
+
+    async def test_async_api_rolls_back_failed_request(self):
+        with patch.object(ShowDetails, 'get_show_by_title', side_effect=RuntimeError):
+            response = await self.client.get('/api/shows/Doctor Who/episodes')
+
+        self.assertEqual(response.status, 500)
+        self.session.rollback.assert_awaited_once()
+        self.session.close.assert_awaited_once()
+
+    async def test_async_api_adds_show_without_holding_connection(self):
+        token = await self.login()
+        calls = []
+        self.session.close = AsyncMock(side_effect=lambda: calls.append('close'))
+        tvmaze_details = { 'id': 210, 'name': 'Doctor Who', 'summary': '', 'genres': [], 'image': { 'original': '' } }
+        body = {
+            'name': 'Doctor Who',
+            'conditions': { 'min_season_number': 1, 'max_season_number': 2, 'exact_title_match': True }
+        }
+
+        with (
+            patch.object(ShowDetails, 'get_show_by_title', return_value=None),
+            patch('services.tvmaze.tvmaze_api.get_show', side_effect=lambda name: calls.append('get_show') or tvmaze_details),
+            patch('services.tvmaze.tvmaze_api.get_show_episodes', side_effect=lambda *args: calls.append('get_show_episodes') or []),
+            patch.object(ShowEpisode, 'insert_episodes'),
+            patch.object(ShowEpisode, 'get_episode_rows', return_value={})
+        ):
+            self.sync_session.commit.side_effect = lambda: calls.append('commit')
+            response = await self.client.post('/api/shows', json=body, headers={ 'Authorization': f'Bearer {token}' })
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual((await response.json())['show_name'], 'Doctor Who')
+        self.assertEqual(calls, ['close', 'get_show', 'get_show_episodes', 'commit', 'close'])
+
+    async def test_async_api_does_not_write_show_with_invalid_episode(self):
+        token = await self.login()
+        tvmaze_details = { 'id': 210, 'name': 'Doctor Who', 'summary': '', 'genres': [], 'image': { 'original': '' } }
+        body = {
+            'name': 'Doctor Who',
+            'conditions': { 'min_season_number': 1, 'max_season_number': 2, 'exact_title_match': True }
+        }
+
+        with (
+            patch.object(ShowDetails, 'get_show_by_title', return_value=None),
+            patch('services.tvmaze.tvmaze_api.get_show', return_value=tvmaze_details),
+            patch('services.tvmaze.tvmaze_api.get_show_episodes', return_value=[{ 'season_number': 1, 'episode_number': 1 }]),
+            patch.object(ShowEpisode, 'insert_episodes') as mock_insert_episodes
+        ):
+            response = await self.client.post('/api/shows', json=body, headers={ 'Authorization': f'Bearer {token}' })
+
+        self.assertEqual(response.status, 500)
+        self.assertEqual(await response.json(), { 'message': 'Unable to add an episode for Doctor Who' })
+        self.sync_session.add.assert_not_called()
+        self.sync_session.flush.assert_not_called()
+        self.sync_session.commit.assert_not_called()
+        mock_insert_episodes.assert_not_called()
+
+    async def test_async_api_rejects_show_without_search_criteria(self):
+        token = await self.login()
+        tvmaze_details = { 'id': 210, 'name': 'Doctor Who', 'summary': '', 'genres': [], 'image': { 'original': '' } }
+        body = { 'name': 'Doctor Who', 'conditions': { 'min_season_number': 1, 'max_season_number': 2 } }
+
+        with (
+            patch.object(ShowDetails, 'get_show_by_title', return_value=None),
+            patch('services.tvmaze.tvmaze_api.get_show', return_value=tvmaze_details),
+            patch('services.tvmaze.tvmaze_api.get_show_episodes', return_value=[])
+        ):
+            response = await self.client.post('/api/shows', json=body, headers={ 'Authorization': f'Bearer {token}' })
+
+        self.assertEqual(response.status, 500)
+        self.assertEqual(await response.json(), { 'message': 'Unable to add search criteria for Doctor Who' })
+        self.sync_session.commit.assert_not_called()
+
+    async def test_async_api_authorises_with_token_claims(self):
+        token = await self.login()
+
+        with patch.object(User, 'search_for_user') as mock_search_for_user:
+            response = await self.client.get('/api/status/pool', headers={ 'Authorization': f'Bearer {token}' })
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.json(), { 'size': 5 })
+        mock_search_for_user.assert_not_called()
+
+    async def test_async_api_forbids_non_admins(self):
+        token = await self.login('User')
+
+        response = await self.client.get('/api/status/pool', headers={ 'Authorization': f'Bearer {token}' })
+
+        self.assertEqual(response.status, 403)
+
+    async def test_async_api_requires_token(self):
+        response = await self.client.get('/api/status/pool')
+
+        self.assertEqual(response.status, 401)
+        self.assertEqual(await response.json(), { 'msg': 'Missing Authorization Header' })
+
+    async def test_async_api_returns_not_modified_guide(self):
+        with patch.object(DataVersion, 'get_version', return_value=3), patch('database.models.GuideModel.Guide.get_shows'):
+            response = await self.client.get('/api/guide', params={ 'region': 'Sydney' })
+            cached_response = await self.client.get(
+                '/api/guide',
+                params={ 'region': 'Sydney' },
+                headers={ 'If-None-Match': response.headers['ETag'] }
+            )
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual((await response.json())['region'], 'Sydney')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertEqual(cached_response.status, 304)
+
+    async def test_async_api_streams_export(self):
+        Row = namedtuple('Row', ['id', 'title'])
+
+        async def partitions():
+            yield [Row(1, 'Doctor Who'), Row(2, 'Vera')]
+            yield [Row(3, 'Grantchester')]
+
+        result = MagicMock()
+        result.partitions = partitions
+        self.session.stream = AsyncMock(return_value=result)
+        token = await self.login('User')
+        self.session.close.reset_mock()
+
+        response = await self.client.get('/api/export/shows', headers={ 'Authorization': f'Bearer {token}' })
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(
+            await response.text(),
+            '{"id":1,"title":"Doctor Who"}\n{"id":2,"title":"Vera"}\n{"id":3,"title":"Grantchester"}\n'
+        )
+        self.session.close.assert_awaited_once()
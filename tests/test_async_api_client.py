@@ -0,0 +1,83 @@
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, patch
+import asyncio
+import time
+
+from database.models.GuideModel import Guide
+from exceptions.service_error import HTTPRequestError
+from services.AsyncAPIClient import AsyncAPIClient
+
+
+class TestAsyncAPIClient(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async def schedule(request: web.Request):
+            await asyncio.sleep(0.2)
+            return web.json_response({ 'channel': request.match_info['channel'] })
+
+        async def not_found(request: web.Request):
+            return web.Response(status=404)
+
+        async def slow(request: web.Request):
+            await asyncio.sleep(2)
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_get('/schedule/{channel}', schedule)
+        app.router.add_get('/not-found', not_found)
+        app.router.add_get('/slow', slow)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_async_api_client_gets_endpoint(self):
+        response = await AsyncAPIClient().get(str(self.server.make_url('/schedule/ABC1')))
+
+        self.assertEqual(response, { 'channel': 'ABC1' })
+
+    async def test_async_api_client_fetches_endpoints_concurrently(self):
+        endpoints = {
+            channel: str(self.server.make_url(f'/schedule/{channel}'))
+            for channel in ['ABC1', 'ABC2', 'ABC3', 'ABCNEWS']
+        }
+
+        start = time.perf_counter()
+        results, errors = await AsyncAPIClient().get_all(endpoints)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results['ABC3'], { 'channel': 'ABC3' })
+        self.assertEqual(errors, {})
+        self.assertLess(elapsed, 0.6)
+
+    async def test_async_api_client_isolates_failed_endpoints(self):
+        endpoints = {
+            'fta': str(self.server.make_url('/schedule/ABC1')),
+            'bbc_first': str(self.server.make_url('/not-found')),
+            'bbc_uktv': str(self.server.make_url('/slow'))
+        }
+
+        results, errors = await AsyncAPIClient(timeout=0.5).get_all(endpoints)
+
+        self.assertEqual(results, { 'fta': { 'channel': 'ABC1' } })
+        self.assertIsInstance(errors['bbc_first'], HTTPRequestError)
+        self.assertIn('404', str(errors['bbc_first']))
+        self.assertIsInstance(errors['bbc_uktv'], HTTPRequestError)
+        self.assertIn('timed out', str(errors['bbc_uktv']))
+
+    @patch('services.hermes.hermes.hermes')
+    @patch('services.AsyncAPIClient.AsyncAPIClient.get_all')
+    async def test_guide_fetches_source_data(self, mock_get_all: MagicMock, mock_hermes: MagicMock):
+        mock_get_all.return_value = ({ 'fta': { 'schedule': [] } }, { 'bbc_first': HTTPRequestError('timed out') })
+
+        guide = Guide(datetime(2024, 10, 12), MagicMock())
+        await guide.fetch_source_data()
+
+        self.assertEqual(guide.get_prefetched_source_data('fta'), { 'schedule': [] })
+        self.assertIsNone(guide.get_prefetched_source_data('bbc_first'))
+        mock_hermes.dispatch.assert_called_once_with('guide_data_fetch_failed', 'timed out')
@@ -0,0 +1,45 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from database.models.EpisodeAiringModel import EpisodeAiring
+
+
+class TestEpisodeAiring(TestCase):
+
+    @patch('sqlalchemy.orm.session')
+    def test_episode_airing_records_airings(self, mock_session: MagicMock):
+        EpisodeAiring.record_airings(
+            [{ 'episode_id': 1, 'aired_at': datetime(2024, 10, 12, 9), 'channel': 'ABC1', 'guide_episode_id': 3 }],
+            mock_session
+        )
+
+        query = str(mock_session.execute.call_args.args[0])
+        self.assertIn('INSERT INTO "EpisodeAiring"', query)
+        self.assertIn('ON CONFLICT (episode_id, aired_at) DO NOTHING', query)
+
+    @patch('sqlalchemy.orm.session')
+    def test_episode_airing_records_no_airings(self, mock_session: MagicMock):
+        EpisodeAiring.record_airings([], mock_session)
+
+        mock_session.execute.assert_not_called()
+
+    @patch('sqlalchemy.orm.session')
+    def test_episode_airing_returns_airings_between(self, mock_session: MagicMock):
+        airing = EpisodeAiring(1, datetime(2024, 10, 12, 9), 'ABC1')
+        mock_session.scalars.return_value = [airing]
+
+        airings = EpisodeAiring.get_airings_between(datetime(2024, 10, 1), datetime(2024, 10, 31), mock_session, 1)
+
+        self.assertEqual(airings, [airing])
+        query = str(mock_session.scalars.call_args.args[0])
+        self.assertIn('"EpisodeAiring".aired_at BETWEEN', query)
+        self.assertIn('"EpisodeAiring".episode_id =', query)
+
+    @patch('sqlalchemy.orm.session')
+    def test_episode_airing_backfills_air_dates(self, mock_session: MagicMock):
+        EpisodeAiring.backfill(mock_session)
+
+        query = str(mock_session.execute.call_args.args[0])
+        self.assertIn('unnest("ShowEpisode".air_dates)', query)
+        mock_session.commit.assert_called_once()
@@ -0,0 +1,53 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from database.episode_catalog import EpisodeCatalog
+from database.models.ShowEpisodeModel import ShowEpisode
+from tests.test_data.show_episodes import dw_show_episodes
+
+
+class TestEpisodeCatalog(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.catalog = EpisodeCatalog(MagicMock())
+
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episodes_by_shows')
+    def test_episode_catalog_finds_episodes(self, mock_episodes: MagicMock):
+        mock_episodes.return_value = dw_show_episodes
+
+        self.catalog.load(['Doctor Who'])
+
+        show_episode = dw_show_episodes[7]
+        self.assertIs(
+            self.catalog.find('Doctor Who', show_episode.season_number, show_episode.episode_number, ''),
+            show_episode
+        )
+        self.assertIs(self.catalog.find('Doctor Who', -1, 0, show_episode.episode_title.upper()), show_episode)
+        self.assertIsNone(self.catalog.find('Doctor Who', 9, 9, show_episode.episode_title))
+        self.assertIsNone(self.catalog.find('Doctor Who', -1, 0, ''))
+        self.assertTrue(self.catalog.is_loaded('Doctor Who'))
+        self.assertFalse(self.catalog.is_loaded('Vera'))
+
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episodes_by_shows')
+    def test_episode_catalog_loads_shows_once(self, mock_episodes: MagicMock):
+        mock_episodes.return_value = []
+
+        self.catalog.load(['Doctor Who', 'Vera'])
+        self.catalog.load(['Doctor Who', 'Vera'])
+
+        mock_episodes.assert_called_once()
+        self.assertCountEqual(mock_episodes.call_args.args[0], ['Doctor Who', 'Vera'])
+
+    def test_episode_catalog_finds_added_episodes(self):
+        show_episode = ShowEpisode('Vera', -1, 0, 'Hidden Depths', '', ['Vera: Hidden Depths'], ['ABC1'], [], None)
+
+        self.catalog.add(show_episode)
+
+        self.assertEqual(
+            self.catalog.find_all([('Vera', -1, 0, 'Hidden Depths'), ('Vera', -1, 0, 'vera hidden depths'), ('Vera', -1, 0, 'Telling Tales')]),
+            {
+                ('Vera', -1, 0, 'Hidden Depths'): show_episode,
+                ('Vera', -1, 0, 'vera hidden depths'): show_episode
+            }
+        )
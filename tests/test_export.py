@@ -0,0 +1,52 @@
+from collections import namedtuple
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from database.export import export_query, parse_export_filters, stream_export
+
+
+class TestExport(TestCase):
+
+    def test_export_parses_guide_date_range(self):
+        filters = parse_export_filters('guide-episodes', { 'show': 'Doctor Who', 'start': '01/10/2024', 'end': '31/10/2024' })
+
+        self.assertEqual(filters, { 'show': 'Doctor Who', 'start': datetime(2024, 10, 1), 'end': datetime(2024, 11, 1) })
+
+    def test_export_rejects_invalid_dates(self):
+        with self.assertRaises(ValueError):
+            parse_export_filters('guide-episodes', { 'start': '2024-10-01' })
+
+    def test_export_rejects_date_range_for_shows(self):
+        with self.assertRaises(ValueError):
+            parse_export_filters('episodes', { 'end': '31/10/2024' })
+
+    def test_export_filters_guide_episodes(self):
+        query = str(export_query('guide-episodes', 'Doctor Who', datetime(2024, 10, 1), datetime(2024, 11, 1)))
+
+        self.assertIn('JOIN "Guide" ON "GuideEpisode".guide_id = "Guide".id', query)
+        self.assertIn('"ShowDetails".title =', query)
+        self.assertIn('"GuideEpisode".start_time >=', query)
+        self.assertIn('"GuideEpisode".start_time <', query)
+
+    def test_export_filters_episodes_by_show(self):
+        query = str(export_query('episodes', 'Doctor Who'))
+
+        self.assertIn('FROM "ShowEpisode"', query)
+        self.assertIn('"ShowEpisode".show =', query)
+
+    @patch('sqlalchemy.orm.session')
+    def test_export_streams_rows_in_batches(self, mock_session: MagicMock):
+        Row = namedtuple('Row', ['id', 'title'])
+        mock_session.execute.return_value.partitions.return_value = iter([
+            [Row(1, 'Doctor Who'), Row(2, 'Vera')],
+            [Row(3, 'Grantchester')]
+        ])
+
+        chunks = list(stream_export(export_query('shows'), mock_session))
+
+        self.assertEqual(chunks, [
+            b'{"id":1,"title":"Doctor Who"}\n{"id":2,"title":"Vera"}\n',
+            b'{"id":3,"title":"Grantchester"}\n'
+        ])
+        self.assertEqual(mock_session.execute.call_args.args[0].get_execution_options()['yield_per'], 1000)
@@ -4,7 +4,12 @@ from textwrap import dedent
 import unittest
 import json
 
+from database.guide_builder import GuideBuilder
+from database.models.GuideEpisode import GuideEpisode
 from database.models.GuideModel import Guide
+from database.models.ShowDetailsModel import ShowDetails
+from database.models.ShowEpisodeModel import ShowEpisode
+from database.show_resolver import ShowResolver
 from tests.test_data.guide_episodes import guide_episodes
 from tests.test_data.reminders import reminders
 from tests.test_data.show_details import show_details
@@ -19,12 +24,18 @@ class TestGuide(unittest.TestCase):
         
         with open('tests/test_data/fta_data.json') as fd:
             self.fta_data = json.load(fd)
+        self.show_episodes = {
+            ('Doctor Who', 4, 4, 'The Sontaran Strategem'): dw_show_episodes[7],
+            ('Doctor Who', 4, 5, ''): dw_show_episodes[8],
+            ('Doctor Who', 4, 6, "The Doctor's Daughter"): dw_show_episodes[9],
+            ('Doctor Who', -1, 0, 'The Unicorn and the Wasp'): dw_show_episodes[10]
+        }
 
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.execute')
-    @patch('database.models.Reminder.get_reminder_by_show')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_search_fta_finds_all_details(
@@ -39,15 +50,9 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
-        mock_reminder.return_value = None
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
+        mock_reminder.return_value = []
         mock_session_commit.return_value = "added"
         mock_execute.return_value = None
         
@@ -67,9 +72,9 @@ class TestGuide(unittest.TestCase):
 
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.execute')
-    @patch('database.models.Reminder.get_reminder_by_show')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_search_fta_finds_details_from_show_episode(
@@ -85,15 +90,9 @@ class TestGuide(unittest.TestCase):
         mock_source_data.return_value = self.fta_data
         mock_execute.return_value = None
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
-        mock_reminder.return_value = None
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
+        mock_reminder.return_value = []
         mock_session_commit.return_value = "added"
         # mock_session_execute.return_value = None
         
@@ -107,8 +106,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_search_fta_finds_no_details(
@@ -123,14 +122,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -146,8 +139,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.check_search_conditions')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
@@ -165,14 +158,8 @@ class TestGuide(unittest.TestCase):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
         mock_search_conditions.side_effect = [True, True, False, True, True]
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -185,8 +172,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_list_is_sorted(
@@ -201,14 +188,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -222,8 +203,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_create_adds_guide_and_guide_episodes(
@@ -239,14 +220,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         # mock_session_commit.return_value = "added"
         mock_session.commit.return_value = "added"
@@ -259,7 +234,247 @@ class TestGuide(unittest.TestCase):
         guide.create_new_guide()
 
         self.assertEqual(len(guide.fta_shows), 5)
-    
+
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.record_airings')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episodes_by_shows')
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
+    @patch('database.models.GuideModel.Guide.get_source_data')
+    def test_guide_create_saves_guide_in_one_transaction(
+        self,
+        mock_source_data: MagicMock,
+        mock_search_items: MagicMock,
+        mock_show_detail: MagicMock,
+        mock_show_episode: MagicMock,
+        mock_reminder: MagicMock,
+        mock_session: MagicMock,
+        mock_catalog_episodes: MagicMock,
+        mock_record_airings: MagicMock
+    ):
+        mock_catalog_episodes.return_value = []
+        saved_show_details = ShowDetails("Doctor Who", "", "210", [], "")
+        saved_show_details.id = 1
+        saved_show_episodes = {}
+        for idx, (key, show_episode) in enumerate(self.show_episodes.items()):
+            saved_show_episodes[key] = ShowEpisode(
+                show_episode.show,
+                show_episode.season_number,
+                show_episode.episode_number,
+                show_episode.episode_title,
+                show_episode.summary,
+                [],
+                ["ABC1", "ABCHD", "ABC2"],
+                [datetime(2023, 9, 15, hour=20, minute=30)],
+                1
+            )
+            saved_show_episodes[key].id = idx + 1
+        mock_source_data.return_value = self.fta_data
+        mock_search_items.return_value = search_items
+        mock_show_detail.return_value = [saved_show_details]
+        mock_show_episode.return_value = saved_show_episodes
+        mock_reminder.return_value = []
+
+        guide = Guide(datetime(2024, 10, 12), mock_session)
+        guide.create_new_guide()
+
+        mock_session.commit.assert_called_once()
+        mock_session.rollback.assert_not_called()
+        # one bulk insert for the new ShowEpisode and one for the GuideEpisodes
+        self.assertEqual(mock_session.scalars.call_count, 2)
+        self.assertEqual(len(mock_session.scalars.call_args.args[1]), 5)
+        # one bulk update for the ShowEpisodes that aired
+        self.assertEqual(len(mock_session.execute.call_args.args[1]), 4)
+        # each airing is recorded as its own EpisodeAiring row
+        self.assertEqual(len(mock_record_airings.call_args.args[0]), 5)
+
+    def saved_show_details_and_episodes(self):
+        saved_show_details = ShowDetails("Doctor Who", "", "210", [], "")
+        saved_show_details.id = 1
+        saved_show_episodes = {}
+        for idx, (key, show_episode) in enumerate(self.show_episodes.items()):
+            saved_show_episodes[key] = ShowEpisode(
+                show_episode.show,
+                show_episode.season_number,
+                show_episode.episode_number,
+                show_episode.episode_title,
+                show_episode.summary,
+                [],
+                ["ABC1", "ABCHD", "ABC2"],
+                [datetime(2023, 9, 15, hour=20, minute=30)],
+                1
+            )
+            saved_show_episodes[key].id = idx + 1
+        return saved_show_details, saved_show_episodes
+
+    @patch('database.models.DataVersionModel.DataVersion.bump')
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.get_earlier_channels')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episodes_by_shows')
+    @patch('database.models.ListingResolutionModel.ListingResolution.save_resolutions')
+    @patch('database.models.ListingResolutionModel.ListingResolution.get_resolutions')
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
+    @patch('database.models.GuideModel.Guide.get_source_data')
+    def test_guide_stage_saves_pending_guide_without_events(
+        self,
+        mock_source_data: MagicMock,
+        mock_search_items: MagicMock,
+        mock_show_detail: MagicMock,
+        mock_show_episode: MagicMock,
+        mock_reminder: MagicMock,
+        mock_session: MagicMock,
+        mock_listing_resolutions: MagicMock,
+        mock_save_resolutions: MagicMock,
+        mock_catalog_episodes: MagicMock,
+        mock_earlier_channels: MagicMock,
+        mock_bump: MagicMock
+    ):
+        mock_catalog_episodes.return_value = []
+        mock_earlier_channels.return_value = { 1: { 'ABC1' } }
+        saved_show_details, saved_show_episodes = self.saved_show_details_and_episodes()
+        mock_source_data.return_value = self.fta_data
+        mock_search_items.return_value = search_items
+        mock_show_detail.return_value = [saved_show_details]
+        mock_show_episode.return_value = saved_show_episodes
+        mock_reminder.return_value = []
+        mock_listing_resolutions.return_value = {}
+
+        builder = GuideBuilder(datetime(2024, 10, 12), mock_session)
+        builder.stage_guides()
+        guide = builder.guides[Guide.PRIMARY_REGION]
+
+        self.assertEqual(guide.status, Guide.PENDING)
+        self.assertEqual(len(guide.fta_shows), 5)
+        self.assertTrue(all(guide_episode.db_event is None for guide_episode in guide.fta_shows))
+        self.assertTrue(all(len(show_episode.air_dates) == 1 for show_episode in saved_show_episodes.values()))
+        self.assertEqual(guide.fta_shows[0].airing_status, GuideEpisode.REPEAT)
+        self.assertEqual(guide.fta_shows[1].airing_status, GuideEpisode.FIRST_AIRING)
+        mock_earlier_channels.assert_called_once()
+        mock_bump.assert_called_once()
+        mock_session.commit.assert_called_once()
+        # only the GuideEpisodes are inserted, and no ShowEpisodes are updated
+        mock_session.scalars.assert_called_once()
+        mock_session.execute.assert_not_called()
+
+    @patch('database.models.DataVersionModel.DataVersion.bump')
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.get_earlier_channels')
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.record_airings')
+    @patch('database.models.ShowDetailsModel.ShowDetails.update_latest_episodes')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episodes_by_shows')
+    @patch('database.models.ListingResolutionModel.ListingResolution.save_resolutions')
+    @patch('database.models.ListingResolutionModel.ListingResolution.get_resolutions')
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.GuideEpisode.GuideEpisode.get_episodes_for_guide')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
+    @patch('database.models.GuideModel.Guide.get_source_data')
+    def test_guide_finalise_records_airings(
+        self,
+        mock_source_data: MagicMock,
+        mock_search_items: MagicMock,
+        mock_show_detail: MagicMock,
+        mock_show_episode: MagicMock,
+        mock_reminder: MagicMock,
+        mock_staged_episodes: MagicMock,
+        mock_session: MagicMock,
+        mock_listing_resolutions: MagicMock,
+        mock_save_resolutions: MagicMock,
+        mock_catalog_episodes: MagicMock,
+        mock_latest_episodes: MagicMock,
+        mock_record_airings: MagicMock,
+        mock_earlier_channels: MagicMock,
+        mock_bump: MagicMock
+    ):
+        mock_catalog_episodes.return_value = []
+        mock_earlier_channels.return_value = { 1: { 'ABC1' }, 3: { 'ABC1' } }
+        saved_show_details, saved_show_episodes = self.saved_show_details_and_episodes()
+        mock_source_data.return_value = self.fta_data
+        mock_search_items.return_value = search_items
+        mock_show_detail.return_value = [saved_show_details]
+        mock_show_episode.return_value = saved_show_episodes
+        mock_reminder.return_value = []
+        mock_listing_resolutions.return_value = {}
+
+        builder = GuideBuilder(datetime(2024, 10, 12), mock_session)
+        builder.stage_guides()
+        guide = builder.guides[Guide.PRIMARY_REGION]
+        for idx, guide_episode in enumerate(guide.fta_shows):
+            guide_episode.id = idx + 1
+        mock_staged_episodes.return_value = list(guide.fta_shows)
+        mock_show_episode.return_value = {
+            ShowResolver.resolution_key(guide_episode.show_data()): guide_episode.show_episode
+            for guide_episode in guide.fta_shows
+        }
+        mock_session.reset_mock()
+
+        guide.finalise_guide()
+
+        self.assertEqual(guide.status, Guide.PUBLISHED)
+        self.assertEqual(len(guide.fta_shows), 5)
+        self.assertEqual(guide.fta_shows[0].db_event, "Season 4 Episode 4 (The Sontaran Strategem) has aired today")
+        self.assertTrue(guide.fta_shows[0].repeat)
+        self.assertEqual(guide.fta_shows[2].airing_status, GuideEpisode.FIRST_ON_CHANNEL)
+        self.assertEqual(guide.fta_shows[4].airing_status, GuideEpisode.FIRST_AIRING)
+        mock_session.commit.assert_called_once()
+        # only the new ShowEpisode is inserted, as the GuideEpisodes were inserted when the guide was staged
+        mock_session.scalars.assert_called_once()
+        self.assertEqual(len(mock_session.scalars.call_args.args[1]), 1)
+        # one bulk update for the ShowEpisodes that aired and one for the staged GuideEpisodes
+        self.assertEqual(mock_session.execute.call_count, 2)
+        self.assertEqual(len(mock_session.execute.call_args.args[1]), 5)
+        # the new ShowEpisode moves its show's latest episode
+        self.assertEqual(mock_latest_episodes.call_args.args[0], [1])
+        self.assertEqual(
+            [airing['guide_episode_id'] for airing in mock_record_airings.call_args.args[0]],
+            [1, 2, 3, 4, 5]
+        )
+
+    @patch('services.hermes.hermes.hermes')
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.GuideEpisode.GuideEpisode.get_episodes_for_guide')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
+    @patch('database.models.GuideModel.Guide.get_source_data')
+    def test_guide_finalise_removes_shows_not_found(
+        self,
+        mock_source_data: MagicMock,
+        mock_search_items: MagicMock,
+        mock_show_detail: MagicMock,
+        mock_show_episode: MagicMock,
+        mock_reminder: MagicMock,
+        mock_staged_episodes: MagicMock,
+        mock_session: MagicMock,
+        mock_hermes: MagicMock
+    ):
+        mock_source_data.return_value = self.fta_data
+        mock_search_items.return_value = search_items
+        mock_show_detail.return_value = []
+        mock_show_episode.return_value = {}
+        mock_reminder.return_value = []
+
+        builder = GuideBuilder(datetime(2024, 10, 12), mock_session)
+        builder.stage_guides()
+        guide = builder.guides[Guide.PRIMARY_REGION]
+        self.assertEqual(len(guide.fta_shows), 5)
+        for idx, guide_episode in enumerate(guide.fta_shows):
+            guide_episode.id = idx + 1
+        mock_staged_episodes.return_value = list(guide.fta_shows)
+
+        guide.finalise_guide()
+
+        self.assertEqual(len(guide.fta_shows), 0)
+        self.assertEqual(mock_hermes.dispatch.call_args.args[0], "show_details_not_found")
+        self.assertEqual(len(mock_hermes.dispatch.call_args.args[1]), 5)
+
     @patch('sqlalchemy.orm.session')
     def test_guide_get_shows_for_date_returns_episodes_from_db(self, mock_session: MagicMock):
         mock_session.scalars.return_value = guide_episodes
@@ -294,8 +509,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_message_contains_date(
@@ -310,14 +525,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute = None
@@ -330,8 +539,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_message_handles_no_results(
@@ -346,14 +555,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = { 'schedule': [] }
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -366,8 +569,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_message_contains_all_episode_strings(
@@ -382,14 +585,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -398,10 +595,10 @@ class TestGuide(unittest.TestCase):
         guide.create_new_guide()
 
         expected = """
-        09:00: Doctor Who is on ABC1 (Season 4, Episode 4: The Sontaran Strategem)
-        09:50: Doctor Who is on ABC1 (Season 4, Episode 5: The Poison Sky)
-        11:30: Doctor Who is on ABC2 (Season 4, Episode 6: The Doctor's Daughter)
-        13:00: Doctor Who is on ABC1 (Season 4, Episode 7: The Unicorn and the Wasp)
+        09:00: Doctor Who is on ABC1 (Season 4, Episode 4: The Sontaran Strategem) (Repeat)
+        09:50: Doctor Who is on ABC1 (Season 4, Episode 5: The Poison Sky) (Repeat)
+        11:30: Doctor Who is on ABC2 (Season 4, Episode 6: The Doctor's Daughter) (Repeat)
+        13:00: Doctor Who is on ABC1 (Season 4, Episode 7: The Unicorn and the Wasp) (Repeat)
         13:50: Doctor Who is on ABC1 (Season Unknown, Episode 0)
         """
         expected = dedent(expected)
@@ -411,8 +608,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_empty_reminders_message(
@@ -427,14 +624,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -446,9 +637,9 @@ class TestGuide(unittest.TestCase):
 
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.execute')
-    @patch('database.models.ReminderModel.Reminder.get_reminder_by_show')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_reminders_message_contains_reminder_details(
@@ -463,15 +654,9 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
-        mock_reminder.return_value = reminders[0]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
+        mock_reminder.return_value = [reminders[0]]
         mock_session_commit.return_value = "added"
         mock_execute.return_value = None
 
@@ -491,8 +676,8 @@ class TestGuide(unittest.TestCase):
     @patch('sqlalchemy.orm.session.Session.execute')
     @patch('sqlalchemy.orm.session.Session.commit')
     @patch('sqlalchemy.orm.session.Session.scalar')
-    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episode')
-    @patch('database.models.ShowDetailsModel.ShowDetails.get_show_by_title')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
     @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
     @patch('database.models.GuideModel.Guide.get_source_data')
     def test_guide_events_message_contains_all_events(
@@ -507,14 +692,8 @@ class TestGuide(unittest.TestCase):
     ):
         mock_source_data.return_value = self.fta_data
         mock_search_items.return_value = search_items
-        mock_show_detail.return_value = show_details[0]
-        mock_show_episode.side_effect = [
-            dw_show_episodes[7],
-            dw_show_episodes[8],
-            dw_show_episodes[9],
-            dw_show_episodes[10],
-            None
-        ]
+        mock_show_detail.return_value = [show_details[0]]
+        mock_show_episode.return_value = self.show_episodes
         mock_reminder.return_value = None
         mock_session_commit.return_value = "added"
         mock_session_execute.return_value = None
@@ -522,7 +701,9 @@ class TestGuide(unittest.TestCase):
         guide = Guide(datetime(2024, 10, 12), mock_session_commit)
         guide.create_new_guide()
         
-        self.assertIn("This show is now being recorded", guide.compose_events_message())
+        events_message = guide.compose_events_message()
+        self.assertIn("Doctor Who - Season 4 Episode 4 (The Sontaran Strategem) has aired today", events_message)
+        self.assertIn("Doctor Who - Season -1 Episode 0 () has been inserted", events_message)
 
     def tearDown(self) -> None:
         super().tearDown()
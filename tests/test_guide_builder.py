@@ -0,0 +1,152 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+import json
+import os
+
+from database.guide_builder import GuideBuilder
+from database.models.GuideModel import Guide
+from database.models.ShowDetailsModel import ShowDetails
+from database.models.ShowEpisodeModel import ShowEpisode
+from tests.test_data.search_items import search_items
+from tests.test_data.show_episodes import dw_show_episodes
+
+
+class TestGuideBuilder(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        with open('tests/test_data/fta_data.json') as fd:
+            self.fta_data = json.load(fd)
+        self.show_details = ShowDetails("Doctor Who", "", "210", [], "")
+        self.show_details.id = 1
+        self.show_episodes = {}
+        for idx, (key, show_episode) in enumerate({
+            ('Doctor Who', 4, 4, 'The Sontaran Strategem'): dw_show_episodes[7],
+            ('Doctor Who', 4, 5, ''): dw_show_episodes[8],
+            ('Doctor Who', 4, 6, "The Doctor's Daughter"): dw_show_episodes[9],
+            ('Doctor Who', -1, 0, 'The Unicorn and the Wasp'): dw_show_episodes[10]
+        }.items()):
+            self.show_episodes[key] = ShowEpisode(
+                show_episode.show,
+                show_episode.season_number,
+                show_episode.episode_number,
+                show_episode.episode_title,
+                show_episode.summary,
+                [],
+                ["ABC1", "ABCHD", "ABC2"],
+                [],
+                1
+            )
+            self.show_episodes[key].id = idx + 1
+
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
+    def test_guide_builder_shares_resolution_between_regions(
+        self,
+        mock_search_items: MagicMock,
+        mock_show_details: MagicMock,
+        mock_show_episodes: MagicMock,
+        mock_reminders: MagicMock,
+        mock_session: MagicMock
+    ):
+        mock_search_items.return_value = search_items
+        mock_show_details.return_value = [self.show_details]
+        mock_show_episodes.return_value = self.show_episodes
+        mock_reminders.return_value = []
+
+        builder = GuideBuilder(datetime(2024, 10, 12), mock_session, ['Sydney', 'Melbourne', 'Perth'])
+        for guide in builder.guides.values():
+            guide.source_data = { 'fta': self.fta_data }
+        builder.create_guides()
+
+        mock_search_items.assert_called_once()
+        mock_show_details.assert_called_once()
+        mock_show_episodes.assert_called_once()
+        self.assertEqual(mock_session.commit.call_count, 3)
+        for guide in builder.guides.values():
+            self.assertEqual(len(guide.fta_shows), 5)
+            self.assertFalse(guide.fta_shows[0].repeat)
+        self.assertEqual(
+            builder.guides['Sydney'].fta_shows[0].db_event,
+            "Season 4 Episode 4 (The Sontaran Strategem) has aired today"
+        )
+        self.assertIsNone(builder.guides['Melbourne'].fta_shows[0].db_event)
+        self.assertIsNotNone(builder.guides['Sydney'].fta_shows[0].airing_values())
+        self.assertIsNone(builder.guides['Melbourne'].fta_shows[0].airing_values())
+
+    @patch('sqlalchemy.orm.session')
+    @patch('database.models.GuideEpisode.GuideEpisode.get_episodes_for_guide')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    @patch('database.models.SearchItemModel.SearchItem.get_active_searches')
+    def test_guide_builder_refreshes_published_guide(
+        self,
+        mock_search_items: MagicMock,
+        mock_show_details: MagicMock,
+        mock_show_episodes: MagicMock,
+        mock_reminders: MagicMock,
+        mock_stored_episodes: MagicMock,
+        mock_session: MagicMock
+    ):
+        mock_search_items.return_value = search_items
+        mock_show_details.return_value = [self.show_details]
+        mock_show_episodes.return_value = self.show_episodes
+        mock_reminders.return_value = []
+
+        builder = GuideBuilder(datetime(2023, 10, 30), mock_session, ['Sydney'])
+        guide = builder.guides['Sydney']
+        guide.source_data = { 'fta': self.fta_data }
+        builder.build_guides()
+        guide.id = 1
+        for idx, guide_episode in enumerate(guide.fta_shows):
+            guide_episode.id = idx + 1
+            guide_episode.guide_id = guide.id
+        mock_stored_episodes.return_value = list(guide.fta_shows)
+
+        abc1_listings = self.fta_data['schedule'][0]['listing']
+        listings = [listing for listing in abc1_listings if listing['title'] == 'Doctor Who']
+        listings[0]['end_time'] = '2023-10-30T09:52:00'
+        abc1_listings.remove(listings[1])
+
+        refresh = GuideBuilder(datetime(2023, 10, 30), mock_session, ['Sydney'], published_guides={ 'Sydney': guide })
+        guide.source_data = { 'fta': self.fta_data }
+        refresh.build_guides()
+        mock_session.reset_mock()
+        guide.save_guide()
+
+        self.assertIs(refresh.guides['Sydney'], guide)
+        self.assertEqual(len(guide.fta_shows), 4)
+        self.assertEqual([guide_episode.id for guide_episode in guide.removed_shows], [2])
+        self.assertEqual(guide.unchanged_shows, {3, 4, 5})
+        self.assertEqual(guide.fta_shows[0].end_time, datetime(2023, 10, 30, 9, 52))
+        self.assertFalse(guide.fta_shows[0].repeat)
+        updated_episodes = [
+            call.args[1]
+            for call in mock_session.execute.call_args_list
+            if len(call.args) > 1 and call.args[1][0].get('guide_id') == guide.id
+        ]
+        self.assertEqual([[values['id'] for values in updated] for updated in updated_episodes], [[1]])
+
+    def test_guide_source_endpoints_use_region(self):
+        guide = Guide(datetime(2024, 10, 12), MagicMock(), 'Perth')
+
+        endpoints = guide.source_endpoints()
+
+        self.assertEqual(endpoints['fta'], "https://cdn.iview.abc.net.au/epg/processed/Perth_2024-10-12.json")
+        self.assertIn('timezone=Australia%2FPerth', endpoints['bbc_first'])
+        self.assertEqual(guide.timezone, 'Australia/Perth')
+        self.assertFalse(guide.is_primary_region())
+
+    @patch.dict(os.environ, { 'GUIDE_REGIONS': 'Perth, Adelaide' })
+    def test_guide_configured_regions_include_primary_region(self):
+        self.assertEqual(Guide.configured_regions(), ['Sydney', 'Perth', 'Adelaide'])
+
+    @patch.dict(os.environ, { 'GUIDE_REGIONS': 'Sydney,Hobart' })
+    def test_guide_configured_regions_unknown_region(self):
+        with self.assertRaises(ValueError):
+            Guide.configured_regions()
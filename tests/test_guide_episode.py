@@ -7,6 +7,7 @@ import unittest
 load_dotenv('.env')
 
 from database.models.GuideEpisode import GuideEpisode
+from database.models.ShowEpisodeModel import ShowEpisode
 from tests.test_data.guide_episodes import guide_episodes
 from tests.test_data.show_episodes import dw_show_episodes, show_episodes
 from tests.test_data.show_details import show_details
@@ -35,21 +36,53 @@ class TestGuideEpisode(unittest.TestCase):
     def test_guide_episode_repeat_false_no_show_episode(self):
         self.assertFalse(guide_episodes[1].repeat)
 
+    def test_guide_episode_classify_airing(self):
+        guide_episode = GuideEpisode('Doctor Who', 'ABC1', datetime(2024, 10, 12, 9), datetime(2024, 10, 12, 9, 47), 4, 4, '', 1, 1)
+
+        guide_episode.classify_airing(set(), None)
+        self.assertEqual((guide_episode.airing_status, guide_episode.repeat), (GuideEpisode.FIRST_AIRING, False))
+
+        guide_episode.classify_airing({ 'ABC1', 'ABC2' }, None)
+        self.assertEqual((guide_episode.airing_status, guide_episode.repeat), (GuideEpisode.REPEAT, True))
+
+        guide_episode.classify_airing({ None }, None)
+        self.assertEqual((guide_episode.airing_status, guide_episode.repeat), (GuideEpisode.REPEAT, True))
+
+        guide_episode.classify_airing({ 'ABC2' }, None)
+        self.assertEqual((guide_episode.airing_status, guide_episode.repeat), (GuideEpisode.FIRST_ON_CHANNEL, True))
+
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.get_earlier_channels')
     @patch('sqlalchemy.orm.session')
-    def test_guide_episode_repeat_false_show_episode(self, mock_session: MagicMock):
-        mock_session.return_value = True
-        show_episodes[0].air_dates = []
-        guide_episodes[0].show_episode = show_episodes[0]
-        guide_episodes[0].check_repeat(mock_session)
-        self.assertFalse(guide_episodes[0].repeat)
-    
-    @patch('sqlalchemy.orm.session')
-    def test_guide_episode_repeat_true(self, mock_session: MagicMock):
-        mock_session.return_value = True
-        show_episodes[0].air_dates = [datetime(2023, 9, 12, hour=20, minute=30)]
-        guide_episodes[0].show_episode = show_episodes[0]
-        guide_episodes[0].check_repeat(mock_session)
-        self.assertTrue(guide_episodes[0].repeat)
+    def test_guide_episode_classify_airings(self, mock_session: MagicMock, mock_earlier_channels: MagicMock):
+        aired_episode = ShowEpisode('Doctor Who', 4, 4, 'The Sontaran Stratagem', '', [], ['ABC1'], [], 1)
+        aired_episode.id = 7
+        new_episode = ShowEpisode('Doctor Who', 4, 5, 'The Poison Sky', '', [], ['ABC1'], [], 1)
+        mock_earlier_channels.return_value = { 7: { 'ABC1' } }
+        guide_episodes = [
+            GuideEpisode('Doctor Who', 'ABCHD', datetime(2024, 10, 12, 9), datetime(2024, 10, 12, 9, 47), 4, 4, '', 1, 1),
+            GuideEpisode('Doctor Who', 'ABC1', datetime(2024, 10, 12, 9), datetime(2024, 10, 12, 9, 47), 4, 4, '', 1, 1),
+            GuideEpisode('Doctor Who', 'ABC1', datetime(2024, 10, 12, 9, 50), datetime(2024, 10, 12, 10, 37), 4, 5, '', 1, 1),
+            GuideEpisode('Doctor Who', 'ABC2', datetime(2024, 10, 12, 21), datetime(2024, 10, 12, 21, 47), 4, 5, '', 1, 1),
+            GuideEpisode('Vera', 'ABC1', datetime(2024, 10, 12, 20, 30), datetime(2024, 10, 12, 22), 1, 1, '', 1, 2)
+        ]
+        for guide_episode, show_episode in zip(guide_episodes, [aired_episode, aired_episode, new_episode, new_episode, None]):
+            guide_episode.show_episode = show_episode
+
+        changed_episodes = GuideEpisode.classify_airings(guide_episodes, mock_session)
+
+        self.assertEqual(
+            [(guide_episode.airing_status, guide_episode.repeat) for guide_episode in guide_episodes],
+            [
+                (GuideEpisode.SIMULCAST, True),
+                (GuideEpisode.REPEAT, True),
+                (GuideEpisode.FIRST_AIRING, False),
+                (GuideEpisode.SIMULCAST, False),
+                (GuideEpisode.FIRST_AIRING, False)
+            ]
+        )
+        self.assertEqual(len(changed_episodes), 5)
+        self.assertEqual(mock_earlier_channels.call_args.args[:2], ([7, 7], datetime(2024, 10, 12, 9)))
+        self.assertEqual(GuideEpisode.classify_airings(guide_episodes, mock_session), [])
 
     @patch('sqlalchemy.orm.session')
     def test_guide_episode_capture_db_event_show_details_episode_none(self, mock_session: MagicMock):
@@ -60,7 +93,7 @@ class TestGuideEpisode(unittest.TestCase):
         self.assertIsNone(guide_episodes[0].show_details)
         self.assertIsNone(guide_episodes[0].show_episode)
         
-        guide_episodes[0].capture_db_event(mock_session)
+        guide_episodes[0].capture_db_event()
         self.assertIsNotNone(guide_episodes[0].show_details)
         self.assertEqual(guide_episodes[0].show_details.title, 'Doctor Who')
         self.assertIsNotNone(guide_episodes[0].show_episode)
@@ -76,7 +109,7 @@ class TestGuideEpisode(unittest.TestCase):
         self.assertIsNotNone(guide_episodes[0].show_details)
         self.assertIsNone(guide_episodes[0].show_episode)
 
-        guide_episodes[0].capture_db_event(mock_session)
+        guide_episodes[0].capture_db_event()
 
         self.assertIsNotNone(guide_episodes[0].show_details)
         self.assertEqual(guide_episodes[0].show_details.title, 'Doctor Who')
@@ -94,7 +127,7 @@ class TestGuideEpisode(unittest.TestCase):
         self.assertIsNone(guide_episodes[0].show_details)
         self.assertIsNotNone(guide_episodes[0].show_episode)
 
-        guide_episodes[0].capture_db_event(mock_session)
+        guide_episodes[0].capture_db_event()
 
         self.assertIsNotNone(guide_episodes[0].show_details)
         self.assertEqual(guide_episodes[0].show_details.title, 'Doctor Who')
@@ -103,16 +136,34 @@ class TestGuideEpisode(unittest.TestCase):
         self.assertEqual(guide_episodes[0].db_event, "This show is now being recorded")
 
     @patch('sqlalchemy.orm.session')
-    def test_guide_episode_capture_db_event_adds_air_date(self, mock_session: MagicMock):
+    def test_guide_episode_capture_db_event_records_airing(self, mock_session: MagicMock):
         mock_session.return_value = True
         guide_episodes[0].show_details = show_details[0]
         guide_episodes[0].show_episode = show_episodes[0]
         
-        guide_episodes[0].capture_db_event(mock_session)
+        guide_episodes[0].capture_db_event()
 
-        self.assertIn(datetime(2024, 8, 10, 22, 4), guide_episodes[0].show_episode.air_dates)
+        self.assertEqual(guide_episodes[0].airing_values()['aired_at'], datetime(2024, 8, 10, 22, 4))
+        self.assertNotIn(datetime(2024, 8, 10, 22, 4), guide_episodes[0].show_episode.air_dates)
         self.assertEqual(guide_episodes[0].db_event, "Season 2 Episode 5 (Rise of the Cybermen) has aired today")
 
+    def test_guide_episode_airing_values(self):
+        show_episode = ShowEpisode('Doctor Who', 4, 4, 'The Sontaran Stratagem', '', [], ['ABC1'], [], 1)
+        show_episode.id = 7
+        guide_episode = GuideEpisode('Doctor Who', 'ABC1', datetime(2024, 10, 12, 9), datetime(2024, 10, 12, 9, 47), 4, 4, '', 1, 1)
+        guide_episode.id = 3
+        guide_episode.show_details = show_details[0]
+        guide_episode.show_episode = show_episode
+
+        self.assertIsNone(guide_episode.airing_values())
+
+        guide_episode.capture_db_event()
+
+        self.assertEqual(
+            guide_episode.airing_values(),
+            { 'episode_id': 7, 'aired_at': datetime(2024, 10, 12, 9), 'channel': 'ABC1', 'guide_episode_id': 3 }
+        )
+
     @patch('sqlalchemy.orm.session')
     def test_guide_episode_capture_db_event_adds_channel(self, mock_session: MagicMock):
         mock_session.return_value = True
@@ -123,7 +174,7 @@ class TestGuideEpisode(unittest.TestCase):
         
         self.assertNotIn("ABC3", guide_episodes[0].show_episode.channels)
         
-        guide_episodes[0].capture_db_event(mock_session)
+        guide_episodes[0].capture_db_event()
 
         self.assertIn("ABC3", guide_episodes[0].show_episode.channels)
         self.assertEqual(guide_episodes[0].db_event, "ABC3 has been added to the channel list.")
@@ -137,16 +188,25 @@ class TestGuideEpisode(unittest.TestCase):
         mock_session.return_value = True
         guide_episodes[0].show_episode = show_episodes[0]
 
-        guide_episodes[0].check_repeat(mock_session)
+        guide_episodes[0].classify_airing({ 'ABC2' }, None)
         message = guide_episodes[0].message_string()
 
         self.assertEqual(message, "22:04: Doctor Who is on ABC2 (Season 2, Episode 5: Rise of the Cybermen) (Repeat)")
 
+        guide_episodes[0].classify_airing({ 'ABC1' }, None)
+        message = guide_episodes[0].message_string()
+
+        self.assertEqual(
+            message,
+            "22:04: Doctor Who is on ABC2 (Season 2, Episode 5: Rise of the Cybermen) (Repeat, first time on ABC2)"
+        )
+        guide_episodes[0].airing_status = None
+
     @patch('sqlalchemy.orm.session')
     def test_guide_episode_to_dict(self, mock_session: MagicMock):
 
         guide_episodes[0].show_episode = None
-        guide_episodes[0].check_repeat(mock_session)
+        guide_episodes[0].classify_airing(set(), None)
 
         guide_episode_dict = guide_episodes[0].to_dict()
 
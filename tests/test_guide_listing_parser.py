@@ -0,0 +1,117 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+import json
+
+from aux_methods.types import GuideListing
+from services.APIClient import APIClient
+from utils.guide_listing_parser import GuideListingParser, listings_from_schedule
+
+
+def chunk(content: bytes, size: int):
+    return [content[idx:idx + size] for idx in range(0, len(content), size)]
+
+
+class TestGuideListingParser(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        with open('dev-data/fta_source_data.json', 'rb') as fd:
+            self.fta_source_data = fd.read()
+        self.iview_data = json.dumps({
+            'date': '2024-10-12',
+            'schedule': [
+                {
+                    'channel': 'ABC1',
+                    'listing': [
+                        {
+                            'title': 'Doctor Who',
+                            'start_time': '2024-10-12T09:00:00',
+                            'end_time': '2024-10-12T09:47:00',
+                            'series_num': '4',
+                            'episode_num': '4',
+                            'episode_title': 'The Sontaran Strategem',
+                            'image_file': 'doctor_who.jpg',
+                            'captioning': True,
+                            'crid': 'ZW0937A003S00',
+                            'categories': ['Drama', { 'name': 'Sci-Fi' }]
+                        },
+                        {
+                            'title': 'Vera \\"Hidden\\" é',
+                            'start_time': '2024-10-12T20:30:00',
+                            'end_time': '2024-10-12T22:00:00'
+                        }
+                    ]
+                }
+            ]
+        }, ensure_ascii=False).encode()
+
+    def test_guide_listing_parser_matches_decoded_schedule(self):
+        expected = list(listings_from_schedule(json.loads(self.fta_source_data)))
+
+        for size in [1, 7, 4096]:
+            listings = list(GuideListingParser.parse(chunk(self.fta_source_data, size)))
+            self.assertEqual(listings, expected)
+
+    def test_guide_listing_parser_keeps_listing_fields(self):
+        listings = list(GuideListingParser.parse(chunk(self.iview_data, 5)))
+
+        self.assertEqual(len(listings), 2)
+        self.assertEqual(
+            listings[0],
+            GuideListing(
+                'ABC1',
+                'Doctor Who',
+                '2024-10-12T09:00:00',
+                '2024-10-12T09:47:00',
+                '4',
+                '4',
+                'The Sontaran Strategem'
+            )
+        )
+        self.assertEqual(listings[1].title, 'Vera \\"Hidden\\" é')
+        self.assertIsNone(listings[1].series_num)
+        self.assertIsNone(listings[1].episode_title)
+
+    def test_guide_listing_parser_channel_after_listing(self):
+        content = b'[{"listing": [{"title": "Vera", "start_time": "2024-10-12T20:30:00"}], "channel": "ABC1"}]'
+
+        listings = list(GuideListingParser.parse(chunk(content, 3)))
+
+        self.assertEqual(listings[0].channel, 'ABC1')
+        self.assertEqual(listings[0].title, 'Vera')
+
+    def test_guide_listing_parser_returns_listings_as_they_complete(self):
+        parser = GuideListingParser()
+
+        first = parser.feed(b'[{"channel": "ABC1", "listing": [{"title": "Vera"}, {"title": "Sha')
+        second = parser.feed(b'kespeare & Hathaway"}]}]')
+
+        self.assertEqual([listing.title for listing in first], ['Vera'])
+        self.assertEqual([listing.title for listing in second], ['Shakespeare & Hathaway'])
+        self.assertEqual(parser.close(), [])
+
+    def test_guide_listing_parser_numbers_split_across_chunks(self):
+        content = b'[{"channel": "ABC1", "listing": [{"title": "Vera", "series_num": 12.5, "episode_num": 1e2}]}]'
+
+        for split in [content.index(b'.5'), content.index(b'e2'), content.index(b'e2') + 1]:
+            listings = list(GuideListingParser.parse([content[:split], content[split:]]))
+
+            self.assertEqual(listings[0].series_num, 12.5)
+            self.assertEqual(listings[0].episode_num, 100)
+
+    def test_guide_listing_parser_incomplete_data(self):
+        with self.assertRaises(ValueError):
+            list(GuideListingParser.parse([b'[{"channel": "ABC1", "listing": [{"title": "Vera"}']))
+
+    @patch('services.APIClient.requests.request')
+    def test_api_client_streams_listings(self, mock_request: MagicMock):
+        response = MagicMock()
+        response.ok = True
+        response.iter_content.return_value = chunk(self.iview_data, 64)
+        mock_request.return_value = response
+
+        listings = APIClient().get('https://source-data.com', stream_parser=GuideListingParser)
+
+        self.assertEqual(len(listings), 2)
+        self.assertTrue(mock_request.call_args.kwargs['stream'])
+        response.json.assert_not_called()
@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+from utils.identity_cache import Identity, IdentityCache
+
+
+class TestIdentityCache(TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.identity_cache = IdentityCache(ttl=300, max_size=2, clock=lambda: self.now)
+        self.claims = { 'sub': 'ngin', 'id': 1, 'role': 'Admin', 'iat': 1000 }
+
+    def test_identity_cache_trusts_recent_claims(self):
+        identity = self.identity_cache.get('ngin', self.claims)
+
+        self.assertEqual(identity, Identity(1, 'ngin', 'Admin'))
+
+    def test_identity_cache_does_not_trust_old_claims(self):
+        self.now = 1300.0
+
+        self.assertIsNone(self.identity_cache.get('ngin', self.claims))
+
+    def test_identity_cache_does_not_trust_claims_without_role(self):
+        del self.claims['role']
+
+        self.assertIsNone(self.identity_cache.get('ngin', self.claims))
+
+    def test_identity_cache_does_not_trust_claims_issued_before_invalidation(self):
+        self.now = 1010.0
+        self.identity_cache.invalidate('ngin')
+
+        self.assertIsNone(self.identity_cache.get('ngin', self.claims))
+        self.assertEqual(self.identity_cache.get('ngin', { **self.claims, 'iat': 1011 }), Identity(1, 'ngin', 'Admin'))
+
+    def test_identity_cache_returns_loaded_identity_until_ttl(self):
+        self.identity_cache.set(Identity(1, 'ngin', 'User'))
+
+        self.now = 1299.0
+        self.assertEqual(self.identity_cache.get('ngin'), Identity(1, 'ngin', 'User'))
+        self.now = 1300.0
+        self.assertIsNone(self.identity_cache.get('ngin'))
+
+    def test_identity_cache_invalidates_loaded_identity(self):
+        self.identity_cache.set(Identity(1, 'ngin', 'User'))
+        self.identity_cache.invalidate('ngin')
+
+        self.assertIsNone(self.identity_cache.get('ngin'))
+
+    def test_identity_cache_drops_least_recently_used_identity(self):
+        self.identity_cache.set(Identity(1, 'ngin', 'User'))
+        self.identity_cache.set(Identity(2, 'hermes', 'User'))
+        self.identity_cache.get('ngin')
+        self.identity_cache.set(Identity(3, 'guide', 'User'))
+
+        self.assertIsNotNone(self.identity_cache.get('ngin'))
+        self.assertIsNone(self.identity_cache.get('hermes'))
@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta, timezone
+from flask import Flask
+from unittest import TestCase
+from werkzeug.http import http_date
+import json
+
+from database.models.ShowEpisodeModel import ShowEpisodeRow
+from utils import json_serialiser
+
+
+class TestJSONSerialiser(TestCase):
+
+    def test_json_serialiser_encodes_datetimes_as_http_dates(self):
+        result = json_serialiser.dumps({
+            'air_dates': [datetime(2024, 10, 12, 19, 30), datetime(2024, 10, 12, 8, 30, tzinfo=timezone.utc)],
+            'date': date(2024, 10, 12)
+        })
+
+        self.assertEqual(json.loads(result), {
+            'air_dates': ['Sat, 12 Oct 2024 19:30:00 GMT', 'Sat, 12 Oct 2024 08:30:00 GMT'],
+            'date': 'Sat, 12 Oct 2024 00:00:00 GMT'
+        })
+
+    def test_json_serialiser_formats_http_dates_as_werkzeug_does(self):
+        for value in [
+            datetime(2024, 2, 29, 23, 59, 59),
+            datetime(2024, 1, 1, 9, 5, tzinfo=timezone(timedelta(hours=11))),
+            date(1999, 12, 31)
+        ]:
+            self.assertEqual(json_serialiser.http_date(value), http_date(value))
+
+    def test_json_serialiser_serialises_episode_rows(self):
+        row = ShowEpisodeRow(10, 'Doctor Who', 4, 1, 'Partners in Crime', [], ['ABC1'], [datetime(2024, 10, 12, 19, 30)])
+
+        self.assertEqual(json.loads(json_serialiser.dumps([row])), [{
+            'id': 10,
+            'show': 'Doctor Who',
+            'season_number': 4,
+            'episode_number': 1,
+            'episode_title': 'Partners in Crime',
+            'alternative_titles': [],
+            'channels': ['ABC1'],
+            'air_dates': ['Sat, 12 Oct 2024 19:30:00 GMT']
+        }])
+
+    def test_json_serialiser_rejects_unknown_types(self):
+        with self.assertRaises(TypeError):
+            json_serialiser.dumps({ 'value': object() })
+
+    def test_json_serialiser_provides_flask_responses(self):
+        app = Flask(__name__)
+        app.json = json_serialiser.OrjsonProvider(app)
+
+        with app.app_context():
+            response = app.json.response({ 'date': datetime(2024, 10, 12, 19, 30) })
+
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_json(), { 'date': 'Sat, 12 Oct 2024 19:30:00 GMT' })
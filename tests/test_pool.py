@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError
+from unittest import TestCase
+
+from database.pool import InstrumentedQueuePool
+
+
+class TestInstrumentedQueuePool(TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://', poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_pool_records_checkouts(self):
+        connection = self.engine.connect()
+        stats = self.engine.pool.stats()
+        connection.close()
+
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['checked_out'], 1)
+        self.assertEqual(stats['checkouts'], 1)
+        self.assertEqual(stats['checkout_timeouts'], 0)
+        self.assertEqual(self.engine.pool.stats()['checked_out'], 0)
+
+    def test_pool_records_checkout_timeouts(self):
+        connection = self.engine.connect()
+        with self.assertRaises(TimeoutError):
+            self.engine.connect()
+        connection.close()
+
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['checkout_timeouts'], 1)
+        self.assertGreater(stats['checkout_wait_max'], 0)
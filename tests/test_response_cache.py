@@ -0,0 +1,77 @@
+from flask import Flask
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from database.models.DataVersionModel import DataVersion
+from utils.response_cache import ResponseCache
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.response_cache = ResponseCache(max_size=2)
+        self.build = MagicMock(return_value=([{ 'show_name': 'Doctor Who' }], { 'X-Next-Cursor': 'Doctor Who' }))
+
+    def test_response_cache_builds_response_once_per_version(self):
+        with self.app.test_request_context('/api/shows'):
+            first = self.response_cache.respond(('shows',), 1, self.build)
+            second = self.response_cache.respond(('shows',), 1, self.build)
+
+        self.build.assert_called_once()
+        self.assertEqual(first.get_json(), [{ 'show_name': 'Doctor Who' }])
+        self.assertEqual(second.get_data(), first.get_data())
+        self.assertEqual(second.headers['X-Next-Cursor'], 'Doctor Who')
+        self.assertEqual(second.headers['Cache-Control'], 'no-cache')
+
+    def test_response_cache_rebuilds_response_for_new_version(self):
+        with self.app.test_request_context('/api/shows'):
+            first = self.response_cache.respond(('shows',), 1, self.build)
+            second = self.response_cache.respond(('shows',), 2, self.build)
+
+        self.assertEqual(self.build.call_count, 2)
+        self.assertNotEqual(first.get_etag(), second.get_etag())
+
+    def test_response_cache_returns_not_modified_for_matching_etag(self):
+        etag = ResponseCache.etag(('shows',), 1)
+        with self.app.test_request_context('/api/shows', headers={ 'If-None-Match': f'"{etag}"' }):
+            response = self.response_cache.respond(('shows',), 1, self.build)
+
+        self.build.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_etag()[0], etag)
+
+    def test_response_cache_marks_unversioned_responses_immutable(self):
+        with self.app.test_request_context('/api/guide'):
+            response = self.response_cache.respond(('guide',), None, self.build)
+
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_response_cache_drops_least_recently_used_response(self):
+        with self.app.test_request_context('/api/shows'):
+            self.response_cache.respond(('shows', 1), 1, self.build)
+            self.response_cache.respond(('shows', 2), 1, self.build)
+            self.response_cache.respond(('shows', 1), 1, self.build)
+            self.response_cache.respond(('shows', 3), 1, self.build)
+            self.response_cache.respond(('shows', 1), 1, self.build)
+            self.response_cache.respond(('shows', 2), 1, self.build)
+
+        self.assertEqual(self.build.call_count, 4)
+
+
+class TestDataVersion(TestCase):
+
+    @patch('sqlalchemy.orm.session')
+    def test_data_version_bumps_versions(self, mock_session: MagicMock):
+        DataVersion.bump([DataVersion.GUIDE, DataVersion.SHOWS], mock_session)
+
+        query = str(mock_session.execute.call_args.args[0])
+        self.assertIn('INSERT INTO "DataVersion"', query)
+        self.assertIn('ON CONFLICT (name) DO UPDATE SET version = ("DataVersion".version +', query)
+        mock_session.commit.assert_not_called()
+
+    @patch('sqlalchemy.orm.session')
+    def test_data_version_defaults_to_zero(self, mock_session: MagicMock):
+        mock_session.scalar.return_value = None
+
+        self.assertEqual(DataVersion.get_version(DataVersion.SHOWS, mock_session), 0)
@@ -1,9 +1,11 @@
+from datetime import datetime
 from dotenv import load_dotenv
 from unittest.mock import MagicMock, patch
 import unittest
 import json
 import os
 
+from aux_methods.types import ShowData
 from database.models.SearchItemModel import SearchItem
 from tests.test_data.search_items import search_items
 
@@ -50,27 +52,42 @@ class TestSearchConditions(unittest.TestCase):
         self.assertEqual(search_item.show, "Endeavour")    
 
     def test_search_conditions_no_details(self):
-        episode = {
-            "season_number": -1,
-            "episode_title": ""
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            -1,
+            0,
+            ""
+        )
         result = self.search_items[0].check_search_conditions(episode)
         self.assertTrue(result)
 
     def test_search_ignore_episodes_false(self):
-        episode = {
-            "season_number": -1,
-            "episode_title": "Tooth and Claw"
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            -1,
+            0,
+            "Tooth and Claw"
+        )
 
         result = self.search_items[0].check_search_conditions(episode)
         self.assertTrue(result)
 
     def test_search_ignore_episodes_true(self):
-        episode = {
-            "season_number": -1,
-            "episode_title": "Tooth and Claw"
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            -1,
+            0,
+            "Tooth and Claw"
+        )
         self.search_items[0].ignore_episodes = [
             "Tooth and Claw"
         ]
@@ -79,42 +96,58 @@ class TestSearchConditions(unittest.TestCase):
         self.assertFalse(result)
 
     def test_search_inside_season_range(self):
-        episode = {
-            "season_number": 7,
-            "episode_number": 1,
-            "episode_title": "Asylum of the Daleks"
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            7,
+            1,
+            "Asylum of the Daleks"
+        )
 
         result = self.search_items[0].check_search_conditions(episode)
         self.assertTrue(result)
 
     def test_search_outside_season_range(self):
-        episode = {
-            "season_number": 15,
-            "episode_number": 4,
-            "episode_title": ""
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            15,
+            4,
+            ""
+        )
 
         result = self.search_items[0].check_search_conditions(episode)
         self.assertFalse(result)
 
     def test_search_ignore_seasons(self):
-        episode = {
-            "season_number": 8,
-            "episode_number": 7,
-            "episode_title": "Kill the Moon"
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            8,
+            7,
+            "Kill the Moon"
+        )
         self.search_items[0].ignore_seasons = [8]
 
         result = self.search_items[0].check_search_conditions(episode)
         self.assertFalse(result)
 
     def test_search_ignore_episodes(self):
-        episode = {
-            "season_number": 8,
-            "episode_number": 7,
-            "episode_title": "Kill the Moon"
-        }
+        episode = ShowData(
+            "Doctor Who",
+            "ABC1",
+            datetime(2024, 10, 12, 20, 30),
+            datetime(2024, 10, 12, 21, 30),
+            8,
+            7,
+            "Kill the Moon"
+        )
         self.search_items[0].ignore_episodes = ["Kill the Moon"]
 
         result = self.search_items[0].check_search_conditions(episode)
@@ -1,8 +1,10 @@
 from datetime import datetime
+from sqlalchemy import select
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
-from database.models.ShowEpisodeModel import ShowEpisode
+from database.models.ShowDetailsModel import ShowDetails
+from database.models.ShowEpisodeModel import ShowEpisode, ShowEpisodeRow, ShowEpisodeSummaryRow
 from tests.test_data.show_episodes import (
     add_channel_show_episodes,
     add_episodes,
@@ -58,6 +60,34 @@ class TestShowEpisode(TestCase):
         self.assertEqual(episode.episode_number, 6)
         self.assertEqual(episode.episode_title, "Icarus")
 
+    @patch('database.models.ShowEpisodeAliasModel.ShowEpisodeAlias.search_episodes')
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_search_finds_episode_by_alias(self, mock_session: MagicMock, mock_search_aliases: MagicMock):
+        mock_search_aliases.return_value = { ("Endeavour", "ICARUS"): show_episodes[1] }
+
+        episodes = ShowEpisode.search_for_episodes([("Endeavour", -1, 0, "ICARUS")], mock_session)
+
+        self.assertEqual(episodes[("Endeavour", -1, 0, "ICARUS")], show_episodes[1])
+        self.assertEqual(mock_search_aliases.call_args.args[0], { ("Endeavour", "ICARUS") })
+        mock_session.execute.assert_not_called()
+
+    @patch('database.models.ShowEpisodeAliasModel.ShowEpisodeAlias.add_aliases')
+    @patch('database.models.ShowEpisodeAliasModel.ShowEpisodeAlias.search_episodes')
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_search_learns_aliases(
+        self,
+        mock_session: MagicMock,
+        mock_search_aliases: MagicMock,
+        mock_add_aliases: MagicMock
+    ):
+        mock_search_aliases.return_value = {}
+        mock_session.execute.return_value = [(show_episodes[1], "icarus")]
+
+        episodes = ShowEpisode.search_for_episodes([("Endeavour", -1, 0, "icarus")], mock_session)
+
+        self.assertEqual(episodes[("Endeavour", -1, 0, "icarus")], show_episodes[1])
+        mock_add_aliases.assert_called_once_with([(show_episodes[1], "icarus")], mock_session)
+
     @patch('sqlalchemy.orm.session')
     def test_show_episode_returns_episodes_by_season(self, mock_session: MagicMock):
         mock_session.scalars.return_value = find_episodes_by_season(dw_show_episodes, "Doctor Who", 2)
@@ -111,6 +141,64 @@ class TestShowEpisode(TestCase):
         self.assertEqual(show_episode.episode_title, "Stage 01 - The Day a New Demon Was Born")
         mock_session.commit.assert_called()
 
+    @patch('database.models.ShowDetailsModel.ShowDetails.update_latest_episodes')
+    @patch('database.models.ListingResolutionModel.ListingResolution.invalidate_episodes')
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_update_replaces_aliases(
+        self,
+        mock_session: MagicMock,
+        mock_invalidate_episodes: MagicMock,
+        mock_update_latest_episodes: MagicMock
+    ):
+        show_episode = ShowEpisode('Code Geass', 1, 1, 'The Day a Demon was Born', 'First episode', show_id=3)
+        show_episode.id = 30
+
+        show_episode_dict = show_episode.to_dict()
+        show_episode_dict['episode_title'] = 'Stage 01'
+        show_episode.update_full_episode(show_episode_dict, mock_session)
+
+        compiled = [call.args[0].compile() for call in mock_session.execute.call_args_list]
+        alias_statements = [statement for statement in compiled if '"ShowEpisodeAlias"' in str(statement)]
+        self.assertEqual(len(alias_statements), 2)
+        self.assertTrue(str(alias_statements[0]).startswith('DELETE FROM "ShowEpisodeAlias"'))
+        self.assertEqual(alias_statements[0].params['episode_id_1'], [30])
+        self.assertTrue(str(alias_statements[1]).startswith('INSERT INTO "ShowEpisodeAlias"'))
+        self.assertIn('stage 01', alias_statements[1].params.values())
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_update_keeps_air_dates(self, mock_session: MagicMock):
+        show_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', [], ['ABC1'], [datetime(2024, 10, 12, 19, 30)], 1)
+
+        show_episode_dict = show_episode.to_dict()
+        show_episode_dict['air_dates'] = ['Sat, 12 Oct 2024 19:30:00 GMT', 'Sun, 13 Oct 2024 19:30:00 GMT']
+        show_episode.update_full_episode(show_episode_dict, mock_session)
+
+        self.assertEqual(show_episode.air_dates, [datetime(2024, 10, 12, 19, 30)])
+
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.record_airings')
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_add_all_episodes_records_air_dates(self, mock_session: MagicMock, mock_record_airings: MagicMock):
+        aired_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', [], ['ABC1'], [datetime(2024, 10, 12, 19, 30)], 1)
+        new_episode = ShowEpisode('Doctor Who', 4, 2, 'The Fires of Pompeii', '', [], ['ABC1'], [], 1)
+        def flush():
+            aired_episode.id, new_episode.id = 10, 11
+        mock_session.flush.side_effect = flush
+
+        ShowEpisode.add_all_episodes([aired_episode, new_episode], mock_session)
+
+        self.assertEqual(
+            mock_record_airings.call_args.args[0],
+            [{ 'episode_id': 10, 'aired_at': datetime(2024, 10, 12, 19, 30), 'channel': None }]
+        )
+
+    def test_show_episode_air_dates_only_loaded_when_serialised(self):
+        self.assertNotIn('"EpisodeAiring"', str(select(ShowEpisode)))
+
+        mock_session = MagicMock()
+        ShowEpisode.get_episode_by_id(20, mock_session)
+
+        self.assertIn('"EpisodeAiring"', str(mock_session.scalar.call_args.args[0]))
+
     @patch('sqlalchemy.orm.session')
     def test_show_episode_deletes_episode(self, mock_session: MagicMock):
 
@@ -127,30 +215,130 @@ class TestShowEpisode(TestCase):
         mock_session.delete.assert_called()
         mock_session.commit.assert_called()
 
+    def latest_show_details(self, latest_season_number: int, latest_episode_number: int):
+        show_details = ShowDetails('Doctor Who', '', '210', [], '')
+        show_details.latest_season_number = latest_season_number
+        show_details.latest_episode_number = latest_episode_number
+        return show_details
+
     @patch('sqlalchemy.orm.session')
     def test_show_episode_latest_season(self, mock_session: MagicMock):
-        mock_session.scalar.side_effect = [2, 13]
+        show_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', show_id=1)
+        show_episode.show_details = self.latest_show_details(2, 13)
 
-        latest_episode_check = dw_show_episodes[4].is_latest_episode(mock_session)
+        latest_episode_check = show_episode.is_latest_episode(mock_session)
 
         self.assertTrue(latest_episode_check)
+        mock_session.get.assert_not_called()
 
     @patch('sqlalchemy.orm.session')
     def test_show_episode_latest_episode_true(self, mock_session: MagicMock):
-        mock_session.scalar.side_effect = [4, 1]
+        show_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', show_id=1)
+        mock_session.get.return_value = self.latest_show_details(4, 1)
 
-        latest_episode_check = dw_show_episodes[4].is_latest_episode(mock_session)
+        latest_episode_check = show_episode.is_latest_episode(mock_session)
 
         self.assertTrue(latest_episode_check)
+        mock_session.get.assert_called_once()
 
     @patch('sqlalchemy.orm.session')
     def test_show_episode_latest_episode_false(self, mock_session: MagicMock):
-        mock_session.scalar.side_effect = [4, 13]
+        show_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', show_id=1)
+        show_episode.show_details = self.latest_show_details(4, 13)
 
-        latest_episode_check = dw_show_episodes[4].is_latest_episode(mock_session)
+        latest_episode_check = show_episode.is_latest_episode(mock_session)
 
         self.assertFalse(latest_episode_check)
 
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_latest_episode_no_episodes(self, mock_session: MagicMock):
+        show_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', show_id=1)
+        show_episode.show_details = self.latest_show_details(None, None)
+
+        self.assertFalse(show_episode.is_latest_episode(mock_session))
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_special_is_not_latest_episode(self, mock_session: MagicMock):
+        show_episode = ShowEpisode('Doctor Who', 4, None, 'The Next Doctor', '', show_id=1)
+        show_episode.show_details = self.latest_show_details(4, 13)
+
+        self.assertFalse(show_episode.is_latest_episode(mock_session))
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_details_latest_episode_skips_specials(self, mock_session: MagicMock):
+        ShowDetails.update_latest_episodes([1], mock_session)
+
+        query = str(mock_session.execute.call_args.args[0])
+        self.assertIn('"ShowEpisode".season_number IS NOT NULL', query)
+        self.assertIn('"ShowEpisode".episode_number IS NOT NULL', query)
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_add_all_episodes_updates_latest_episode(self, mock_session: MagicMock):
+        episodes = [
+            ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', show_id=1),
+            ShowEpisode('Doctor Who', 4, 2, 'The Fires of Pompeii', '', show_id=1)
+        ]
+
+        ShowEpisode.add_all_episodes(episodes, mock_session)
+
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        self.assertTrue(any('UPDATE "ShowDetails" SET latest_season_number' in statement for statement in statements))
+        mock_session.commit.assert_called_once()
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_get_latest_episode_ids(self, mock_session: MagicMock):
+        mock_session.scalars.return_value = [2]
+
+        self.assertEqual(ShowEpisode.get_latest_episode_ids([1, 2], mock_session), { 2 })
+        self.assertEqual(ShowEpisode.get_latest_episode_ids([], mock_session), set())
+        mock_session.scalars.assert_called_once()
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_get_episode_counts(self, mock_session: MagicMock):
+        mock_session.execute.return_value = [(1, 26, 2)]
+
+        self.assertEqual(ShowEpisode.get_episode_counts([1, 2], mock_session), { 1: (26, 2) })
+        self.assertIn('GROUP BY "ShowEpisode".show_id', str(mock_session.execute.call_args.args[0]))
+        self.assertEqual(ShowEpisode.get_episode_counts([], mock_session), {})
+        mock_session.execute.assert_called_once()
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_get_episode_rows(self, mock_session: MagicMock):
+        air_dates = [datetime(2024, 10, 12, 19, 30)]
+        mock_session.execute.return_value = [
+            (1, 10, 'Doctor Who', 4, 1, 'Partners in Crime', [], ['ABC1'], air_dates, 'Donna returns'),
+            (1, 11, 'Doctor Who', 4, 2, 'The Fires of Pompeii', [], [], [], 'Pompeii')
+        ]
+
+        episode_rows = ShowEpisode.get_episode_rows([1, 2], mock_session)
+
+        self.assertEqual(list(episode_rows.keys()), [1])
+        self.assertEqual(
+            episode_rows[1][0],
+            ShowEpisodeSummaryRow(10, 'Doctor Who', 4, 1, 'Partners in Crime', [], ['ABC1'], air_dates, 'Donna returns')
+        )
+        self.assertIn('"ShowEpisode".summary', str(mock_session.execute.call_args.args[0]))
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_get_episode_rows_without_summaries(self, mock_session: MagicMock):
+        mock_session.execute.return_value = [(1, 10, 'Doctor Who', 4, 1, 'Partners in Crime', [], [], [])]
+
+        episode_rows = ShowEpisode.get_episode_rows([1], mock_session, include_summary=False)
+
+        self.assertEqual(episode_rows, { 1: [ShowEpisodeRow(10, 'Doctor Who', 4, 1, 'Partners in Crime', [], [], [])] })
+        self.assertNotIn('"ShowEpisode".summary', str(mock_session.execute.call_args.args[0]))
+        self.assertEqual(ShowEpisode.get_episode_rows([], mock_session), {})
+
+    @patch('sqlalchemy.orm.session')
+    def test_show_details_get_shows_page(self, mock_session: MagicMock):
+        mock_session.scalars.return_value = []
+
+        ShowDetails.get_shows_page(mock_session, 'Doctor Who', 20, include_episodes=False)
+
+        query = mock_session.scalars.call_args.args[0]
+        self.assertIn('"ShowDetails".title >', str(query))
+        self.assertIn('ORDER BY "ShowDetails".title', str(query))
+
     def test_show_episode_channel_check_false_abchd(self):
         self.assertFalse(channel_check_show_episodes[0].channel_check("ABC1"))
 
@@ -203,22 +391,40 @@ class TestShowEpisode(TestCase):
 
         self.assertEqual(len(add_channel_show_episodes[3].channels), 1)
     
-    def test_show_episode_adds_given_air_date(self):
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_adds_given_air_date(self, mock_session: MagicMock):
         
-        show_episodes[1].add_air_date(datetime(2024, 7, 20))
+        show_episodes[1].add_air_date(mock_session, datetime(2024, 7, 20))
 
         self.assertEqual(len(show_episodes[1].air_dates), 1)
         self.assertEqual(datetime(2024, 7, 20), show_episodes[1].air_dates[0])
+        # the episode hasn't been saved, so its airings are recorded when it is added
+        mock_session.execute.assert_not_called()
 
+    @patch('sqlalchemy.orm.session')
     @patch('data_validation.validation.Validation.get_current_date')
-    def test_show_episode_adds_current_air_date(self, mock_current_date: MagicMock):
+    def test_show_episode_adds_current_air_date(self, mock_current_date: MagicMock, mock_session: MagicMock):
         mock_current_date.return_value = datetime(2024, 7, 21)
         
-        channel_check_show_episodes[0].add_air_date()
+        channel_check_show_episodes[0].add_air_date(mock_session)
 
         self.assertEqual(len(channel_check_show_episodes[0].air_dates), 1)
         self.assertEqual(datetime(2024, 7, 21), channel_check_show_episodes[0].air_dates[0])
 
+    @patch('sqlalchemy.orm.session')
+    def test_show_episode_add_air_date_records_airing(self, mock_session: MagicMock):
+        show_episode = ShowEpisode('Doctor Who', 4, 1, 'Partners in Crime', '', [], ['ABC1'], [], 1)
+        show_episode.id = 10
+
+        show_episode.add_air_date(mock_session, datetime(2024, 10, 12, 19, 30), 'ABC1')
+
+        query = mock_session.execute.call_args.args[0]
+        self.assertIn('INSERT INTO "EpisodeAiring"', str(query))
+        self.assertEqual(
+            query.compile().params,
+            { 'episode_id_m0': 10, 'aired_at_m0': datetime(2024, 10, 12, 19, 30), 'channel_m0': 'ABC1' }
+        )
+
     def test_show_episode_to_dict(self):
         
         show_episode_dict = show_episodes[1].to_dict()
@@ -232,3 +438,9 @@ class TestShowEpisode(TestCase):
         self.assertEqual(show_episode_dict['channels'], ["ABC1", "ABCHD"])
         self.assertEqual(len(show_episode_dict['air_dates']), 1)
         self.assertEqual(show_episode_dict['air_dates'][0], datetime(2024, 7, 20))
+
+    def test_show_episode_to_dict_without_summary(self):
+        show_episode_dict = dw_show_episodes[4].to_dict(include_summary=False)
+
+        self.assertNotIn('summary', show_episode_dict)
+        self.assertEqual(show_episode_dict['episode_title'], dw_show_episodes[4].episode_title)
@@ -0,0 +1,223 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from aux_methods.types import ShowData
+from database.models.ListingResolutionModel import ListingResolution
+from database.models.ShowEpisodeModel import ShowEpisode
+from database.show_resolver import ShowResolver
+from tests.test_data.reminders import reminders
+from tests.test_data.show_details import show_details
+from tests.test_data.show_episodes import dw_show_episodes
+
+
+class TestShowResolver(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.shows_data = [
+            ShowData(
+                'Doctor Who',
+                'ABC1',
+                datetime(2024, 10, 12, 9),
+                datetime(2024, 10, 12, 9, 47),
+                4,
+                4,
+                'The Sontaran Strategem'
+            ),
+            ShowData(
+                'Doctor Who',
+                'ABCHD',
+                datetime(2024, 10, 12, 9),
+                datetime(2024, 10, 12, 9, 47),
+                4,
+                4,
+                'The Sontaran Strategem'
+            ),
+            ShowData(
+                'Vera',
+                'ABC1',
+                datetime(2024, 10, 12, 20, 30),
+                datetime(2024, 10, 12, 22),
+                1,
+                1,
+                'Hidden Depths'
+            )
+        ]
+
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    def test_show_resolver_resolves_shows(
+        self,
+        mock_show_details: MagicMock,
+        mock_show_episodes: MagicMock,
+        mock_reminders: MagicMock
+    ):
+        mock_show_details.return_value = [show_details[0]]
+        mock_show_episodes.return_value = {
+            ('Doctor Who', 4, 4, 'The Sontaran Strategem'): dw_show_episodes[7]
+        }
+        mock_reminders.return_value = [reminders[0]]
+
+        resolved_shows = ShowResolver(MagicMock()).resolve(self.shows_data)
+
+        self.assertEqual(len(resolved_shows), 2)
+        resolved_show = resolved_shows[('Doctor Who', 4, 4, 'The Sontaran Strategem')]
+        self.assertEqual(resolved_show['show_details'], show_details[0])
+        self.assertEqual(resolved_show['show_episode'], dw_show_episodes[7])
+        self.assertEqual(resolved_show['reminder'], reminders[0])
+        mock_show_details.assert_called_once()
+        mock_show_episodes.assert_called_once()
+        mock_reminders.assert_called_once()
+
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    def test_show_resolver_show_details_not_found(
+        self,
+        mock_show_details: MagicMock,
+        mock_show_episodes: MagicMock,
+        mock_reminders: MagicMock
+    ):
+        mock_show_details.return_value = [show_details[0]]
+        mock_show_episodes.return_value = {}
+        mock_reminders.return_value = []
+
+        resolved_shows = ShowResolver(MagicMock()).resolve(self.shows_data)
+
+        resolved_show = resolved_shows[('Vera', 1, 1, 'Hidden Depths')]
+        self.assertIsNone(resolved_show['show_details'])
+        self.assertIsNone(resolved_show['show_episode'])
+        self.assertIsNone(resolved_show['reminder'])
+        self.assertNotIn(('Vera', 1, 1, 'Hidden Depths'), mock_show_episodes.call_args.args[0])
+
+    @patch('database.models.ListingResolutionModel.ListingResolution.save_resolutions')
+    @patch('database.models.ListingResolutionModel.ListingResolution.get_resolutions')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    def test_show_resolver_uses_listing_resolutions(
+        self,
+        mock_show_details: MagicMock,
+        mock_show_episodes: MagicMock,
+        mock_reminders: MagicMock,
+        mock_listing_resolutions: MagicMock,
+        mock_save_resolutions: MagicMock
+    ):
+        shows_data = [
+            *self.shows_data,
+            ShowData('Doctor Who', 'ABC1', datetime(2024, 10, 12, 9, 50), datetime(2024, 10, 12, 10, 37), 4, 5, '')
+        ]
+        mock_show_details.return_value = [show_details[0]]
+        mock_listing_resolutions.return_value = { ('Doctor Who', 4, 4, 'The Sontaran Strategem'): dw_show_episodes[7] }
+        mock_show_episodes.return_value = { ('Doctor Who', 4, 5, ''): dw_show_episodes[8] }
+        mock_reminders.return_value = []
+
+        resolved_shows = ShowResolver(MagicMock()).resolve(shows_data)
+
+        self.assertEqual(resolved_shows[('Doctor Who', 4, 4, 'The Sontaran Strategem')]['show_episode'], dw_show_episodes[7])
+        self.assertEqual(resolved_shows[('Doctor Who', 4, 5, '')]['show_episode'], dw_show_episodes[8])
+        self.assertEqual(mock_show_episodes.call_args.args[0], [('Doctor Who', 4, 5, '')])
+        self.assertEqual(mock_save_resolutions.call_args.args[0], { ('Doctor Who', 4, 5, ''): dw_show_episodes[8] })
+
+    @patch('database.models.ListingResolutionModel.ListingResolution.save_resolutions')
+    @patch('database.models.ListingResolutionModel.ListingResolution.get_resolutions')
+    @patch('database.models.ReminderModel.Reminder.get_reminders_by_shows')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.search_for_episodes')
+    @patch('database.models.ShowEpisodeModel.ShowEpisode.get_episodes_by_shows')
+    @patch('database.models.ShowDetailsModel.ShowDetails.get_shows_by_titles')
+    def test_show_resolver_uses_episode_catalog(
+        self,
+        mock_show_details: MagicMock,
+        mock_catalog_episodes: MagicMock,
+        mock_show_episodes: MagicMock,
+        mock_reminders: MagicMock,
+        mock_listing_resolutions: MagicMock,
+        mock_save_resolutions: MagicMock
+    ):
+        shows_data = [
+            *self.shows_data,
+            ShowData('Doctor Who', 'ABC1', datetime(2024, 10, 12, 9, 50), datetime(2024, 10, 12, 10, 37), 4, 5, '')
+        ]
+        mock_show_details.return_value = [show_details[0]]
+        mock_catalog_episodes.return_value = [dw_show_episodes[7]]
+        mock_show_episodes.return_value = {}
+        mock_reminders.return_value = []
+        mock_listing_resolutions.return_value = {}
+
+        show_resolver = ShowResolver(MagicMock())
+        resolved_shows = show_resolver.resolve(shows_data)
+
+        self.assertEqual(resolved_shows[('Doctor Who', 4, 4, 'The Sontaran Strategem')]['show_episode'], dw_show_episodes[7])
+        self.assertIsNone(resolved_shows[('Doctor Who', 4, 5, '')]['show_episode'])
+        self.assertEqual(mock_catalog_episodes.call_args.args[0], ['Doctor Who'])
+        self.assertEqual(mock_show_episodes.call_args.args[0], [('Doctor Who', 4, 5, '')])
+        self.assertEqual(
+            mock_save_resolutions.call_args.args[0],
+            { ('Doctor Who', 4, 4, 'The Sontaran Strategem'): dw_show_episodes[7] }
+        )
+
+        show_episode = ShowEpisode('Doctor Who', 4, 5, '', '', [], ['ABC1'], [datetime(2024, 10, 12, 9, 50)], None)
+        show_resolver.add_episode(show_episode)
+
+        self.assertIs(resolved_shows[('Doctor Who', 4, 5, '')]['show_episode'], show_episode)
+        self.assertIs(show_resolver.resolve(shows_data)[('Doctor Who', 4, 5, '')]['show_episode'], show_episode)
+        mock_show_episodes.assert_called_once()
+
+    def test_listing_resolution_matches_episode(self):
+        show_episode = dw_show_episodes[7]
+
+        numbered = ListingResolution('Doctor Who', 4, 4, '', 1)
+        titled = ListingResolution('Doctor Who', -1, 0, show_episode.episode_title.upper(), 1)
+        renumbered = ListingResolution('Doctor Who', 4, 5, '', 1)
+
+        self.assertTrue(numbered.matches(show_episode))
+        self.assertTrue(titled.matches(show_episode))
+        self.assertFalse(renumbered.matches(show_episode))
+
+    def test_listing_resolution_matches_episode_title_keys(self):
+        show_episode = ShowEpisode('Doctor Who', 4, 18, 'The End of Time (Part II)', '', ['End of Time: Part Two'], [], [], None)
+
+        spelling = ListingResolution('Doctor Who', -1, 0, 'The End Of Time Part 2', 1)
+        alternative = ListingResolution('Doctor Who', -1, 0, 'End of Time - Part Two', 1)
+        aliased = ListingResolution('Doctor Who', -1, 0, 'The Final Hour', 1)
+
+        self.assertTrue(spelling.matches(show_episode))
+        self.assertTrue(alternative.matches(show_episode))
+        self.assertFalse(aliased.matches(show_episode))
+        self.assertTrue(aliased.matches(show_episode, ['the final hour']))
+
+    def test_listing_resolution_keeps_aliased_resolutions(self):
+        mock_session = MagicMock()
+        show_episode = ShowEpisode('Doctor Who', 4, 18, 'The End of Time (Part II)', '', [], [], [], None)
+        resolution = ListingResolution('Doctor Who', -1, 0, 'The Final Hour', 1)
+        mock_session.execute.return_value = [(resolution, show_episode, ['the final hour'])]
+
+        resolutions = ListingResolution.get_resolutions([resolution.resolution_key()], mock_session)
+
+        self.assertIs(resolutions[resolution.resolution_key()], show_episode)
+        self.assertEqual(mock_session.execute.call_count, 1)
+
+    def test_show_resolver_resolves_no_shows(self):
+        mock_session = MagicMock()
+
+        self.assertEqual(ShowResolver(mock_session).resolve([]), {})
+        mock_session.scalars.assert_not_called()
+
+    def test_show_data_is_immutable(self):
+        show = self.shows_data[0]
+
+        with self.assertRaises(AttributeError):
+            show.title = 'Vera'
+        self.assertFalse(hasattr(show, '__dict__'))
+        self.assertEqual(show.resolution_key, ('Doctor Who', 4, 4, 'The Sontaran Strategem'))
+
+    def test_show_data_deduplicates_by_value(self):
+        duplicate = ShowData(*self.shows_data[0].to_dict().values())
+
+        shows = list(dict.fromkeys([*self.shows_data, duplicate]))
+
+        self.assertEqual(duplicate, self.shows_data[0])
+        self.assertEqual(len(shows), 3)
+        self.assertEqual(ShowResolver.resolution_key(self.shows_data[1]), self.shows_data[0].resolution_key)
@@ -0,0 +1,215 @@
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import MagicMock, patch
+import json
+import os
+import tempfile
+
+from exceptions.service_error import HTTPRequestError
+from services.APIClient import APIClient
+from services.AsyncAPIClient import AsyncAPIClient
+from services.SnapshotStore import SnapshotStore
+from utils.guide_listing_parser import GuideListingParser
+
+
+ENDPOINT = 'https://cdn.iview.abc.net.au/epg/processed/Sydney_2024-10-12.json'
+GUIDE_DATE = datetime(2024, 10, 12)
+
+
+def mock_response(status_code: int, content: bytes = b'', headers: dict = {}):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.reason = 'Reason'
+    response.iter_content.side_effect = lambda chunk_size: (
+        content[start:start + chunk_size] for start in range(0, len(content), chunk_size)
+    )
+    response.headers = headers
+    response.__enter__.return_value = response
+    return response
+
+
+class TestSnapshotStore(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot_store = SnapshotStore(self.directory.name, ttl=0)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_saves_content_addressed_snapshot(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(200, b'{"schedule": []}', { 'ETag': '"abc"' })
+
+        data = APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        self.assertEqual(data, { 'schedule': [] })
+        entry = self.snapshot_store.lookup(ENDPOINT, GUIDE_DATE)
+        self.assertEqual(entry['etag'], '"abc"')
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, 'objects', entry['digest'])))
+        with open(os.path.join(self.directory.name, 'index.json')) as fd:
+            self.assertIn(SnapshotStore.snapshot_key(ENDPOINT, GUIDE_DATE), json.load(fd))
+
+    @patch('services.APIClient.APIClient.chunk_size', 4)
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_streams_response_body(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(200, b'[{"channel": "ABC1", "listing": [{"title": "Doctor Who"}]}]')
+
+        data = APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE, stream_parser=GuideListingParser)
+
+        self.assertEqual([(listing.channel, listing.title) for listing in data], [('ABC1', 'Doctor Who')])
+        self.assertTrue(mock_request.call_args.kwargs['stream'])
+        mock_request.return_value.iter_content.assert_called_once_with(chunk_size=4)
+        mock_request.return_value.__exit__.assert_called_once()
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_discards_malformed_streamed_body(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(200, b'{"schedule": []}')
+        APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        mock_request.return_value = mock_response(200, b'[{"channel": "ABC1", "listing": [{"title": "Ve')
+        data = APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE, stream_parser=GuideListingParser)
+
+        self.assertEqual(data, [])
+        self.assertEqual(len(self.snapshot_store.lookup(ENDPOINT, GUIDE_DATE)['history']), 1)
+        self.assertFalse(any(name.endswith('.tmp') for name in os.listdir(os.path.join(self.directory.name, 'objects'))))
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_sends_conditional_request(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(
+            200,
+            b'{"schedule": []}',
+            { 'ETag': '"abc"', 'Last-Modified': 'Sat, 12 Oct 2024 00:00:00 GMT' }
+        )
+        APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        mock_request.return_value = mock_response(304)
+        data = APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        headers = mock_request.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+        self.assertEqual(headers['If-Modified-Since'], 'Sat, 12 Oct 2024 00:00:00 GMT')
+        self.assertEqual(data, { 'schedule': [] })
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_serves_fresh_snapshot_without_request(self, mock_request: MagicMock):
+        self.snapshot_store.ttl = 3600
+        mock_request.return_value = mock_response(200, b'{"schedule": []}')
+        APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        data = APIClient().get_snapshot(ENDPOINT, SnapshotStore(self.directory.name, ttl=3600), GUIDE_DATE)
+
+        self.assertEqual(data, { 'schedule': [] })
+        mock_request.assert_called_once()
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_keeps_history_of_changed_feeds(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(200, b'{"schedule": []}')
+        APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+        mock_request.return_value = mock_response(200, b'{"schedule": [{"channel": "ABC1"}]}')
+        APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        entry = self.snapshot_store.lookup(ENDPOINT, GUIDE_DATE)
+        self.assertEqual(len(entry['history']), 2)
+        self.assertEqual(self.snapshot_store.load(entry), { 'schedule': [{ 'channel': 'ABC1' }] })
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_serves_last_snapshot_when_offline(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(200, b'{"schedule": []}')
+        APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        mock_request.return_value = mock_response(503)
+        data = APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+        self.assertEqual(data, { 'schedule': [] })
+
+    @patch('services.APIClient.requests.request')
+    def test_snapshot_store_raises_when_offline_without_snapshot(self, mock_request: MagicMock):
+        mock_request.return_value = mock_response(503)
+
+        with self.assertRaises(HTTPRequestError):
+            APIClient().get_snapshot(ENDPOINT, self.snapshot_store, GUIDE_DATE)
+
+
+class TestAsyncSnapshotStore(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.requests: list[web.Request] = []
+        self.available = True
+
+        async def schedule(request: web.Request):
+            self.requests.append(request)
+            if not self.available:
+                return web.Response(status=503)
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            return web.json_response({ 'schedule': [] }, headers={ 'ETag': '"v1"' })
+
+        async def broken(request: web.Request):
+            return web.Response(body=b'[{"channel": "ABC1", "listing": [{"title": "Ve')
+
+        app = web.Application()
+        app.router.add_get('/schedule', schedule)
+        app.router.add_get('/broken', broken)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.directory = tempfile.TemporaryDirectory()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def test_async_api_client_revalidates_snapshot(self):
+        api_client = AsyncAPIClient(snapshot_store=SnapshotStore(self.directory.name, ttl=0))
+        endpoints = { 'fta': str(self.server.make_url('/schedule')) }
+
+        await api_client.get_all(endpoints, snapshot_date=GUIDE_DATE)
+        results, errors = await api_client.get_all(endpoints, snapshot_date=GUIDE_DATE)
+
+        self.assertEqual(results, { 'fta': { 'schedule': [] } })
+        self.assertEqual(errors, {})
+        self.assertEqual(self.requests[1].headers['If-None-Match'], '"v1"')
+
+    async def test_async_api_client_serves_snapshot_when_offline(self):
+        api_client = AsyncAPIClient(snapshot_store=SnapshotStore(self.directory.name, ttl=0))
+        endpoints = { 'fta': str(self.server.make_url('/schedule')) }
+
+        await api_client.get_all(endpoints, snapshot_date=GUIDE_DATE)
+        self.available = False
+        results, errors = await api_client.get_all(endpoints, snapshot_date=GUIDE_DATE)
+
+        self.assertEqual(results, { 'fta': { 'schedule': [] } })
+        self.assertEqual(errors, {})
+
+    async def test_async_api_client_streams_snapshot_to_parser(self):
+        snapshot_store = SnapshotStore(self.directory.name, ttl=0)
+        endpoints = { 'fta': str(self.server.make_url('/schedule')) }
+
+        with patch.object(SnapshotStore, 'open', autospec=True, side_effect=SnapshotStore.open) as mock_open:
+            results, errors = await AsyncAPIClient(snapshot_store=snapshot_store).get_all(endpoints, snapshot_date=GUIDE_DATE)
+
+        mock_open.assert_called_once()
+        self.assertEqual(results, { 'fta': { 'schedule': [] } })
+        entry = snapshot_store.lookup(endpoints['fta'], GUIDE_DATE)
+        self.assertEqual(snapshot_store.load(entry), { 'schedule': [] })
+        self.assertEqual(sorted(os.listdir(snapshot_store.objects_path)), [entry['digest']])
+
+    async def test_async_api_client_discards_malformed_snapshot(self):
+        snapshot_store = SnapshotStore(self.directory.name, ttl=0)
+        endpoints = { 'fta': str(self.server.make_url('/broken')) }
+
+        results, errors = await AsyncAPIClient(snapshot_store=snapshot_store).get_all(
+            endpoints,
+            snapshot_date=GUIDE_DATE,
+            stream_parsers={ 'fta': GuideListingParser }
+        )
+
+        self.assertEqual(results, {})
+        self.assertIsInstance(errors['fta'], ValueError)
+        self.assertIsNone(snapshot_store.lookup(endpoints['fta'], GUIDE_DATE))
+        self.assertEqual(os.listdir(snapshot_store.objects_path), [])
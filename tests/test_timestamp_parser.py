@@ -0,0 +1,50 @@
+from datetime import datetime
+from unittest import TestCase
+
+from aux_methods.types import GuideListing
+from utils.timestamp_parser import get_timezone, TimestampParser
+
+
+class TestTimestampParser(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.parser = TimestampParser()
+
+    def test_timestamp_parser_matches_strptime(self):
+        timestamps = ['2024-10-12T09:00:00', '2024-10-12 23:59:59', '2024-02-29T00:00:01']
+
+        parsed = [self.parser.parse(timestamp) for timestamp in timestamps]
+
+        self.assertEqual(
+            parsed,
+            [datetime.strptime(timestamp.replace(' ', 'T'), '%Y-%m-%dT%H:%M:%S') for timestamp in timestamps]
+        )
+
+    def test_timestamp_parser_reuses_parsed_timestamps(self):
+        first = self.parser.parse('2024-10-12T09:00:00')
+        second = self.parser.parse('2024-10-12T09:00:00')
+
+        self.assertIs(first, second)
+        self.assertIsNone(self.parser.parse(None))
+
+    def test_timestamp_parser_other_iso_formats(self):
+        self.assertEqual(self.parser.parse('2024-10-12T09:00'), datetime(2024, 10, 12, 9))
+        with self.assertRaises(ValueError):
+            self.parser.parse('2024-13-12T09:00:00')
+
+    def test_timestamp_parser_parses_listings(self):
+        listings = [
+            GuideListing('ABC1', 'Vera', '2024-10-12T20:30:00', '2024-10-12T22:00:00', None, None, None),
+            GuideListing('ABC1', 'Grantchester', '2024-10-12T22:00:00', None, '9', '1', None)
+        ]
+
+        parsed = self.parser.parse_listings(listings)
+
+        self.assertEqual(parsed[0].start_time, datetime(2024, 10, 12, 20, 30))
+        self.assertIs(parsed[0].end_time, parsed[1].start_time)
+        self.assertIsNone(parsed[1].end_time)
+        self.assertEqual(parsed[1].series_num, '9')
+
+    def test_get_timezone_is_cached(self):
+        self.assertIs(get_timezone('Australia/Perth'), get_timezone('Australia/Perth'))
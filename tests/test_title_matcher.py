@@ -0,0 +1,55 @@
+import unittest
+
+from database.models.SearchItemModel import SearchItem
+from utils.title_matcher import TitleMatcher
+
+
+class TestTitleMatcher(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.search_items = [
+            SearchItem("Doctor Who", False, 14, { 'ignore_titles': ["Doctor Who Confidential"] }),
+            SearchItem("Endeavour", True, 9),
+            SearchItem("NCIS", False, 21, { 'ignore_titles': ["NCIS: Los Angeles"] }),
+            SearchItem("Who Do You Think You Are?", False, 15)
+        ]
+        self.title_matcher = TitleMatcher(self.search_items)
+
+    def test_title_matcher_matches_substring(self):
+        matches = self.title_matcher.match("Doctor Who: The Day of the Doctor")
+
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].show, "Doctor Who")
+
+    def test_title_matcher_ignores_case(self):
+        matches = self.title_matcher.match("DOCTOR WHO")
+
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].show, "Doctor Who")
+
+    def test_title_matcher_returns_no_matches(self):
+        self.assertEqual(self.title_matcher.match("Vera"), [])
+
+    def test_title_matcher_returns_all_matches(self):
+        matches = self.title_matcher.match("Doctor Who Do You Think You Are?")
+
+        self.assertEqual([match.show for match in matches], ["Doctor Who", "Who Do You Think You Are?"])
+
+    def test_title_matcher_exact_title_match(self):
+        self.assertEqual(len(self.title_matcher.match("Endeavour")), 1)
+        self.assertEqual(len(self.title_matcher.match("Endeavour: Icarus")), 1)
+        self.assertEqual(self.title_matcher.match("Young Endeavour"), [])
+        self.assertEqual(self.title_matcher.match("Endeavours"), [])
+
+    def test_title_matcher_ignore_titles(self):
+        self.assertEqual(self.title_matcher.match("Doctor Who Confidential"), [])
+        self.assertEqual(self.title_matcher.match("NCIS: Los Angeles"), [])
+
+        matches = self.title_matcher.match("NCIS: New Orleans")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].show, "NCIS")
+
+
+if __name__ == '__main__':
+    unittest.main()
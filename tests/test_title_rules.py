@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from utils.title_rules import get_title_rules, RuleSet, TitleRule, TitleRules
+
+
+class TestTitleRules(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.title_rules = get_title_rules()
+
+    def test_title_rules_transformers_overrides(self):
+        self.assertEqual(
+            self.title_rules.normalise('Transformers: Revenge Of The Fallen', -1, 0, ''),
+            ('Transformers', 1, 2, 'Revenge of the Fallen')
+        )
+        self.assertEqual(self.title_rules.normalise('Bumblebee', -1, 0, ''), ('Transformers', 1, 6, 'Bumblebee'))
+        self.assertEqual(
+            self.title_rules.normalise('Transformers: Cyberverse', 2, 3, 'Bumblebee/Hot Rod'),
+            ('Transformers: Cyberverse', 2, 3, 'Bumblebee/Hot Rod')
+        )
+        self.assertEqual(
+            self.title_rules.normalise('Transformers: Prime', 1, 1, ''),
+            ('Transformers: Prime', 1, 1, '')
+        )
+
+    def test_title_rules_split_title_and_alias(self):
+        self.assertEqual(
+            self.title_rules.normalise('Maigret: Maigret Sets A Trap', -1, 0, ''),
+            ('Maigret', -1, 0, 'Maigret Sets A Trap')
+        )
+        self.assertEqual(self.title_rules.normalise('Vera - Hidden Depths', 1, 1, ''), ('Vera', 1, 1, 'Hidden Depths'))
+        self.assertEqual(self.title_rules.normalise('Death in Paradise', 1, 1, ''), ('Death In Paradise', 1, 1, ''))
+        self.assertEqual(self.title_rules.canonical_title('Endeavour'), 'Endeavour')
+
+    def test_title_rules_channel_episode_numbers(self):
+        self.assertEqual(self.title_rules.episode_numbers('SBS', 'Litvinenko', 'Litvinenko Series 1 Ep 3'), (1, 3))
+        self.assertIsNone(self.title_rules.episode_numbers('ABC1', 'Litvinenko', 'Litvinenko Series 1 Ep 3'))
+        self.assertIsNone(self.title_rules.episode_numbers('SBS', 'Vera', 'Litvinenko Series 1 Ep 3'))
+
+    def test_title_rules_loaded_from_data(self):
+        title_rules = TitleRules({
+            'aliases': [{ 'contains': ['Midsomer Murders Special'], 'title': 'Midsomer Murders' }],
+            'channel_formats': [{ 'channel': '10', 'episode_pattern': 'S(?P<season_number>\\d+)E(?P<episode_number>\\d+)' }]
+        })
+
+        self.assertEqual(title_rules.canonical_title('Midsomer Murders Special'), 'Midsomer Murders')
+        self.assertEqual(title_rules.episode_numbers('10 Peach', 'NCIS', 'S4E12'), (4, 12))
+
+    def test_rule_set_keeps_rule_order(self):
+        rule_set = RuleSet([
+            TitleRule(contains=('Doctor Who',), excludes=('Confidential',), title='Doctor Who'),
+            TitleRule(contains=('Doctor',), title='Doctor'),
+            TitleRule(equals='Doctor Who Confidential', title='Confidential')
+        ])
+
+        self.assertEqual(rule_set.match('Doctor Who: Blink').title, 'Doctor Who')
+        self.assertEqual(rule_set.match('Doctor Who Confidential').title, 'Doctor')
+        self.assertEqual(rule_set.match('Doctor Foster').title, 'Doctor')
+        self.assertIsNone(rule_set.match('Vera'))
+        self.assertEqual(rule_set.keywords_in('Doctor Who Confidential'), { 'Doctor', 'Doctor Who', 'Confidential' })
+
+    def test_rule_set_memoises_titles(self):
+        rule_set = RuleSet([TitleRule(contains=('Maigret',), title='Maigret')])
+
+        first = rule_set.match('Maigret In Montmartre')
+        rule_set.rules = []
+
+        self.assertIs(rule_set.match('Maigret In Montmartre'), first)
@@ -0,0 +1,108 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from database.models import ShowEpisode
+from database.upgrade import upgrade_database, upgrade_episode_aliases, UPGRADES
+
+
+class TestUpgrade(TestCase):
+
+    def executed_statements(self, mock_session: MagicMock):
+        return [str(call.args[0]) for call in mock_session.execute.call_args_list]
+
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_adds_guide_status(self, mock_session: MagicMock):
+        upgrade_database(mock_session)
+
+        statements = self.executed_statements(mock_session)
+        self.assertIn('ALTER TABLE "Guide" ADD COLUMN IF NOT EXISTS status TEXT', statements)
+        self.assertTrue(any(
+            statement.startswith('UPDATE "Guide" SET status=') and '"Guide".status IS NULL' in statement
+            for statement in statements
+        ))
+
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_adds_guide_region(self, mock_session: MagicMock):
+        upgrade_database(mock_session)
+
+        statements = self.executed_statements(mock_session)
+        self.assertIn('ALTER TABLE "Guide" ADD COLUMN IF NOT EXISTS region TEXT', statements)
+        self.assertTrue(any(
+            statement.startswith('UPDATE "Guide" SET region=') and '"Guide".region IS NULL' in statement
+            for statement in statements
+        ))
+
+    @patch('database.models.ShowDetailsModel.ShowDetails.update_latest_episodes')
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_points_every_show_at_its_latest_episode(self, mock_session: MagicMock, mock_update_latest_episodes: MagicMock):
+        mock_session.scalars.return_value.all.return_value = [1, 2, 3]
+
+        upgrade_database(mock_session)
+
+        statements = self.executed_statements(mock_session)
+        self.assertIn('ALTER TABLE "ShowDetails" ADD COLUMN IF NOT EXISTS latest_season_number INTEGER', statements)
+        self.assertIn('ALTER TABLE "ShowDetails" ADD COLUMN IF NOT EXISTS latest_episode_number INTEGER', statements)
+        self.assertIn(
+            'CREATE INDEX IF NOT EXISTS ix_show_episode_show_id_numbers ON "ShowEpisode" (show_id, season_number, episode_number)',
+            [statement.strip() for statement in statements]
+        )
+        mock_update_latest_episodes.assert_called_once_with([1, 2, 3], mock_session)
+
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_classifies_existing_airings(self, mock_session: MagicMock):
+        upgrade_database(mock_session)
+
+        statements = self.executed_statements(mock_session)
+        self.assertIn('ALTER TABLE "GuideEpisode" ADD COLUMN IF NOT EXISTS airing_status TEXT', statements)
+        self.assertTrue(any(
+            statement.startswith('UPDATE "GuideEpisode" SET airing_status=CASE WHEN ("GuideEpisode".repeat IS true)')
+            and '"GuideEpisode".airing_status IS NULL' in statement
+            for statement in statements
+        ))
+
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.backfill')
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_backfills_episode_airings(self, mock_session: MagicMock, mock_backfill: MagicMock):
+        mock_session.scalar.return_value = 1
+
+        upgrade_database(mock_session)
+
+        mock_backfill.assert_called_once_with(mock_session)
+
+    @patch('database.models.EpisodeAiringModel.EpisodeAiring.backfill')
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_skips_backfill_without_air_dates(self, mock_session: MagicMock, mock_backfill: MagicMock):
+        mock_session.scalar.return_value = None
+
+        upgrade_database(mock_session)
+
+        mock_backfill.assert_not_called()
+
+    @patch('database.upgrade.alias_batch_size', 2)
+    @patch('database.models.ShowEpisodeAliasModel.ShowEpisodeAlias.index_episodes')
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_indexes_existing_episodes(self, mock_session: MagicMock, mock_index_episodes: MagicMock):
+        episodes = [
+            ShowEpisode('Doctor Who', 1, episode_number, f'Episode {episode_number}', '', show_id=1)
+            for episode_number in range(1, 4)
+        ]
+        for episode_id, episode in enumerate(episodes, 1):
+            episode.id = episode_id
+        mock_session.execute.return_value.scalars.return_value.all.side_effect = [episodes[:2], episodes[2:], []]
+
+        upgrade_episode_aliases(mock_session)
+
+        self.assertEqual(
+            [call.args[0] for call in mock_index_episodes.call_args_list],
+            [episodes[:2], episodes[2:]]
+        )
+        batch_queries = [call.args[0] for call in mock_session.execute.call_args_list]
+        self.assertEqual([query.compile().params['id_1'] for query in batch_queries], [0, 2, 3])
+
+    @patch('sqlalchemy.orm.session')
+    def test_upgrade_commits_each_upgrade(self, mock_session: MagicMock):
+        mock_session.scalar.return_value = None
+
+        upgrade_database(mock_session)
+
+        self.assertEqual(mock_session.commit.call_count, len(UPGRADES))
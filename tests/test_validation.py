@@ -4,6 +4,7 @@ import json
 
 from aux_methods.helper_methods import sbs_episode_format
 from data_validation.validation import Validation
+from utils import episode_title_key, format_part_number
 
 class TestValidation(unittest.TestCase):
 
@@ -46,3 +47,14 @@ class TestValidation(unittest.TestCase):
         result = sbs_episode_format(sbs_data['title'], sbs_data['episode_title'])
         
         self.assertEqual(result, 'Series 1 Ep 1')
+
+    def test_episode_title_key(self):
+        self.assertEqual(episode_title_key('Black Spot, The'), episode_title_key('The Black Spot'))
+        self.assertEqual(episode_title_key("The End of Time (Part II)"), episode_title_key('The End Of Time - Part 2'))
+        self.assertEqual(episode_title_key("The Doctor's Daughter"), 'the doctors daughter')
+        self.assertNotEqual(episode_title_key('Partners in Crime'), episode_title_key('Part 1 in Crime'))
+
+    def test_format_part_number(self):
+        self.assertEqual(format_part_number('The End of Time (Part II)'), 'The End of Time Part 2')
+        self.assertEqual(format_part_number('Utopia Part IX'), 'Utopia Part 9')
+        self.assertEqual(format_part_number('Inferno'), 'Inferno')
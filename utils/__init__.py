@@ -1,35 +1,19 @@
 from datetime import datetime
-import pytz
+import re
+
+from utils.timestamp_parser import get_timezone
+from utils.title_rules import get_title_rules
+
+ROMAN_NUMERALS = { 'I': '1', 'II': '2', 'III': '3', 'IV': '4', 'V': '5', 'VI': '6', 'VII': '7', 'VIII': '8', 'IX': '9', 'X': '10' }
+PART_NUMBER_PATTERN = re.compile(r'\(?\b(?P<part>Part) (?P<number>\d+|X|IX|IV|VI{0,3}|I{1,3})\b\)?', re.IGNORECASE)
+TRAILING_ARTICLE_PATTERN = re.compile(r'^(?P<title>.+?), (?P<article>The|An|A)\.?$', re.IGNORECASE)
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
 
 def parse_show(title: str, season_number: int, episode_number: int, episode_title: str):
-    from utils import transformers_handler
-
-    if 'Transformers' in title or 'Bumblebee' in title:
-        handle_result = transformers_handler.handle_transformers_shows(title)
-        if isinstance(handle_result, str):
-            return handle_result, season_number, episode_number, episode_title
-        return handle_result
-    if ': ' in title and episode_title == "":
-        title, episode_title = title.split(': ')
-    if ' - ' in title and episode_title == "":
-        title, episode_title = title.split(' - ')
-    if f'{title} - ' in episode_title:
-        episode_title = episode_title.split(' - ')[1]
-    return check_show_titles(title), season_number, episode_number, episode_title
+    return get_title_rules().normalise(title, season_number, episode_number, episode_title)
 
 def check_show_titles(show_title: str):
-    if 'Maigret' in show_title:
-        return 'Maigret'
-    elif 'Death in Paradise' in show_title:
-        return 'Death In Paradise'
-    elif 'Grantchester Christmas Special' in show_title:
-        return 'Grantchester'
-    elif 'NCIS Encore' in show_title:
-        return 'NCIS'
-    # if 'Christmas Special' in show_title and 'Christmas Special' not in episode_title:
-    #     split_title = show_title.split('Christmas Special')
-    #     episode_title += 'Christmas Special'
-    return show_title
+    return get_title_rules().canonical_title(show_title)
 
 
 def format_episode_title(episode_title: str):
@@ -46,11 +30,30 @@ def format_episode_title(episode_title: str):
 
     return episode_title
 
+def format_part_number(episode_title: str):
+    """
+    Write the part number of a multi-part episode as a number, so `The End of Time (Part II)` becomes `The End of Time Part 2`
+    """
+    return PART_NUMBER_PATTERN.sub(
+        lambda match: f"{match.group('part')} {ROMAN_NUMERALS.get(match.group('number').upper(), match.group('number'))}",
+        episode_title
+    )
+
+def episode_title_key(episode_title: str):
+    """
+    The key episode titles are compared by, so the spellings of a title used by the guides, TVMaze and the search list all match.\n
+    The key is case-folded, with a trailing article moved to the front, part numbers written as numbers and punctuation removed.
+    """
+    key = format_part_number(episode_title.strip())
+    key = TRAILING_ARTICLE_PATTERN.sub(r'\g<article> \g<title>', key)
+    key = PUNCTUATION_PATTERN.sub('', key.casefold())
+    return ' '.join(key.split())
+
 def parse_datetime(date_time: str, format: str):
     """
     Parses a given `date_time` string using a given `format`.\n
     Returns a timezone aware object
     """
     parsed_datetime = datetime.strptime(date_time, format)
-    parsed_datetime = pytz.timezone("Australia/Sydney").localize(parsed_datetime)
+    parsed_datetime = get_timezone("Australia/Sydney").localize(parsed_datetime)
     return parsed_datetime
\ No newline at end of file
@@ -0,0 +1,163 @@
+from typing import Iterable
+import codecs
+import json
+import re
+
+from aux_methods.types import GuideListing
+
+
+TOKEN_PATTERN = re.compile(r'\s*(?:([{}\[\]:,])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null))')
+WHITESPACE_PATTERN = re.compile(r'\s*')
+NUMBER_CONTINUATIONS = '.eE+-'
+LISTING_FIELDS = frozenset(GuideListing._fields) - { 'channel' }
+
+
+class _Frame:
+    __slots__ = ('is_map', 'key', 'expects_key', 'channel', 'channel_frame', 'listing', 'pending')
+
+    def __init__(self, is_map: bool):
+        self.is_map = is_map
+        self.key: str = None
+        self.expects_key = is_map
+        self.channel: str = None
+        self.channel_frame: '_Frame' = None
+        self.listing: dict = None
+        self.pending: list[dict] = None
+
+
+class GuideListingParser:
+    """
+    An incremental parser for the iview EPG data, fed the response body one chunk at a time.\n
+    The body is tokenised rather than decoded, and only the fields of each item in a `listing` array
+    (and the `channel` of the object that holds it) are kept, so the full schedule is never built in memory.
+    Each listing is returned as a `GuideListing` as soon as its object is closed.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._stack: list[_Frame] = []
+        self._ready: list[GuideListing] = []
+
+    @classmethod
+    def parse(cls, chunks: Iterable[bytes | str]):
+        """
+        Parse the body given by `chunks`, yielding each `GuideListing` found
+        """
+        parser = cls()
+        for chunk in chunks:
+            yield from parser.feed(chunk)
+        yield from parser.close()
+
+    def feed(self, chunk: bytes | str):
+        """
+        Parse the next chunk of the body and return the listings it completed
+        """
+        self._buffer += self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self._tokenise(final=False)
+        return self._take_ready()
+
+    def close(self):
+        """
+        Parse the rest of the body and return the listings it completed.\n
+        Raises `ValueError` if the body is not complete JSON.
+        """
+        self._buffer += self._decoder.decode(b'', final=True)
+        self._tokenise(final=True)
+        if WHITESPACE_PATTERN.fullmatch(self._buffer) is None or len(self._stack) > 0:
+            raise ValueError('The guide data ended before the JSON was complete')
+        return self._take_ready()
+
+    def _take_ready(self):
+        ready, self._ready = self._ready, []
+        return ready
+
+    def _tokenise(self, final: bool):
+        buffer = self._buffer
+        position = 0
+        while True:
+            match = TOKEN_PATTERN.match(buffer, position)
+            if match is None:
+                break
+            literal = match.group(3)
+            # a number may go on in the next chunk, as in `12` then `.5`, so it is only taken once it is followed by something else
+            if literal is not None and not final and (match.end() == len(buffer) or buffer[match.end()] in NUMBER_CONTINUATIONS):
+                break
+            position = match.end()
+            punctuation = match.group(1)
+            if punctuation is not None:
+                self._punctuation(punctuation)
+            else:
+                self._scalar(match.group(2), literal)
+        self._buffer = buffer[position:]
+
+    def _punctuation(self, token: str):
+        if token == '{' or token == '[':
+            frame = _Frame(token == '{')
+            if frame.is_map and len(self._stack) > 1:
+                parent, grandparent = self._stack[-1], self._stack[-2]
+                if not parent.is_map and grandparent.is_map and grandparent.key == 'listing':
+                    frame.listing = {}
+                    frame.channel_frame = grandparent
+            self._stack.append(frame)
+        elif token == '}' or token == ']':
+            frame = self._stack.pop()
+            if frame.listing is not None:
+                self._close_listing(frame)
+            elif frame.pending is not None:
+                self._ready.extend(self._build_listing(frame.channel, listing) for listing in frame.pending)
+            self._value_done()
+        elif token == ',':
+            frame = self._stack[-1]
+            frame.expects_key = frame.is_map
+        elif token == ':':
+            self._stack[-1].expects_key = False
+
+    def _scalar(self, string: str | None, literal: str | None):
+        if len(self._stack) == 0:
+            return
+        frame = self._stack[-1]
+        if frame.is_map and frame.expects_key:
+            frame.key = json.loads(string)
+            return
+        if frame.is_map:
+            if frame.listing is not None and frame.key in LISTING_FIELDS:
+                frame.listing[frame.key] = json.loads(string if string is not None else literal)
+            elif frame.key == 'channel' and string is not None:
+                frame.channel = json.loads(string)
+
+    def _value_done(self):
+        if len(self._stack) > 0:
+            self._stack[-1].expects_key = False
+
+    def _close_listing(self, frame: _Frame):
+        if 'title' not in frame.listing:
+            return
+        channel_frame = frame.channel_frame
+        if channel_frame.channel is not None:
+            self._ready.append(self._build_listing(channel_frame.channel, frame.listing))
+        else:
+            if channel_frame.pending is None:
+                channel_frame.pending = []
+            channel_frame.pending.append(frame.listing)
+
+    @staticmethod
+    def _build_listing(channel: str, listing: dict):
+        return GuideListing(
+            channel,
+            listing['title'],
+            listing.get('start_time'),
+            listing.get('end_time'),
+            listing.get('series_num'),
+            listing.get('episode_num'),
+            listing.get('episode_title')
+        )
+
+
+def listings_from_schedule(schedule: list[dict]):
+    """
+    Yield a `GuideListing` for each listing of an already decoded iview schedule
+    """
+    for channel_data in schedule:
+        for listing in channel_data['listing']:
+            yield GuideListingParser._build_listing(channel_data['channel'], listing)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, NamedTuple
+import time
+
+
+class Identity(NamedTuple):
+    id: int
+    username: str
+    role: str
+
+
+class IdentityCache:
+    """
+    Caches the identity of the users making authenticated API requests, so authorising a request doesn't query the database.\n
+    The `id` and `role` claims of a token are trusted for `ttl` seconds after it was issued,
+    unless the user has been invalidated since. Otherwise the identity is loaded from the database,
+    and is cached for `ttl` seconds, so a change to a user reaches every process within `ttl` seconds.
+    Invalidating a user changes it immediately in the process it was changed in.
+    """
+
+    ttl = 300
+    max_size = 1024
+
+    def __init__(self, ttl: int = None, max_size: int = None, clock: Callable[[], float] = time.time):
+        self.ttl = ttl or IdentityCache.ttl
+        self.max_size = max_size or IdentityCache.max_size
+        self._clock = clock
+        self._identities: OrderedDict[str, tuple[Identity, float]] = OrderedDict()
+        self._invalidated: dict[str, float] = {}
+        self._lock = Lock()
+
+    def get(self, username: str, claims: dict = None):
+        """
+        Return the identity of the user, from the cache or the token's claims, or None if it has to be loaded
+        """
+        now = self._clock()
+        with self._lock:
+            cached = self._identities.get(username)
+            if cached is not None and cached[1] > now:
+                self._identities.move_to_end(username)
+                return cached[0]
+            invalidated_at = self._invalidated.get(username)
+
+        claims = claims or {}
+        issued_at = claims.get('iat')
+        if 'id' not in claims or 'role' not in claims or issued_at is None:
+            return None
+        if now - issued_at >= self.ttl or (invalidated_at is not None and issued_at <= invalidated_at):
+            return None
+
+        identity = Identity(claims['id'], username, claims['role'])
+        self._store(identity, issued_at + self.ttl)
+        return identity
+
+    def set(self, identity: Identity):
+        self._store(identity, self._clock() + self.ttl)
+
+    def invalidate(self, username: str):
+        """
+        Drop the user's identity and stop trusting the claims of the tokens issued to them so far
+        """
+        now = self._clock()
+        with self._lock:
+            self._identities.pop(username, None)
+            self._invalidated[username] = now
+            # claims older than the ttl are never trusted, so older invalidations can be forgotten
+            for invalidated_username, invalidated_at in list(self._invalidated.items()):
+                if now - invalidated_at >= self.ttl:
+                    del self._invalidated[invalidated_username]
+
+    def _store(self, identity: Identity, expires_at: float):
+        with self._lock:
+            self._identities[identity.username] = (identity, expires_at)
+            self._identities.move_to_end(identity.username)
+            while len(self._identities) > self.max_size:
+                self._identities.popitem(last=False)
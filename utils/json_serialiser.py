@@ -0,0 +1,71 @@
+from __future__ import annotations
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+import orjson
+import uuid
+
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def http_date(value: date | datetime):
+    """
+    Format `value` as `werkzeug.http.http_date` does, without its generic conversions, as there can be thousands in a response.
+    Naive datetimes are taken to be in UTC.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        hour, minute, second = value.hour, value.minute, value.second
+    else:
+        hour, minute, second = 0, 0, 0
+    return (
+        f"{WEEKDAYS[value.weekday()]}, {value.day:02d} {MONTHS[value.month - 1]} {value.year:04d} "
+        f"{hour:02d}:{minute:02d}:{second:02d} GMT"
+    )
+
+def encode(value: object):
+    """
+    Encode the values orjson doesn't serialise itself, as Flask's default JSON provider does.\n
+    Dates and datetimes are encoded as HTTP dates, the format the API has always returned them in.
+    """
+    if isinstance(value, (datetime, date)):
+        return http_date(value)
+    if isinstance(value, time):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumpb(value: object):
+    """
+    Serialise `value` to JSON bytes.
+    Dicts, lists, tuples and dataclasses, such as the rows of `ShowEpisode.get_episode_rows`, are serialised without being converted first.
+    """
+    return orjson.dumps(value, default=encode, option=OPTIONS)
+
+def dumps(value: object):
+    return dumpb(value).decode()
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    The JSON provider for the Flask API, serialising responses with `dumpb`
+    """
+
+    def dumps(self, obj: object, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s: str | bytes, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumpb(obj), mimetype='application/json')
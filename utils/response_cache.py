@@ -0,0 +1,70 @@
+from __future__ import annotations
+from collections import OrderedDict
+from flask import request, Response
+from threading import Lock
+from typing import Callable, Hashable
+import hashlib
+
+from utils import json_serialiser
+
+
+class ResponseCache:
+    """
+    Caches the JSON body of API responses by route, arguments and the version of the data they were built from.\n
+    Each response carries an ETag made from its cache key, so a client that sends the ETag back in `If-None-Match`
+    gets a `304 Not Modified` without the response being built or looked up.
+    Responses built from a newer version of the data have a different key, so stale entries are never served,
+    and the least recently used entries are dropped once the cache is full.\n
+    Responses without a version are for data that never changes, and may be cached by clients indefinitely.
+    """
+
+    max_size = 256
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or ResponseCache.max_size
+        self._responses: OrderedDict[tuple, tuple[str, dict[str, str]]] = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def etag(key: Hashable, version: int | None):
+        return hashlib.sha1(repr((key, version)).encode()).hexdigest()
+
+    @staticmethod
+    def cache_control(version: int | None):
+        return 'public, max-age=31536000, immutable' if version is None else 'no-cache'
+
+    def get(self, key: Hashable, version: int | None, build: Callable[[], tuple[object, dict[str, str]]]):
+        """
+        Return the serialised body and headers for `key` at `version`, calling `build` for them if they are not cached
+        """
+        with self._lock:
+            cached = self._responses.get((key, version))
+            if cached is not None:
+                self._responses.move_to_end((key, version))
+        if cached is None:
+            body, headers = build()
+            cached = (json_serialiser.dumps(body), headers)
+            with self._lock:
+                self._responses[(key, version)] = cached
+                while len(self._responses) > self.max_size:
+                    self._responses.popitem(last=False)
+
+        return cached
+
+    def respond(self, key: Hashable, version: int | None, build: Callable[[], tuple[object, dict[str, str]]]):
+        """
+        Return the response for `key` at `version`, calling `build` for its body and headers if it is not cached
+        """
+        etag = ResponseCache.etag(key, version)
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            body, headers = self.get(key, version, build)
+            response = Response(body, mimetype='application/json', headers=headers)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = ResponseCache.cache_control(version)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
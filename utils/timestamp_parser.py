@@ -0,0 +1,67 @@
+from __future__ import annotations
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, TYPE_CHECKING
+import pytz
+
+if TYPE_CHECKING:
+    from aux_methods.types import GuideListing
+
+
+@lru_cache(maxsize=None)
+def get_timezone(timezone: str):
+    """
+    Return the `pytz` timezone for `timezone`, only building it the first time it is asked for
+    """
+    return pytz.timezone(timezone)
+
+
+class TimestampParser:
+    """
+    Parses the timestamps of a guide feed in one pass.\n
+    The feeds only use the fixed-width ISO format `YYYY-MM-DDTHH:MM:SS`, so the fields are sliced out by position
+    rather than through `strptime`, and each distinct timestamp is only parsed once.
+    Other ISO timestamps fall back to `datetime.fromisoformat`.
+    """
+
+    def __init__(self):
+        self._parsed: dict[str, datetime] = {}
+
+    def parse(self, timestamp: str | None) -> datetime | None:
+        if timestamp is None:
+            return None
+        parsed = self._parsed.get(timestamp)
+        if parsed is None:
+            parsed = self._parse_timestamp(timestamp)
+            self._parsed[timestamp] = parsed
+        return parsed
+
+    @staticmethod
+    def _parse_timestamp(timestamp: str):
+        if (
+            len(timestamp) == 19
+            and timestamp[4] == '-' and timestamp[7] == '-'
+            and timestamp[10] in 'T '
+            and timestamp[13] == ':' and timestamp[16] == ':'
+        ):
+            try:
+                return datetime(
+                    int(timestamp[0:4]),
+                    int(timestamp[5:7]),
+                    int(timestamp[8:10]),
+                    int(timestamp[11:13]),
+                    int(timestamp[14:16]),
+                    int(timestamp[17:19])
+                )
+            except ValueError:
+                pass
+        return datetime.fromisoformat(timestamp)
+
+    def parse_listings(self, listings: Iterable['GuideListing']):
+        """
+        Return the `listings` with their start and end times parsed into naive `datetime`s
+        """
+        return [
+            listing._replace(start_time=self.parse(listing.start_time), end_time=self.parse(listing.end_time))
+            for listing in listings
+        ]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from database.models.SearchItemModel import SearchItem
+
+
+SHOW_PATTERN = 0
+IGNORE_PATTERN = 1
+
+
+class TitleMatcher:
+    """
+    Matches guide listing titles against a list of `SearchItem`s in a single pass over the title.\n
+    The search item titles, and the titles each search item ignores, are compiled into an Aho-Corasick automaton
+    when the matcher is created, so the cost of matching a listing does not grow with the number of shows searched for.\n
+    A search item with `exact_title_match` only matches when its title is a whole-word prefix of the listing title,
+    leaving the exact comparison of the parsed title to `SearchItem.check_search_conditions`.\n
+    A search item is not matched if any of its `ignore_titles` appear in the listing title.
+    """
+
+    def __init__(self, search_items: list['SearchItem']):
+        self.search_items = search_items
+        self._transitions: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[list[tuple[int, int, int]]] = [[]]
+
+        for idx, search_item in enumerate(search_items):
+            self._add_pattern(search_item.show.lower(), SHOW_PATTERN, idx)
+            for ignore_title in search_item.ignore_titles or []:
+                self._add_pattern(ignore_title.lower(), IGNORE_PATTERN, idx)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, pattern_type: int, search_item_idx: int):
+        if pattern == '':
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions[state][char] = next_state
+                self._transitions.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(pattern), pattern_type, search_item_idx))
+
+    def _build_failure_links(self):
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._transitions[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._transitions[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._transitions[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    @staticmethod
+    def _is_whole_word_prefix(title: str, start: int, end: int):
+        return start == 0 and (end == len(title) or not title[end].isalnum())
+
+    def match(self, title: str):
+        """
+        Return every search item matching the given listing `title`, in the order the search items were given
+        """
+        title = title.lower()
+        matched: set[int] = set()
+        ignored: set[int] = set()
+
+        state = 0
+        for idx, char in enumerate(title):
+            while state and char not in self._transitions[state]:
+                state = self._fail[state]
+            state = self._transitions[state].get(char, 0)
+            for pattern_length, pattern_type, search_item_idx in self._outputs[state]:
+                if pattern_type == IGNORE_PATTERN:
+                    ignored.add(search_item_idx)
+                    continue
+                start = idx - pattern_length + 1
+                if not self.search_items[search_item_idx].exact_title_match or self._is_whole_word_prefix(title, start, idx + 1):
+                    matched.add(search_item_idx)
+
+        return [self.search_items[idx] for idx in sorted(matched - ignored)]
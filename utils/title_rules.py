@@ -0,0 +1,188 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import NamedTuple
+import json
+import os
+import re
+
+
+TITLE_RULES_PATH = os.path.join(os.path.dirname(__file__), 'title_rules.json')
+
+
+class TitleRule(NamedTuple):
+    """
+    A normalisation rule for a listing title, loaded from the title rules file.\n
+    A rule applies to a title that contains every string in `contains`, at least one of `any_of`,
+    and none of `excludes`, or to the title that `equals` it.
+    The rule's `title`, `season_number`, `episode_number` and `episode_title` replace the listing's values when they are set.
+    """
+    contains: tuple[str, ...] = ()
+    any_of: tuple[str, ...] = ()
+    excludes: tuple[str, ...] = ()
+    equals: str | None = None
+    title: str | None = None
+    season_number: int | None = None
+    episode_number: int | None = None
+    episode_title: str | None = None
+
+    @staticmethod
+    def from_dict(rule: dict):
+        return TitleRule(
+            tuple(rule.get('contains', ())),
+            tuple(rule.get('any_of', ())),
+            tuple(rule.get('excludes', ())),
+            rule.get('equals'),
+            rule.get('title'),
+            rule.get('season_number'),
+            rule.get('episode_number'),
+            rule.get('episode_title')
+        )
+
+    def applies_to(self, title: str, keywords: set[str]):
+        if self.equals is not None and title != self.equals:
+            return False
+        return (
+            all(keyword in keywords for keyword in self.contains)
+            and (len(self.any_of) == 0 or any(keyword in keywords for keyword in self.any_of))
+            and not any(keyword in keywords for keyword in self.excludes)
+        )
+
+
+class RuleSet:
+    """
+    An ordered list of `TitleRule`s, compiled so a title is scanned once however many rules there are.\n
+    Every string the rules look for is compiled into one regex, and each rule is indexed by the strings it needs,
+    so only the rules whose strings appear in a title are checked, in the order they were given.
+    The rule found for each title is memoised.
+    """
+
+    memo_size = 10000
+
+    def __init__(self, rules: list[TitleRule]):
+        self.rules = rules
+        self._candidates: dict[str, set[int]] = {}
+        self._equals: dict[str, set[int]] = {}
+        self._unconditional: set[int] = set()
+        keywords: set[str] = set()
+        for idx, rule in enumerate(rules):
+            keywords.update(rule.contains, rule.any_of, rule.excludes)
+            if rule.equals is not None:
+                self._equals.setdefault(rule.equals, set()).add(idx)
+            elif len(rule.contains) > 0:
+                self._candidates.setdefault(rule.contains[0], set()).add(idx)
+            elif len(rule.any_of) > 0:
+                for keyword in rule.any_of:
+                    self._candidates.setdefault(keyword, set()).add(idx)
+            else:
+                self._unconditional.add(idx)
+
+        # The lookahead finds the longest string at every position, so the shorter strings it overlaps are added separately
+        self._keyword_pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)) + '))'
+        ) if len(keywords) > 0 else None
+        self._prefixes = {
+            keyword: { prefix for prefix in keywords if keyword.startswith(prefix) }
+            for keyword in keywords
+        }
+        self._memo: dict[str, TitleRule | None] = {}
+
+    def keywords_in(self, title: str):
+        keywords: set[str] = set()
+        if self._keyword_pattern is not None:
+            for match in self._keyword_pattern.finditer(title):
+                keywords.update(self._prefixes[match.group(1)])
+        return keywords
+
+    def match(self, title: str):
+        """
+        Return the first rule that applies to `title`, or `None` if none of them do
+        """
+        if title in self._memo:
+            return self._memo[title]
+
+        keywords = self.keywords_in(title)
+        candidates = set(self._unconditional)
+        candidates.update(self._equals.get(title, ()))
+        for keyword in keywords:
+            candidates.update(self._candidates.get(keyword, ()))
+        rule = next((self.rules[idx] for idx in sorted(candidates) if self.rules[idx].applies_to(title, keywords)), None)
+
+        if len(self._memo) >= RuleSet.memo_size:
+            self._memo.clear()
+        self._memo[title] = rule
+        return rule
+
+
+class TitleRules:
+    """
+    Normalises listing titles with the rules in the title rules file, so a show's quirks are added as data.\n
+    `overrides` are matched against the listing's title as it is in the guide. The first one that applies
+    sets the show's details, and the title is not processed any further.\n
+    `aliases` are matched once the episode title has been split out of the listing's title,
+    and replace the title with the show's title in the search list.\n
+    `channel_formats` are patterns for the season and episode numbers a channel puts in its episode titles.
+    `{title}` in a pattern stands for the show's title, and is optional.
+    """
+
+    def __init__(self, rules: dict):
+        self.overrides = RuleSet([TitleRule.from_dict(rule) for rule in rules.get('overrides', [])])
+        self.aliases = RuleSet([TitleRule.from_dict(rule) for rule in rules.get('aliases', [])])
+        self.channel_formats = [
+            (
+                channel_format['channel'],
+                re.compile(channel_format['episode_pattern'].replace('{title}', '(?P<title>.+?)'))
+            )
+            for channel_format in rules.get('channel_formats', [])
+        ]
+
+    @staticmethod
+    def load(path: str = TITLE_RULES_PATH):
+        with open(path) as fd:
+            return TitleRules(json.load(fd))
+
+    def normalise(self, title: str, season_number: int, episode_number: int, episode_title: str):
+        """
+        Return the show's title, season number, episode number and episode title for a listing
+        """
+        override = self.overrides.match(title)
+        if override is not None:
+            return (
+                override.title if override.title is not None else title,
+                override.season_number if override.season_number is not None else season_number,
+                override.episode_number if override.episode_number is not None else episode_number,
+                override.episode_title if override.episode_title is not None else episode_title
+            )
+
+        if ': ' in title and episode_title == "":
+            title, episode_title = title.split(': ', 1)
+        if ' - ' in title and episode_title == "":
+            title, episode_title = title.split(' - ', 1)
+        if f'{title} - ' in episode_title:
+            episode_title = episode_title.split(' - ')[1]
+        return self.canonical_title(title), season_number, episode_number, episode_title
+
+    def canonical_title(self, title: str):
+        alias = self.aliases.match(title)
+        if alias is not None and alias.title is not None:
+            return alias.title
+        return title
+
+    def episode_numbers(self, channel: str, show_title: str, episode_title: str):
+        """
+        Return the season and episode numbers in `episode_title` if it is in one of `channel`'s formats, otherwise `None`
+        """
+        for format_channel, episode_pattern in self.channel_formats:
+            if format_channel not in channel:
+                continue
+            match = episode_pattern.match(episode_title)
+            if match and match.groupdict().get('title', show_title) == show_title:
+                return int(match.group('season_number')), int(match.group('episode_number'))
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_title_rules():
+    """
+    The rules in the title rules file, loaded and compiled the first time they are needed
+    """
+    return TitleRules.load()